@@ -15,18 +15,33 @@ st.set_page_config(
 
 # Imports pesados DEPOIS do set_page_config
 import pandas as pd
-import numpy as np
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
 # Importar módulos
 from utils.dicionarios import (
     areas_atuacao, niveis_formacao, niveis_cargo,
-    faixas_etarias, regimes, PESOS_PADRAO
+    faixas_etarias, regimes, PESOS_PADRAO, FATORES_PENALIZACAO_PADRAO
 )
-from utils.google_sheets import carregar_planilha
-from utils.preparacao import preparar_dados_completos
-from utils.comparacao import treinar_modelos, gerar_recomendacoes, gerar_graficos_comparacao
+from utils.google_sheets import carregar_abas_com_snapshot, atualizar_snapshots_em_segundo_plano
+from utils.snapshot import versao_snapshots
+from utils.esquema import tipar_dataframe
+from utils.comparacao import gerar_recomendacoes, gerar_graficos_em_segundo_plano
+from utils.features import (
+    vetor_vaga, calcular_matriz_features, preencher_nan_features
+)
+from utils.inferencia import prever_deduplicado, estatisticas_deduplicacao
+from utils.tarefas_treino import ETAPAS, submeter_treino, status_tarefa
+from utils.perfil_execucao import (
+    nova_execucao, medir_etapa, registrar_execucao, totais_execucao, ler_historico
+)
+from utils.armazem_atributos import DIRETORIO_ARMAZEM
+from utils.cache_preparacao import estatisticas_cache
+from utils.preparacao import exibir_estatisticas_dataset
+from utils.pool_candidatos import preparar_pool
+from utils.ranking import top_k_indices
+from utils.registro_modelos import calcular_fingerprint, carregar_versao
 
 # Configuração da página
 st.set_page_config(
@@ -364,21 +379,35 @@ st.markdown("""
 # ═══════════════════════════════════════════════════════════════════════════
 # CARREGAMENTO AUTOMÁTICO DOS DADOS
 # ═══════════════════════════════════════════════════════════════════════════
+PLANILHA_ID = "1tM1LSnFLlp_CF8yAWFE0w6r1qTV9Smy_mvDx0Wx1x-U"
+ABAS = ['candidatos', 'vagas', 'matches']
+
+
 @st.cache_data(show_spinner=False)
-def carregar_dados_inicial():
-    """Carrega dados do Google Sheets uma única vez"""
+def carregar_dados_inicial(versao_snapshot):
+    """
+    Carrega dados do snapshot local (atualizado em segundo plano) ou do
+    Google Sheets; versao_snapshot muda quando um snapshot novo é gravado
+    """
     try:
-        PLANILHA_ID = "1tM1LSnFLlp_CF8yAWFE0w6r1qTV9Smy_mvDx0Wx1x-U"
+        carregado = carregar_abas_com_snapshot(PLANILHA_ID, ABAS)
+        abas = carregado['abas']
         
-        candidatos_raw = carregar_planilha(PLANILHA_ID, aba="candidatos")
-        vagas_raw = carregar_planilha(PLANILHA_ID, aba="vagas")
-        matches_raw = carregar_planilha(PLANILHA_ID, aba="matches")
+        candidatos_raw = abas['candidatos']
+        vagas_raw = abas['vagas']
+        matches_raw = abas['matches']
         
         if candidatos_raw is not None and vagas_raw is not None and matches_raw is not None:
+            # Tipos compactos uma única vez (códigos int8/int16, ids em strings Arrow)
+            candidatos_raw = tipar_dataframe(candidatos_raw)
+            vagas_raw = tipar_dataframe(vagas_raw)
+            matches_raw = tipar_dataframe(matches_raw)
+            
             return {
                 'candidatos': candidatos_raw,
                 'vagas': vagas_raw,
                 'matches': matches_raw,
+                'tempos': carregado['tempos'],
                 'sucesso': True,
                 'erro': None
             }
@@ -399,9 +428,115 @@ def carregar_dados_inicial():
             'erro': str(e)
         }
 
+@st.cache_data(show_spinner=False)
+def calcular_versao_dados(versao_snapshot):
+    """Fingerprint das três abas, calculado uma vez por versão dos dados"""
+    dados = carregar_dados_inicial(versao_snapshot)
+    return calcular_fingerprint(dados['candidatos'], dados['vagas'], dados['matches'])
+
+
+@st.cache_resource(show_spinner=False)
+def obter_pool_candidatos(versao_dados, _candidatos):
+    """Pool de candidatos pré-normalizado, compartilhado entre as sessões"""
+    # Atributos no armazém mapeado: réplicas do app na mesma máquina dividem as páginas
+    return preparar_pool(_candidatos, versao_dados, DIRETORIO_ARMAZEM)
+
+
+def descrever_etapa(tarefa):
+    """Nome da etapa em execução (ou a próxima pendente) de uma tarefa de treino"""
+    nomes = {
+        'preparar': 'preparando dados', 'dividir': 'separando treino e teste',
+        'LR': 'Logistic Regression', 'RF': 'Random Forest', 'XGB': 'XGBoost',
+        'graficos': 'gerando gráficos'
+    }
+    for status in ('executando', 'pendente'):
+        for etapa in ETAPAS:
+            if tarefa['etapas'][etapa]['status'] == status:
+                return nomes[etapa]
+    return 'finalizando'
+
+
+def exibir_desempenho(execucao):
+    """Painel na sidebar com as etapas desta execução e o histórico do log"""
+    nomes = {
+        'carregamento': 'Carregamento', 'modelos': 'Modelos (registro/treino)',
+        'recomendacoes': 'Recomendações', 'top_por_modelo': 'Top por modelo',
+        'graficos': 'Gráficos', 'pdf': 'PDF'
+    }
+    
+    with st.sidebar:
+        st.markdown("---")
+        st.markdown("### ⏱️ Desempenho")
+        
+        st.dataframe(pd.DataFrame([
+            {
+                'Etapa': nomes.get(etapa['etapa'], etapa['etapa']),
+                'Tempo (ms)': round(etapa['parede'] * 1000),
+                'CPU do processo (ms)': round(etapa['cpu'] * 1000),
+                'Memória do processo (MB)': (
+                    round(etapa['memoria_pico_mb'], 1) if etapa['memoria_pico_mb'] is not None else None
+                )
+            }
+            for etapa in execucao['etapas']
+        ]), hide_index=True, use_container_width=True)
+        
+        totais = totais_execucao(execucao)
+        st.caption(f"Total: {totais['parede']:.2f} s • CPU do processo {totais['cpu']:.2f} s")
+        st.caption(
+            "CPU e memória são do processo inteiro: incluem outras sessões, "
+            "os gráficos e o treino em segundo plano que rodarem ao mesmo tempo"
+        )
+        
+        # Treino em segundo plano desta versão (gravado pela tarefa)
+        historico = ler_historico(limite=20)
+        treino = next((
+            e for e in reversed(historico)
+            if e['tipo'] == 'treino' and e['contexto'].get('fingerprint') == execucao['contexto'].get('fingerprint')
+        ), None)
+        if treino is not None:
+            st.caption("🧠 Treino: " + " • ".join(
+                f"{e['etapa']} {e['parede']:.1f} s" for e in treino['etapas'] if not e.get('subetapa')
+            ) + f" (preparação: {treino['contexto'].get('preparacao', '-')})")
+            
+            # Em paralelo a CPU de cada modelo é só a da thread que chamou o fit
+            modelos_treino = [e for e in treino['etapas'] if e.get('subetapa')]
+            if modelos_treino:
+                st.caption("🤖 Modelos: " + " • ".join(
+                    f"{e['etapa']} {e['parede']:.1f} s, "
+                    f"{'CPU da thread' if e.get('cpu_medida') == 'thread' else 'CPU'} {e['cpu'] or 0:.1f} s"
+                    for e in modelos_treino
+                ))
+        
+        cache = estatisticas_cache()
+        st.caption(f"🗃️ Cache da preparação: {cache['acertos']} acertos • {cache['faltas']} faltas")
+        
+        # Linhas por linha distinta na previsão dos modelos (esta execução e o processo)
+        deduplicacao = next((e['deduplicacao'] for e in execucao['etapas'] if e.get('deduplicacao')), None)
+        if deduplicacao is not None:
+            processo = estatisticas_deduplicacao()
+            st.caption(
+                f"🔁 Deduplicação: {deduplicacao['linhas']:,} linhas → {deduplicacao['linhas_unicas']:,} "
+                f"distintas ({deduplicacao['razao']:.1f}x) • processo {processo['razao']:.1f}x "
+                f"em {processo['chamadas']} chamadas"
+            )
+        
+        with st.expander("📜 Últimas execuções"):
+            st.dataframe(pd.DataFrame([
+                {'Início': e['inicio'], 'Tipo': e['tipo'], 'Total (s)': round(e['totais']['parede'], 2)}
+                for e in reversed(historico)
+            ]), hide_index=True, use_container_width=True)
+
+
+# Tempos de cada etapa desta execução do script (painel e log de desempenho)
+execucao = nova_execucao('recomendacao')
+
 # Carregar dados automaticamente
-with st.spinner("📂 Carregando dados..."):
-    dados = carregar_dados_inicial()
+with st.spinner("📂 Carregando dados..."), medir_etapa(execucao, 'carregamento'):
+    # Fora do cache: roda a cada execução do script (limitada a uma vez por
+    # INTERVALO_ATUALIZACAO); o snapshot novo muda versao_snapshot
+    atualizar_snapshots_em_segundo_plano(PLANILHA_ID, ABAS)
+    versao_snapshot = versao_snapshots(PLANILHA_ID, ABAS)
+    dados = carregar_dados_inicial(versao_snapshot)
 
 # Header
 st.markdown('<p class="main-header">Sistema de Match</p>', unsafe_allow_html=True)
@@ -571,6 +706,11 @@ with st.sidebar:
     
     # Botão de processar
     processar = st.button("🚀 Gerar Recomendações", use_container_width=True)
+    
+    mostrar_desempenho = st.checkbox(
+        "⏱️ Mostrar desempenho", value=False,
+        help="Tempo, CPU e memória de cada etapa da análise"
+    )
 
 # ═══════════════════════════════════════════════════════════════════════════
 # ÁREA PRINCIPAL
@@ -590,6 +730,11 @@ with col2:
 with col3:
     st.metric("✅ Matches Registrados", f"{len(dados['matches']):,}")
 
+# Tempo de cada etapa do carregamento
+st.caption("⏱️ Carregamento: " + " • ".join(
+    f"{etapa} {segundos * 1000:.0f} ms" for etapa, segundos in dados['tempos'].items()
+))
+
 st.markdown("---")
 
 # Processar quando clicar no botão
@@ -616,135 +761,109 @@ if processar:
         'formalidade': formalidade
     }
     
-    # ETAPA 1: PREPARAR DADOS (silencioso - sem mensagens)
-    try:
-        dados_completos = preparar_dados_completos(
-            dados['candidatos'],
-            dados['vagas'],
-            dados['matches']
-        )
-        
-        if dados_completos is None:
-            st.error("❌ Erro na preparação dos dados.")
-            st.stop()
-        
-    except Exception as e:
-        st.error(f"❌ Erro na preparação: {str(e)}")
-        with st.expander("🔍 Ver detalhes"):
-            import traceback
-            st.code(traceback.format_exc())
-        st.stop()
+    # ETAPA 1: REUTILIZAR MODELOS JÁ TREINADOS PARA ESTES DADOS
+    with medir_etapa(execucao, 'modelos'):
+        fingerprint = calcular_versao_dados(versao_snapshot)
+        pool = obter_pool_candidatos(fingerprint, dados['candidatos'])
+        artefatos = carregar_versao(fingerprint)
     
-    # ETAPA 2: TREINAR MODELOS (silencioso - sem mensagens)
-    try:
-        features = [
-            'diff_idade', 'diff_formacao', 'diff_area', 'diff_cargo', 'diff_regime',
-            'diff_autoridade', 'diff_prestigio', 'diff_preservacao',
-            'diff_formalidade', 'distancia_perfil'
-        ]
-        
-        X = dados_completos[features]
-        y = dados_completos['match']
-        
-        from sklearn.model_selection import train_test_split
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42, stratify=y
-        )
-        
-        resultado_treino = treinar_modelos(X_train, y_train, X_test, y_test)
+        if artefatos is None:
+            # ETAPA 2: TREINAR EM SEGUNDO PLANO (a sessão não fica presa ao treino)
+            tarefa_id = submeter_treino(
+                fingerprint, dados['candidatos'], dados['vagas'], dados['matches']
+            )
         
-        modelos = resultado_treino['modelos']
-        df_resultados = resultado_treino['resultados']
-        probabilidades = resultado_treino['probabilidades']
+            # Enquanto isso, seguir com a última versão boa (a ativa)
+            artefatos = carregar_versao()
         
-    except Exception as e:
-        st.error(f"❌ Erro no treinamento: {str(e)}")
-        with st.expander("🔍 Ver detalhes"):
-            import traceback
-            st.code(traceback.format_exc())
-        st.stop()
+            if artefatos is None:
+                # Primeiro treino: não há versão anterior, esperar a tarefa
+                barra = st.progress(0.0)
+                while True:
+                    tarefa = status_tarefa(tarefa_id)
+                    if tarefa is None or tarefa['status'] in ('concluida', 'erro'):
+                        break
+                    barra.progress(tarefa['progresso'], text=f"⏳ Treinando modelos: {descrever_etapa(tarefa)}")
+                    time.sleep(0.5)
+                barra.empty()
+            
+                if tarefa is None or tarefa['status'] == 'erro':
+                    st.error("❌ Erro no treinamento.")
+                    if tarefa is not None:
+                        with st.expander("🔍 Ver detalhes"):
+                            st.code(tarefa['erro'])
+                    st.stop()
+            
+                artefatos = carregar_versao(versao_id=tarefa['versao_id'])
+                if artefatos is None:
+                    st.error("❌ Não foi possível carregar os modelos treinados.")
+                    st.stop()
+            else:
+                tarefa = status_tarefa(tarefa_id)
+                st.info(
+                    f"🔄 Novo treino em andamento (tarefa {tarefa_id}: {descrever_etapa(tarefa)}, "
+                    f"{tarefa['progresso']:.0%}). Usando a versão {artefatos.get('versao', 'anterior')} "
+                    "até o novo modelo ficar pronto."
+                )
+
+    
+    execucao['contexto'].update(
+        fingerprint=fingerprint, versao_modelos=artefatos.get('versao'),
+        candidatos=len(dados['candidatos']), vaga=vaga
+    )
+    
+    # Estatísticas do dataset de treino da versão em uso (gravadas pela tarefa)
+    estatisticas = (artefatos.get('metadados') or {}).get('estatisticas_dataset')
+    if estatisticas is not None:
+        exibir_estatisticas_dataset(estatisticas)
+    
+    modelos = artefatos['modelos']
+    df_resultados = artefatos['resultados']
+    probabilidades = artefatos['probabilidades']
+    y_test = artefatos['y_test']
+    compilados = artefatos.get('compilados')
     
     # ETAPA 3: GERAR RECOMENDAÇÕES (silencioso - sem mensagens)
     try:
-            fatores_penalizacao = {
-                'area': 10.0,
-                'perfil': 1.5,
-                'cargo': 12.5,
-                'formacao': 7.0,
-                'idade': 10.0,
-                'regime': 25.0
-            }
-            
+        fatores_penalizacao = FATORES_PENALIZACAO_PADRAO
+        
+        with medir_etapa(execucao, 'recomendacoes'):
             # Gerar top 10 para cada modelo
             top_10_negocio = gerar_recomendacoes(
                 dados['candidatos'],
                 vaga,
                 modelos,
                 pesos,
-                fatores_penalizacao
+                fatores_penalizacao,
+                pool=pool,
+                compilados=compilados
             )
+        
+        with medir_etapa(execucao, 'top_por_modelo') as registro:
+            # Top 10 por modelo ML individual (mesmo motor de features)
+            matriz_pred = preencher_nan_features(calcular_matriz_features(pool['atributos'], vetor_vaga(vaga)))
+            nomes = pool['nomes']
             
-            # Top 10 por modelo ML individual
-            candidatos_temp = dados['candidatos'].copy()
-            
-            # Converter colunas para numérico
-            colunas_para_converter = [
-                'Intervalo_Idade_Código', 'Nível_Formação_Código',
-                'Área_Atuação_Código', 'Nível do cargo código',
-                'Regime código', 'autoridade', 'prestigio',
-                'preservacao', 'formalidade'
-            ]
-            
-            for col in colunas_para_converter:
-                if col in candidatos_temp.columns:
-                    candidatos_temp[col] = pd.to_numeric(candidatos_temp[col], errors='coerce')
-            
-            candidatos_temp = candidatos_temp.fillna({
-                'Intervalo_Idade_Código': 2, 'Nível_Formação_Código': 4,
-                'Área_Atuação_Código': 1, 'Nível do cargo código': 3,
-                'Regime código': 0, 'autoridade': 25.0, 'prestigio': 25.0,
-                'preservacao': 25.0, 'formalidade': 25.0
-            })
+            # Cada linha de features distinta passa pelos 3 modelos uma única vez
+            registro['deduplicacao'] = {}
+            probabilidades_modelos = prever_deduplicado(
+                modelos, matriz_pred, chaves=['LR', 'RF', 'XGB'], compilados=compilados,
+                contagem=registro['deduplicacao']
+            )
             
-            # Calcular features
-            features_lista = []
-            for idx, cand in candidatos_temp.iterrows():
-                feats = {
-                    'diff_idade': abs(float(cand['Intervalo_Idade_Código']) - float(vaga['codigo_idade'])),
-                    'diff_formacao': abs(float(cand['Nível_Formação_Código']) - float(vaga['codigo_formacao'])),
-                    'diff_area': abs(float(cand['Área_Atuação_Código']) - float(vaga['codigo_area'])),
-                    'diff_cargo': abs(float(cand['Nível do cargo código']) - float(vaga['codigo_cargo'])),
-                    'diff_regime': abs(float(cand['Regime código']) - float(vaga['codigo_regime'])),
-                    'diff_autoridade': abs(float(cand['autoridade']) - float(vaga['autoridade'])),
-                    'diff_prestigio': abs(float(cand['prestigio']) - float(vaga['prestigio'])),
-                    'diff_preservacao': abs(float(cand['preservacao']) - float(vaga['preservacao'])),
-                    'diff_formalidade': abs(float(cand['formalidade']) - float(vaga['formalidade']))
-                }
-                
-                feats['distancia_perfil'] = np.sqrt(
-                    feats['diff_autoridade']**2 + feats['diff_prestigio']**2 +
-                    feats['diff_preservacao']**2 + feats['diff_formalidade']**2
+            # Selecionar os 10 maiores sem ordenar tudo
+            tops_modelos = {}
+            for chave, coluna in [('LR', 'prob_lr'), ('RF', 'prob_rf'), ('XGB', 'prob_xgb')]:
+                prob = probabilidades_modelos[chave]
+                posicoes = top_k_indices(prob, 10)
+                tops_modelos[chave] = pd.DataFrame(
+                    {'Nome Completo': nomes[posicoes], coluna: prob[posicoes]},
+                    index=pool['index'][posicoes]
                 )
-                
-                features_lista.append(feats)
             
-            df_pred = pd.DataFrame(features_lista)
-            
-            # Preencher NaN
-            for col in df_pred.columns:
-                max_val = df_pred[col].max()
-                if pd.isna(max_val) or max_val == 0:
-                    max_val = 10
-                df_pred[col] = df_pred[col].fillna(max_val)
-            
-            # Fazer previsões
-            candidatos_temp['prob_lr'] = modelos['LR'].predict_proba(df_pred)[:, 1]
-            candidatos_temp['prob_rf'] = modelos['RF'].predict_proba(df_pred)[:, 1]
-            candidatos_temp['prob_xgb'] = modelos['XGB'].predict_proba(df_pred)[:, 1]
-            
-            top_10_lr = candidatos_temp.nlargest(10, 'prob_lr')[['Nome Completo', 'prob_lr']]
-            top_10_rf = candidatos_temp.nlargest(10, 'prob_rf')[['Nome Completo', 'prob_rf']]
-            top_10_xgb = candidatos_temp.nlargest(10, 'prob_xgb')[['Nome Completo', 'prob_xgb']]
+        top_10_lr = tops_modelos['LR']
+        top_10_rf = tops_modelos['RF']
+        top_10_xgb = tops_modelos['XGB']
             
     except Exception as e:
         st.error(f"❌ Erro: {str(e)}")
@@ -753,6 +872,12 @@ if processar:
             st.code(traceback.format_exc())
         st.stop()
     
+    # Gráficos gerados junto com o treino; versões antigas renderizam numa
+    # thread enquanto as tabelas abaixo já vão para a tela
+    futuro_graficos = None
+    if not artefatos.get('graficos'):
+        futuro_graficos = gerar_graficos_em_segundo_plano(df_resultados, y_test, probabilidades)
+    
     # ═══════════════════════════════════════════════════════════════════
     # EXIBIR RESULTADOS
     # ═══════════════════════════════════════════════════════════════════
@@ -904,7 +1029,8 @@ if processar:
     st.markdown("---")
     st.markdown("### 📊 Análise Comparativa")
     
-    graficos = gerar_graficos_comparacao(df_resultados, y_test, probabilidades)
+    with medir_etapa(execucao, 'graficos'):
+        graficos = artefatos.get('graficos') or futuro_graficos.result()
     
     col1, col2 = st.columns(2)
     
@@ -917,64 +1043,65 @@ if processar:
     # Botão de Download PDF
     st.markdown("---")
     
-    # Preparar dados para PDF (simplificado - você pode expandir depois)
-    from io import BytesIO
-    from reportlab.lib.pagesizes import A4
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-    from reportlab.lib.styles import getSampleStyleSheet
-    from reportlab.lib import colors
-    
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    # Título
-    elements.append(Paragraph("Sistema de Match Candidato-Vaga", styles['Title']))
-    elements.append(Paragraph("Relatório de Recomendações", styles['Heading2']))
-    elements.append(Spacer(1, 20))
-    
-    # Configuração da Vaga
-    elements.append(Paragraph("Configuração da Vaga:", styles['Heading3']))
-    config_data = [
-        ['Área', areas_atuacao[codigo_area]],
-        ['Cargo', niveis_cargo[codigo_cargo]],
-        ['Formação', niveis_formacao[codigo_formacao]],
-        ['Idade', faixas_etarias[codigo_idade]],
-        ['Regime', regimes[codigo_regime]]
-    ]
-    config_table = Table(config_data, colWidths=[150, 300])
-    config_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#800c0f')),
-        ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    elements.append(config_table)
-    elements.append(Spacer(1, 20))
-    
-    # Top 10
-    elements.append(Paragraph("Top 10 Candidatos:", styles['Heading3']))
-    top_data = [['#', 'Nome', 'Score']]
-    for i, (idx, cand) in enumerate(top_10_negocio.iterrows(), 1):
-        top_data.append([str(i), cand['Nome Completo'], f"{cand['score_ponderado']:.1f}"])
-    
-    top_table = Table(top_data, colWidths=[30, 350, 70])
-    top_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#800c0f')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-    ]))
-    elements.append(top_table)
-    
-    doc.build(elements)
-    buffer.seek(0)
+    with medir_etapa(execucao, 'pdf'):
+        # Preparar dados para PDF (simplificado - você pode expandir depois)
+        from io import BytesIO
+        from reportlab.lib.pagesizes import A4
+        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.lib import colors
+    
+        buffer = BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=A4)
+        elements = []
+        styles = getSampleStyleSheet()
+    
+        # Título
+        elements.append(Paragraph("Sistema de Match Candidato-Vaga", styles['Title']))
+        elements.append(Paragraph("Relatório de Recomendações", styles['Heading2']))
+        elements.append(Spacer(1, 20))
+    
+        # Configuração da Vaga
+        elements.append(Paragraph("Configuração da Vaga:", styles['Heading3']))
+        config_data = [
+            ['Área', areas_atuacao[codigo_area]],
+            ['Cargo', niveis_cargo[codigo_cargo]],
+            ['Formação', niveis_formacao[codigo_formacao]],
+            ['Idade', faixas_etarias[codigo_idade]],
+            ['Regime', regimes[codigo_regime]]
+        ]
+        config_table = Table(config_data, colWidths=[150, 300])
+        config_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#800c0f')),
+            ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]))
+        elements.append(config_table)
+        elements.append(Spacer(1, 20))
+    
+        # Top 10
+        elements.append(Paragraph("Top 10 Candidatos:", styles['Heading3']))
+        top_data = [['#', 'Nome', 'Score']]
+        for i, (idx, cand) in enumerate(top_10_negocio.iterrows(), 1):
+            top_data.append([str(i), cand['Nome Completo'], f"{cand['score_ponderado']:.1f}"])
+    
+        top_table = Table(top_data, colWidths=[30, 350, 70])
+        top_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#800c0f')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
+        ]))
+        elements.append(top_table)
+    
+        doc.build(elements)
+        buffer.seek(0)
     
     col1, col2, col3 = st.columns([1, 1, 1])
     with col2:
@@ -985,6 +1112,14 @@ if processar:
             mime="application/pdf",
             use_container_width=True
         )
+    
+    try:
+        registrar_execucao(execucao)
+    except OSError as e:
+        st.warning(f"⚠️ Não foi possível gravar o log de desempenho: {e}")
+    
+    if mostrar_desempenho:
+        exibir_desempenho(execucao)
 
 else:
     # Vaga configurada
@@ -0,0 +1,70 @@
+"""
+Benchmark - pontuação por tabelas × pipeline de features em ponto flutuante
+
+Uso:
+    python benchmarks/pontuacao_tabelas.py [n_candidatos] [repeticoes]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.dados_sinteticos import gerar_atributos
+from utils.dicionarios import PESOS_PADRAO, FATORES_PENALIZACAO_PADRAO
+from utils.features import calcular_matriz_features, preencher_nan_features
+from utils.pontuacao import (
+    calcular_scores_aspectos, calcular_score_ponderado,
+    indexar_codigos, pontuar_com_tabelas
+)
+
+
+def pontuar_float(atributos, vaga):
+    """Caminho atual de gerar_recomendacoes: matriz de features -> scores"""
+    matriz = preencher_nan_features(calcular_matriz_features(atributos, vaga))
+    scores = calcular_scores_aspectos(matriz, FATORES_PENALIZACAO_PADRAO)
+    return calcular_score_ponderado(scores, PESOS_PADRAO)
+
+
+def cronometrar(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return resultado, min(tempos)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    rng = np.random.default_rng(0)
+    atributos = gerar_atributos(n, rng)
+    vaga = gerar_atributos(1, rng)[0]
+
+    inicio = time.perf_counter()
+    indice_codigos = indexar_codigos(atributos)
+    tempo_indice = time.perf_counter() - inicio
+
+    score_float, tempo_float = cronometrar(lambda: pontuar_float(atributos, vaga), repeticoes)
+    (score_tabela, _), tempo_tabela = cronometrar(
+        lambda: pontuar_com_tabelas(
+            indice_codigos, atributos, vaga, PESOS_PADRAO, FATORES_PENALIZACAO_PADRAO
+        ),
+        repeticoes
+    )
+
+    print(f"📊 {n:,} candidatos, melhor de {repeticoes} execuções")
+    print(f"   Índice de códigos (uma vez por pool): {tempo_indice * 1000:.1f} ms")
+    print(f"   Features em ponto flutuante: {tempo_float * 1000:.1f} ms")
+    print(f"   Tabelas por código:          {tempo_tabela * 1000:.1f} ms")
+    print(f"   Ganho: {tempo_float / tempo_tabela:.2f}x")
+    print(f"   Resultados idênticos: {'✅' if np.array_equal(score_float, score_tabela) else '❌'}")
+
+
+if __name__ == '__main__':
+    main()
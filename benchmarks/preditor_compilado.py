@@ -0,0 +1,80 @@
+"""
+Benchmark - modelos compilados × predict_proba do sklearn/xgboost
+
+Treina os 3 modelos de treinar_modelos em features sintéticas, confere a
+paridade das previsões e mede a latência por lote (incluindo 10 mil linhas).
+
+Uso:
+    python benchmarks/preditor_compilado.py [repeticoes]
+"""
+
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.comparacao import treinar_modelos
+from utils.features import features_dataframe
+from utils.preditor_compilado import (
+    TOLERANCIA_PARIDADE, compilar_regressao_logistica, compilar_floresta,
+    compilar_xgboost, prever_compilado, matriz_verificacao, verificar_paridade
+)
+
+TAMANHOS_LOTE = [10, 1000, 10000]
+
+
+def cronometrar(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    warnings.filterwarnings('ignore')
+
+    # Alvo sintético: área e perfil próximos com algum ruído
+    rng = np.random.default_rng(0)
+    matriz = matriz_verificacao(6000, semente=1)
+    y = ((matriz[:, 2] < 10) & (matriz[:, 9] < 90) | (rng.random(len(matriz)) < 0.1)).astype(int)
+    X = features_dataframe(matriz)
+
+    modelos = treinar_modelos(X[:5000], y[:5000], X[5000:], y[5000:])['modelos']
+
+    compiladores = {
+        'LR': compilar_regressao_logistica,
+        'RF': compilar_floresta,
+        'XGB': compilar_xgboost
+    }
+
+    print(f"📊 Melhor de {repeticoes} execuções (ms por lote)")
+
+    for chave, compilador in compiladores.items():
+        modelo = modelos[chave]
+        compilado = compilador(modelo)
+        diferenca = verificar_paridade(modelo, compilado)
+
+        print(f"\n{chave}: paridade {'✅' if diferenca <= TOLERANCIA_PARIDADE else '❌'} "
+              f"(maior diferença {diferenca:.2e})")
+
+        for n in TAMANHOS_LOTE:
+            lote = matriz_verificacao(n, semente=n)
+            df_lote = features_dataframe(lote)
+
+            tempo_original = cronometrar(lambda: modelo.predict_proba(df_lote), repeticoes)
+            tempo_compilado = cronometrar(lambda: prever_compilado(compilado, lote), repeticoes)
+
+            print(f"   {n:>6,} linhas: original {tempo_original * 1000:8.2f} | "
+                  f"compilado {tempo_compilado * 1000:8.2f} | "
+                  f"{tempo_original / tempo_compilado:6.2f}x")
+
+
+if __name__ == '__main__':
+    main()
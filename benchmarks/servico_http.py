@@ -0,0 +1,84 @@
+"""
+Benchmark - latência do serviço HTTP (utils/servico_http.py)
+
+Sobe o servidor numa porta livre com candidatos sintéticos e modelos
+treinados em features sintéticas, dispara requisições /recomendacoes por
+uma conexão persistente e compara a latência do cliente com o histograma
+do próprio serviço.
+
+Uso:
+    python benchmarks/servico_http.py [n_candidatos] [requisicoes]
+"""
+
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.comparacao import treinar_modelos
+from utils.dados_sinteticos import gerar_atributos
+from utils.features import COLUNAS_ATRIBUTOS, CHAVES_VAGA, features_dataframe
+from utils.preditor_compilado import compilar_modelos, matriz_verificacao
+from utils.servico_http import criar_estado, criar_servidor, histograma_latencias
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    requisicoes = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    warnings.filterwarnings('ignore')
+
+    rng = np.random.default_rng(0)
+    candidatos = pd.DataFrame(gerar_atributos(n, rng), columns=COLUNAS_ATRIBUTOS)
+    candidatos.insert(0, 'id', np.arange(n).astype(str))
+    candidatos['Nome Completo'] = 'Candidato ' + candidatos['id']
+
+    # Alvo sintético: área e perfil próximos com algum ruído
+    matriz = matriz_verificacao(6000, semente=1)
+    y = ((matriz[:, 2] < 10) & (matriz[:, 9] < 90) | (rng.random(len(matriz)) < 0.1)).astype(int)
+    X = features_dataframe(matriz)
+    treino = treinar_modelos(X[:5000], y[:5000], X[5000:], y[5000:])
+
+    artefatos = {
+        'versao': 'benchmark',
+        'modelos': treino['modelos'],
+        'resultados': treino['resultados'],
+        'compilados': compilar_modelos(treino['modelos'])
+    }
+
+    estado = criar_estado(candidatos, artefatos)
+    servidor = criar_servidor(estado, porta=0)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+
+    conexao = http.client.HTTPConnection('127.0.0.1', servidor.server_address[1])
+    vagas = [dict(zip(CHAVES_VAGA, linha.tolist())) for linha in gerar_atributos(requisicoes, rng)]
+
+    latencias = []
+    for vaga in vagas:
+        corpo = json.dumps({'vaga': vaga, 'k': 10})
+        inicio = time.perf_counter()
+        conexao.request('POST', '/recomendacoes', corpo, {'Content-Type': 'application/json'})
+        resposta = conexao.getresponse()
+        conteudo = resposta.read()
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        assert resposta.status == 200, conteudo
+
+    p50, p90, p99 = np.percentile(latencias[10:], [50, 90, 99])
+    print(f"📊 {n:,} candidatos • {requisicoes} requisições POST /recomendacoes (k=10)")
+    print(f"   cliente:  p50 {p50:6.2f} ms | p90 {p90:6.2f} ms | p99 {p99:6.2f} ms")
+
+    servico = histograma_latencias()['POST /recomendacoes']
+    print(f"   servidor: p50 {servico['p50_ms']:6.2f} ms | p90 {servico['p90_ms']:6.2f} ms | "
+          f"p99 {servico['p99_ms']:6.2f} ms")
+
+    servidor.shutdown()
+
+
+if __name__ == '__main__':
+    main()
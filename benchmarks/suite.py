@@ -0,0 +1,256 @@
+"""
+Benchmark - pipeline completo em dados sintéticos (utils/dados_sinteticos.py)
+
+Para cada tamanho, mede tempo de parede, CPU e pico de memória de cada
+etapa: gerar, tipar, preparar (preparar_dados_completos), dividir,
+treinar (treinar_modelos), pool e recomendar (gerar_recomendacoes).
+
+Também confere as saídas contra uma referência gravada ("golden"): hash
+das features preparadas, top k de cada vaga com scores e probabilidades e
+ROC-AUC dos modelos. Scores e ranking são comparados de forma exata;
+probabilidades e métricas com tolerância (variam com a versão das bibliotecas).
+Em todo tamanho, o caminho com pool também é comparado com o caminho sem pool
+(inteiro e em blocos).
+
+Uso:
+    python benchmarks/suite.py [--linhas 1000,10000,100000] [--vagas 20]
+                               [--referencia ARQ] [--gravar-referencia ARQ]
+                               [--saida resultados.json] [--numerico]
+
+    Milhões de linhas: use --numerico (a geração em texto guarda uma string
+    Python por célula, perto de 800 bytes por linha no pico).
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.comparacao import gerar_recomendacoes, treinar_modelos
+from utils.dados_sinteticos import gerar_abas
+from utils.dicionarios import PESOS_PADRAO, FATORES_PENALIZACAO_PADRAO
+from utils.esquema import tipar_dataframe
+from utils.features import FEATURES, CHAVES_VAGA
+from utils.perfil_execucao import medir
+from utils.pontuacao import vagas_para_matriz
+from utils.pool_candidatos import preparar_pool
+from utils.preditor_compilado import compilar_modelos
+from utils.preparacao import preparar_dados_completos, dividir_treino_teste
+
+REFERENCIA_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'referencia', 'sintetico.json')
+
+# Acima disso o treino usa uma amostra (as demais etapas usam tudo)
+MAX_LINHAS_TREINO = 500_000
+
+# Tolerância das probabilidades e métricas dos modelos na comparação
+TOLERANCIA_MODELOS = 1e-6
+
+COLUNAS_PROBABILIDADE = ['prob_lr', 'prob_rf', 'prob_xgb']
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# ETAPAS
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _hash_array(array):
+    return hashlib.sha256(np.ascontiguousarray(array).tobytes()).hexdigest()
+
+
+def _vagas_recomendacao(vagas, quantidade):
+    """As primeiras vagas da aba sem campos vazios, como dicts da sidebar"""
+    # vagas_para_matriz não imputa: campos vazios chegam como NaN
+    ids, matriz = vagas_para_matriz(vagas)
+    completas = [i for i in range(len(matriz)) if not np.isnan(matriz[i]).any()][:quantidade]
+    return [
+        {'id': str(ids[i]), **dict(zip(CHAVES_VAGA, matriz[i].tolist()))}
+        for i in completas
+    ]
+
+
+def _recomendar(candidatos, vagas, modelos, compilados, pool, k, **opcoes):
+    return [
+        gerar_recomendacoes(
+            candidatos, vaga, modelos, PESOS_PADRAO, FATORES_PENALIZACAO_PADRAO,
+            k=k, pool=pool, compilados=compilados, **opcoes
+        )
+        for vaga in vagas
+    ]
+
+
+def _resumo_top(top):
+    return {
+        'ids': top['id'].astype(str).tolist(),
+        'score_ponderado': top['score_ponderado'].astype(float).tolist(),
+        **{coluna: top[coluna].astype(float).tolist() for coluna in COLUNAS_PROBABILIDADE}
+    }
+
+
+def executar_tamanho(linhas, n_vagas, k, semente=42, como_texto=True):
+    """
+    Roda o pipeline para um tamanho (como_texto=False gera as abas já
+    numéricas: bem menos memória nos tamanhos grandes)
+
+    Returns:
+        Tupla (etapas: dict etapa -> medição, saidas: dict comparável com a
+        referência, consistente: pool e sem pool deram o mesmo top k)
+    """
+    etapas = {}
+
+    abas, etapas['gerar'] = medir(gerar_abas, linhas, semente=semente, como_texto=como_texto)
+    tipadas, etapas['tipar'] = medir(lambda: {aba: tipar_dataframe(df) for aba, df in abas.items()})
+    del abas
+
+    dados, etapas['preparar'] = medir(
+        preparar_dados_completos, tipadas['candidatos'], tipadas['vagas'], tipadas['matches'],
+        exibir_estatisticas=False
+    )
+    teste, etapas['dividir'] = medir(dividir_treino_teste, dados)
+
+    X, y = dados[FEATURES], dados['match']
+    X_train, y_train = X[~teste], y[~teste]
+    if len(X_train) > MAX_LINHAS_TREINO:
+        X_train, y_train = X_train.iloc[:MAX_LINHAS_TREINO], y_train.iloc[:MAX_LINHAS_TREINO]
+
+    treino, etapas['treinar'] = medir(treinar_modelos, X_train, y_train, X[teste], y[teste])
+    modelos = treino['modelos']
+    compilados = compilar_modelos(modelos)
+
+    candidatos = tipadas['candidatos']
+    pool, etapas['pool'] = medir(preparar_pool, candidatos)
+
+    vagas = _vagas_recomendacao(tipadas['vagas'], n_vagas)
+    tops, etapas['recomendar'] = medir(_recomendar, candidatos, vagas, modelos, compilados, pool, k)
+    etapas['recomendar']['por_vaga_ms'] = etapas['recomendar']['parede'] / max(len(vagas), 1) * 1000
+
+    # Golden interno: pool (poda/tabelas) × cálculo completo sem pool, e o
+    # mesmo cálculo em ~7 blocos (heap de k) × num bloco só (top_k_indices)
+    sem_pool = _recomendar(candidatos, vagas[:3], modelos, compilados, None, k)
+    em_blocos = _recomendar(
+        candidatos, vagas[:3], modelos, compilados, None, k,
+        tamanho_bloco=max(len(candidatos) // 7, 1)
+    )
+    consistente = all(
+        a['id'].tolist() == b['id'].tolist() == c['id'].tolist()
+        and np.array_equal(a['score_ponderado'].to_numpy(), b['score_ponderado'].to_numpy())
+        and np.array_equal(a['score_ponderado'].to_numpy(), c['score_ponderado'].to_numpy())
+        for a, b, c in zip(tops, sem_pool, em_blocos)
+    )
+
+    saidas = {
+        'preparar': {
+            'linhas': int(len(dados)),
+            'hash': _hash_array(dados[FEATURES + ['match']].to_numpy(dtype=np.float64))
+        },
+        'dividir': {'teste': int(teste.sum()), 'hash': _hash_array(np.asarray(teste))},
+        'treinar': {
+            linha['Modelo']: float(linha['ROC-AUC'])
+            for linha in treino['resultados'].to_dict(orient='records')
+        },
+        'recomendacoes': {vaga['id']: _resumo_top(top) for vaga, top in zip(vagas, tops)}
+    }
+
+    return etapas, saidas, consistente
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# COMPARAÇÃO COM A REFERÊNCIA
+# ═══════════════════════════════════════════════════════════════════════════
+
+def comparar_com_referencia(saidas, referencia):
+    """
+    Returns:
+        Lista de divergências (vazia = igual à referência)
+    """
+    divergencias = []
+
+    for etapa in ('preparar', 'dividir'):
+        if saidas[etapa] != referencia[etapa]:
+            divergencias.append(f'{etapa}: {saidas[etapa]} != {referencia[etapa]}')
+
+    for modelo, roc_auc in referencia['treinar'].items():
+        if abs(saidas['treinar'].get(modelo, np.nan) - roc_auc) > TOLERANCIA_MODELOS:
+            divergencias.append(f"treinar: ROC-AUC {modelo} {saidas['treinar'].get(modelo)} != {roc_auc}")
+
+    for vaga, esperado in referencia['recomendacoes'].items():
+        obtido = saidas['recomendacoes'].get(vaga)
+        if obtido is None:
+            divergencias.append(f'recomendar: vaga {vaga} ausente')
+            continue
+        if obtido['ids'] != esperado['ids']:
+            divergencias.append(f'recomendar: ranking da vaga {vaga} mudou')
+        elif obtido['score_ponderado'] != esperado['score_ponderado']:
+            divergencias.append(f'recomendar: score_ponderado da vaga {vaga} mudou')
+        for coluna in COLUNAS_PROBABILIDADE:
+            if not np.allclose(obtido[coluna], esperado[coluna], rtol=0, atol=TOLERANCIA_MODELOS):
+                divergencias.append(f'recomendar: {coluna} da vaga {vaga} mudou')
+
+    return divergencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do pipeline em dados sintéticos')
+    parser.add_argument('--linhas', default='1000,10000,100000',
+                        help='Tamanhos (linhas de candidatos e de matches), separados por vírgula')
+    parser.add_argument('--vagas', type=int, default=20, help='Vagas recomendadas por tamanho')
+    parser.add_argument('-k', type=int, default=10)
+    parser.add_argument('--numerico', action='store_true',
+                        help='Abas geradas já numéricas (menos memória; para milhões de linhas)')
+    parser.add_argument('--referencia', default=REFERENCIA_PADRAO, help='Arquivo golden para comparar')
+    parser.add_argument('--gravar-referencia', default=None, help='Grava as saídas como golden')
+    parser.add_argument('--saida', default=None, help='Grava as medições em JSON')
+    args = parser.parse_args()
+    warnings.filterwarnings('ignore')
+
+    referencia = {}
+    if args.referencia and os.path.exists(args.referencia):
+        with open(args.referencia, 'r', encoding='utf-8') as f:
+            referencia = json.load(f)
+
+    medicoes, goldens, falhas = {}, {}, 0
+
+    for linhas in [int(valor.replace('_', '')) for valor in args.linhas.split(',')]:
+        etapas, saidas, consistente = executar_tamanho(
+            linhas, args.vagas, args.k, como_texto=not args.numerico
+        )
+        medicoes[str(linhas)] = etapas
+        goldens[str(linhas)] = saidas
+
+        print(f"\n📊 {linhas:,} linhas")
+        print(f"   {'etapa':<12}{'parede (s)':>12}{'CPU (s)':>10}{'pico (MB)':>11}")
+        for etapa, medicao in etapas.items():
+            pico = medicao['memoria_pico_mb']
+            print(f"   {etapa:<12}{medicao['parede']:>12.3f}{medicao['cpu']:>10.3f}"
+                  f"{pico if pico is not None else float('nan'):>11.1f}")
+        print(f"   recomendar: {etapas['recomendar']['por_vaga_ms']:.2f} ms por vaga")
+
+        print(f"   pool × sem pool: {'✅ iguais' if consistente else '❌ diferentes'}")
+        falhas += not consistente
+
+        if str(linhas) in referencia:
+            divergencias = comparar_com_referencia(saidas, referencia[str(linhas)])
+            falhas += bool(divergencias)
+            print(f"   referência: {'✅ igual' if not divergencias else '❌ divergente'}")
+            for divergencia in divergencias[:10]:
+                print(f"      - {divergencia}")
+
+    if args.gravar_referencia:
+        os.makedirs(os.path.dirname(os.path.abspath(args.gravar_referencia)), exist_ok=True)
+        with open(args.gravar_referencia, 'w', encoding='utf-8') as f:
+            json.dump(goldens, f, ensure_ascii=False, indent=1)
+        print(f"\n💾 Referência gravada em {args.gravar_referencia}")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(medicoes, f, ensure_ascii=False, indent=2)
+
+    sys.exit(1 if falhas else 0)
+
+
+if __name__ == '__main__':
+    main()
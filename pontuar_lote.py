@@ -0,0 +1,308 @@
+"""
+Pontuação em lote (sem Streamlit): top k de candidatos para cada vaga
+de um arquivo, com o score de negócio de gerar_recomendacoes e as
+probabilidades dos modelos salvos no registro
+
+As vagas são divididas entre processos; cada processo recebe uma única vez
+os modelos, o id e o nome dos candidatos e o pool sem os arrays do armazém
+(atributos e índices), que ele mapeia do mesmo arquivo.
+
+Uso:
+    python pontuar_lote.py vagas.csv --saida top_k.parquet [-k 10] [--processos 4]
+                           [--candidatos candidatos.csv] [--pesos pesos.json]
+                           [--versao ID_DA_VERSAO]
+
+O arquivo de vagas (CSV, Parquet, Excel ou JSON) pode vir no formato do app
+(codigo_area, codigo_cargo, ..., autoridade, ..., formalidade, id opcional)
+ou no formato da aba 'vagas' (mesmas colunas dos candidatos, ID_vaga).
+Sem --candidatos, usa os snapshots locais das abas (ou o Google Sheets).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+warnings.filterwarnings('ignore')
+
+import numpy as np
+import pandas as pd
+
+from utils.armazem_atributos import DIRETORIO_ARMAZEM, fixar_arquivo
+from utils.comparacao import gerar_recomendacoes
+from utils.dicionarios import PESOS_PADRAO, FATORES_PENALIZACAO_PADRAO
+from utils.esquema import tipar_dataframe
+from utils.features import CHAVES_VAGA, COLUNAS_ATRIBUTOS
+from utils.google_sheets import carregar_abas_com_snapshot
+from utils.pontuacao import vagas_para_matriz
+from utils.pool_candidatos import preparar_pool, pool_para_processos, restaurar_pool
+from utils.registro_modelos import calcular_fingerprint, calcular_fingerprint_abas, carregar_versao
+
+# Mesma planilha do app.py
+PLANILHA_ID = "1tM1LSnFLlp_CF8yAWFE0w6r1qTV9Smy_mvDx0Wx1x-U"
+ABAS = ['candidatos', 'vagas', 'matches']
+
+# Vagas por tarefa enviada a um processo
+VAGAS_POR_TAREFA = 16
+
+# Colunas do resultado, além de id_vaga, posicao, id e Nome Completo
+COLUNAS_SAIDA = [
+    'score_ponderado', 'score_area', 'score_perfil', 'score_cargo',
+    'score_formacao', 'score_idade', 'score_regime',
+    'prob_lr', 'prob_rf', 'prob_xgb'
+]
+
+# Estado de cada processo (preenchido por _iniciar_processo)
+_contexto = {}
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# LEITURA
+# ═══════════════════════════════════════════════════════════════════════════
+
+def ler_tabela(caminho):
+    """CSV, Parquet, Excel ou JSON (lista de objetos) em DataFrame"""
+    extensao = os.path.splitext(caminho)[1].lower()
+
+    if extensao == '.parquet':
+        return pd.read_parquet(caminho)
+    if extensao in ('.xlsx', '.xls'):
+        return pd.read_excel(caminho)
+    if extensao == '.json':
+        with open(caminho, 'r', encoding='utf-8') as f:
+            conteudo = json.load(f)
+        return pd.DataFrame(conteudo['vagas'] if isinstance(conteudo, dict) else conteudo)
+
+    return pd.read_csv(caminho, dtype=str)
+
+
+def ler_vagas(caminho):
+    """
+    Lê o arquivo de vagas
+
+    Vagas com algum campo vazio ou não numérico ficam de fora (o score
+    com NaN não ordena os candidatos) e são devolvidas à parte.
+
+    Returns:
+        Tupla (lista de dicts no formato da vaga do app, com 'id';
+        lista de {'id', 'campos'} das vagas ignoradas)
+    """
+    df = ler_tabela(caminho)
+
+    if all(chave in df.columns for chave in CHAVES_VAGA):
+        coluna_id = next((c for c in ('id', 'ID_vaga', 'id_vaga') if c in df.columns), None)
+        ids = df[coluna_id].tolist() if coluna_id else list(range(len(df)))
+        matriz = df[CHAVES_VAGA].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+    elif all(coluna in df.columns for coluna in COLUNAS_ATRIBUTOS):
+        # Formato da aba 'vagas': colunas cruas convertidas uma a uma (para_float64),
+        # sem imputar; campo vazio continua NaN e a vaga é ignorada abaixo
+        ids, matriz = vagas_para_matriz(df)
+    else:
+        sys.exit(f"❌ {caminho}: colunas esperadas {', '.join(CHAVES_VAGA)} "
+                 "(ou as colunas da aba 'vagas')")
+
+    vagas = []
+    ignoradas = []
+    for id_vaga, linha in zip(ids, matriz):
+        vazios = [chave for chave, valor in zip(CHAVES_VAGA, linha) if np.isnan(valor)]
+        if vazios:
+            ignoradas.append({'id': id_vaga, 'campos': vazios})
+        else:
+            vagas.append({'id': id_vaga, **dict(zip(CHAVES_VAGA, linha.tolist()))})
+
+    return vagas, ignoradas
+
+
+def ler_pesos(caminho):
+    """Pesos de um JSON em porcentagem (soma 100, como no app) ou fração"""
+    if caminho is None:
+        return PESOS_PADRAO
+
+    with open(caminho, 'r', encoding='utf-8') as f:
+        pesos = {aspecto: float(valor) for aspecto, valor in json.load(f).items()}
+
+    faltando = [aspecto for aspecto in PESOS_PADRAO if aspecto not in pesos]
+    if faltando:
+        sys.exit(f"❌ Pesos ausentes: {', '.join(faltando)}")
+
+    soma = sum(pesos[aspecto] for aspecto in PESOS_PADRAO)
+    if abs(soma - 100) <= 1:
+        return {aspecto: pesos[aspecto] / 100 for aspecto in PESOS_PADRAO}
+    if abs(soma - 1) > 0.01:
+        sys.exit("❌ A soma dos pesos deve ser 100% (ou 1.0)")
+    return {aspecto: pesos[aspecto] for aspecto in PESOS_PADRAO}
+
+
+def carregar_candidatos_e_modelos(caminho_candidatos, versao_id):
+    """
+    Candidatos do arquivo ou dos snapshots e a versão de modelos a usar
+
+    Com os snapshots, prefere a versão treinada exatamente com esses dados;
+    senão usa a versão ativa do registro (ou a indicada em --versao).
+    """
+    fingerprint = None
+
+    if caminho_candidatos:
+        candidatos = tipar_dataframe(ler_tabela(caminho_candidatos))
+    else:
+        abas = carregar_abas_com_snapshot(PLANILHA_ID, ABAS)['abas']
+        faltando = [aba for aba, df in abas.items() if df is None]
+        if faltando:
+            sys.exit(f"❌ Erro ao carregar as abas: {', '.join(faltando)}")
+        abas = {aba: tipar_dataframe(df) for aba, df in abas.items()}
+        candidatos = abas['candidatos']
+        fingerprint = calcular_fingerprint(abas['candidatos'], abas['vagas'], abas['matches'])
+
+    if versao_id is not None:
+        artefatos = carregar_versao(versao_id=versao_id)
+    else:
+        artefatos = (fingerprint and carregar_versao(fingerprint)) or carregar_versao()
+
+    if artefatos is None:
+        sys.exit("❌ Nenhuma versão de modelos no registro (treine pelo app ou pelo servidor.py)")
+
+    return candidatos, fingerprint, artefatos
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# PONTUAÇÃO
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _iniciar_processo(candidatos, pool, modelos, compilados, pesos, k):
+    # Atributos e índices do armazém: cada processo mapeia o mesmo arquivo (sem cópia)
+    _contexto.update(
+        candidatos=candidatos, pool=restaurar_pool(pool, candidatos), modelos=modelos,
+        compilados=compilados, pesos=pesos, k=k
+    )
+
+
+def _pontuar_vagas(vagas):
+    """Top k de cada vaga de uma tarefa, num único DataFrame"""
+    tops = []
+
+    for vaga in vagas:
+        top = gerar_recomendacoes(
+            _contexto['candidatos'], vaga, _contexto['modelos'], _contexto['pesos'],
+            FATORES_PENALIZACAO_PADRAO, k=_contexto['k'], pool=_contexto['pool'],
+            compilados=_contexto['compilados']
+        )
+
+        saida = pd.DataFrame({
+            'id_vaga': vaga['id'],
+            'posicao': np.arange(1, len(top) + 1),
+            'id': top['id'].to_numpy() if 'id' in top.columns else top.index.to_numpy(),
+            'Nome Completo': top['Nome Completo'].to_numpy() if 'Nome Completo' in top.columns else None
+        })
+        for coluna in COLUNAS_SAIDA:
+            saida[coluna] = top[coluna].to_numpy()
+        tops.append(saida)
+
+    return pd.concat(tops, ignore_index=True) if tops else pd.DataFrame()
+
+
+def pontuar_lote(candidatos, vagas, artefatos, pesos, k=10, processos=None, pool=None):
+    """
+    Top k de candidatos para cada vaga
+
+    Args:
+        candidatos: DataFrame com candidatos (tipado)
+        vagas: Lista de dicts de vaga (com 'id')
+        artefatos: Versão de modelos (carregar_versao)
+        pesos: dict com pesos de cada aspecto (fração)
+        k: Candidatos por vaga
+        processos: Processos do pool (padrão: os.cpu_count(); 1 = sem pool)
+        pool: Pool de preparar_pool (montado aqui se não informado, com os
+              atributos no armazém mapeado compartilhado pelos processos)
+
+    Returns:
+        DataFrame com id_vaga, posicao, id, Nome Completo, scores e
+        probabilidades, na ordem das vagas
+    """
+    if pool is None:
+        versao = calcular_fingerprint_abas({'candidatos': candidatos})
+        pool = preparar_pool(candidatos, versao, DIRETORIO_ARMAZEM)
+    processos = processos or os.cpu_count() or 1
+    tarefas = [vagas[i:i + VAGAS_POR_TAREFA] for i in range(0, len(vagas), VAGAS_POR_TAREFA)]
+
+    if processos <= 1 or len(tarefas) <= 1:
+        _iniciar_processo(candidatos, pool, artefatos['modelos'], artefatos.get('compilados'), pesos, k)
+        partes = [_pontuar_vagas(tarefa) for tarefa in tarefas]
+    else:
+        # A saída só usa id e nome: o resto das colunas não vai para os processos
+        colunas = [coluna for coluna in ('id', 'Nome Completo') if coluna in candidatos.columns]
+        argumentos = (
+            candidatos[colunas], pool_para_processos(pool, indice_perfil=False),
+            artefatos['modelos'], artefatos.get('compilados'), pesos, k
+        )
+
+        # Fixado: outro processo publicando versões não remove o arquivo
+        # antes de os workers o abrirem
+        fixacao = fixar_arquivo(pool['arquivo']) if pool.get('arquivo') else nullcontext()
+
+        with fixacao, ProcessPoolExecutor(
+            max_workers=min(processos, len(tarefas)),
+            initializer=_iniciar_processo, initargs=argumentos
+        ) as executor:
+            # map preserva a ordem das vagas
+            partes = list(executor.map(_pontuar_vagas, tarefas))
+
+    if not partes:
+        return pd.DataFrame(columns=['id_vaga', 'posicao', 'id', 'Nome Completo'] + COLUNAS_SAIDA)
+
+    return pd.concat(partes, ignore_index=True)
+
+
+def salvar_resultado(resultado, caminho):
+    """Grava em Parquet (.parquet) ou CSV (demais extensões)"""
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+
+    if caminho.lower().endswith('.parquet'):
+        resultado.to_parquet(caminho, index=False)
+    else:
+        resultado.to_csv(caminho, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Top k de candidatos para cada vaga de um arquivo')
+    parser.add_argument('vagas', help='Arquivo de vagas (CSV, Parquet, Excel ou JSON)')
+    parser.add_argument('--saida', required=True, help='Arquivo de saída (.csv ou .parquet)')
+    parser.add_argument('-k', type=int, default=10, help='Candidatos por vaga (padrão: 10)')
+    parser.add_argument('--processos', type=int, default=None, help='Processos (padrão: núcleos)')
+    parser.add_argument('--candidatos', default=None, help='Arquivo de candidatos (padrão: snapshots)')
+    parser.add_argument('--pesos', default=None, help='JSON com os pesos (padrão: PESOS_PADRAO)')
+    parser.add_argument('--versao', default=None, help='Versão de modelos do registro (padrão: ativa)')
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    vagas, ignoradas = ler_vagas(args.vagas)
+    if ignoradas:
+        print(f"⚠️ {len(ignoradas):,} vagas com campos vazios ignoradas:")
+        for vaga in ignoradas[:10]:
+            print(f"   {vaga['id']}: {', '.join(vaga['campos'])}")
+        if len(ignoradas) > 10:
+            print(f"   ... e mais {len(ignoradas) - 10:,}")
+    if not vagas:
+        sys.exit("❌ Nenhuma vaga completa no arquivo")
+    pesos = ler_pesos(args.pesos)
+    candidatos, _, artefatos = carregar_candidatos_e_modelos(args.candidatos, args.versao)
+    carregamento = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    resultado = pontuar_lote(candidatos, vagas, artefatos, pesos, args.k, args.processos)
+    pontuacao = time.perf_counter() - inicio
+
+    salvar_resultado(resultado, args.saida)
+
+    print(f"✅ {len(vagas):,} vagas × {len(candidatos):,} candidatos "
+          f"(modelos {artefatos.get('versao')}) -> {args.saida}")
+    print(f"⏱️ Carregamento {carregamento:.1f} s • pontuação {pontuacao:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Registro de modelos pela linha de comando: lista as versões e faz rollback
+
+Uma versão ativada aqui fica fixada: o app, o servidor.py (no próximo
+intervalo ou em POST /recarregar) e o pontuar_lote.py passam a usá-la
+para quaisquer dados, e novos treinos não a substituem até o liberar.
+
+Uso:
+    python registro.py listar
+    python registro.py ativar ID_DA_VERSAO
+    python registro.py liberar
+"""
+
+import argparse
+import sys
+
+from utils.registro_modelos import DIRETORIO_REGISTRO, ativar_versao, liberar_versao, listar_versoes
+
+
+def listar(diretorio):
+    versoes = listar_versoes(diretorio)
+    if not versoes:
+        print("Nenhuma versão no registro")
+        return
+
+    for versao in reversed(versoes):
+        marca = '📌' if versao['fixada'] else ('✅' if versao['ativa'] else '  ')
+        print(f"{marca} {versao['id']}  criada em {versao['criado_em']}  "
+              f"dados {versao['fingerprint'][:12]}  (treino {versao.get('origem', '-')})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Versões de modelos do registro')
+    parser.add_argument('--diretorio', default=DIRETORIO_REGISTRO, help='Pasta do registro')
+    comandos = parser.add_subparsers(dest='comando', required=True)
+    comandos.add_parser('listar', help='Lista as versões (✅ ativa, 📌 ativa fixada)')
+    ativar = comandos.add_parser('ativar', help='Ativa e fixa uma versão (rollback)')
+    ativar.add_argument('versao', help='Id da versão (veja listar)')
+    comandos.add_parser('liberar', help='Volta a usar a versão treinada com os dados atuais')
+    args = parser.parse_args()
+
+    if args.comando == 'listar':
+        listar(args.diretorio)
+    elif args.comando == 'ativar':
+        if not ativar_versao(args.versao, args.diretorio):
+            sys.exit(f"❌ Versão {args.versao} não está no registro (veja: python registro.py listar)")
+        print(f"📌 Versão {args.versao} ativa e fixada")
+    else:
+        if liberar_versao(args.diretorio):
+            print("✅ Versão liberada: volta a valer a versão treinada com os dados atuais")
+        else:
+            print("Nenhuma versão fixada")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""
+Serviço HTTP de recomendações (sem Streamlit)
+
+Carrega os dados (snapshot local ou Google Sheets) e a versão de modelos
+do registro e atende JSON (rotas em utils/servico_http.py). Sem modelos
+para os dados atuais, treina antes de começar a atender. A cada
+INTERVALO_ATUALIZACAO os snapshots são sincronizados com a planilha e,
+se os dados mudaram, o estado é trocado sem parar o servidor; com os
+mesmos dados, aplica a versão fixada por registro.py (rollback).
+
+Uso:
+    python servidor.py [--host 127.0.0.1] [--porta 8000]
+
+Exemplo:
+    curl -X POST localhost:8000/recomendacoes -d '{"vaga": {"codigo_area": 1, ...}, "k": 10}'
+"""
+
+import argparse
+import sys
+import threading
+import time
+import warnings
+
+warnings.filterwarnings('ignore')
+
+from utils.esquema import tipar_dataframe
+from utils.google_sheets import (
+    INTERVALO_ATUALIZACAO, carregar_abas_com_snapshot, atualizar_snapshots_em_segundo_plano
+)
+from utils.registro_modelos import calcular_fingerprint, carregar_versao
+from utils.servico_http import criar_estado, criar_servidor, recarregar_modelos
+from utils.snapshot import MODO_OFFLINE, versao_snapshots
+from utils.tarefas_treino import status_tarefa, submeter_treino
+
+# Mesma planilha do app.py
+PLANILHA_ID = "1tM1LSnFLlp_CF8yAWFE0w6r1qTV9Smy_mvDx0Wx1x-U"
+ABAS = ['candidatos', 'vagas', 'matches']
+
+
+def carregar_dados():
+    """Abas tipadas como no app; RuntimeError se alguma faltar"""
+    abas = carregar_abas_com_snapshot(PLANILHA_ID, ABAS)['abas']
+
+    faltando = [aba for aba, df in abas.items() if df is None]
+    if faltando:
+        raise RuntimeError(f"Erro ao carregar as abas: {', '.join(faltando)}")
+
+    return {aba: tipar_dataframe(df) for aba, df in abas.items()}
+
+
+def obter_modelos(dados, fingerprint):
+    """Versão do registro para esses dados; treina (e espera) se não houver
+
+    Raises:
+        RuntimeError: se o treinamento falhar
+    """
+    artefatos = carregar_versao(fingerprint)
+    if artefatos is not None:
+        return artefatos
+
+    tarefa_id = submeter_treino(fingerprint, dados['candidatos'], dados['vagas'], dados['matches'])
+    print(f"⏳ Treinando modelos (tarefa {tarefa_id})...")
+
+    while True:
+        tarefa = status_tarefa(tarefa_id)
+        if tarefa['status'] in ('concluida', 'erro'):
+            break
+        time.sleep(0.5)
+
+    if tarefa['status'] == 'erro':
+        raise RuntimeError(f"Erro no treinamento:\n{tarefa['erro']}")
+
+    return carregar_versao(versao_id=tarefa['versao_id'])
+
+
+def montar_estado():
+    """Dados, modelos e estado do serviço para os snapshots atuais"""
+    dados = carregar_dados()
+    fingerprint = calcular_fingerprint(dados['candidatos'], dados['vagas'], dados['matches'])
+    artefatos = obter_modelos(dados, fingerprint)
+    return criar_estado(dados['candidatos'], artefatos, fingerprint)
+
+
+def atualizar_periodicamente(servidor, intervalo=INTERVALO_ATUALIZACAO):
+    """
+    Sincroniza os snapshots a cada intervalo e troca o estado do servidor
+    quando eles mudam (roda em thread)
+
+    A troca é uma única atribuição no manipulador: cada requisição lê o
+    estado uma vez e termina com a versão que já tinha em mãos.
+    """
+    versao = versao_snapshots(PLANILHA_ID, ABAS)
+
+    while True:
+        time.sleep(intervalo)
+        try:
+            thread = atualizar_snapshots_em_segundo_plano(PLANILHA_ID, ABAS, forcar=True)
+            if thread is not None:
+                thread.join()
+
+            nova_versao = versao_snapshots(PLANILHA_ID, ABAS)
+            if nova_versao == versao:
+                # Mesmos dados: ainda aplica um rollback feito no registro (registro.py)
+                troca = recarregar_modelos(servidor.RequestHandlerClass.estado)
+                if troca['trocou']:
+                    print(f"🔄 Modelos {troca['anterior']} -> {troca['versao']}")
+                continue
+
+            anterior = servidor.RequestHandlerClass.estado
+            estado = montar_estado()
+            estado['iniciado_em'] = anterior['iniciado_em']
+            servidor.RequestHandlerClass.estado = estado
+            versao = nova_versao
+            print(f"🔄 Dados atualizados • modelos {estado['artefatos'].get('versao')} • "
+                  f"{len(estado['candidatos']):,} candidatos")
+
+        except Exception as e:
+            # Segue atendendo com o estado anterior; tenta de novo no próximo intervalo
+            print(f"⚠️ Atualização dos dados falhou: {str(e)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serviço HTTP de recomendações')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=8000)
+    args = parser.parse_args()
+
+    try:
+        estado = montar_estado()
+    except RuntimeError as e:
+        sys.exit(f"❌ {e}")
+
+    servidor = criar_servidor(estado, args.host, args.porta)
+
+    if not MODO_OFFLINE:
+        threading.Thread(
+            target=atualizar_periodicamente, args=(servidor,),
+            name='atualizacao-dados', daemon=True
+        ).start()
+
+    print(f"✅ Modelos {estado['artefatos'].get('versao')} • {len(estado['candidatos']):,} candidatos")
+    print(f"🌐 Atendendo em http://{args.host}:{servidor.server_address[1]}")
+
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == '__main__':
+    main()
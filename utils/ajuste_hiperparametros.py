@@ -0,0 +1,279 @@
+"""
+Módulo de ajuste de hiperparâmetros do RF e do XGBoost
+(successive halving com orçamento de tempo e parada antecipada)
+"""
+
+import json
+import os
+import time
+import uuid
+from datetime import datetime
+
+import numpy as np
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+
+from utils.comparacao import CRIADORES_MODELOS, HIPERPARAMETROS_PADRAO, orcamento_threads
+from utils.registro_modelos import DIRETORIO_REGISTRO
+
+
+ARQUIVO_HIPERPARAMETROS = 'hiperparametros.json'
+
+# Orçamento padrão de tempo de parede para a busca (segundos, RF + XGB)
+ORCAMENTO_PADRAO_SEGUNDOS = 120
+
+# Modo de ajuste: com MATCH_AJUSTE_SEGUNDOS > 0 cada novo treino busca hiperparâmetros
+# com esse orçamento; sem ele, o treino só reutiliza os vencedores salvos
+try:
+    ORCAMENTO_AJUSTE_AMBIENTE = float(os.environ.get('MATCH_AJUSTE_SEGUNDOS', '0') or 0)
+except ValueError:
+    ORCAMENTO_AJUSTE_AMBIENTE = 0.0
+
+# A cada rodada sobra 1/FATOR_DESCARTE das configurações, com FATOR_DESCARTE vezes mais dados
+FATOR_DESCARTE = 3
+CONFIGURACOES_POR_MODELO = 9
+
+# Menor quantidade de linhas de treino usada na primeira rodada
+LINHAS_MINIMAS_RODADA = 200
+
+# Configurações até essa distância do melhor ROC-AUC empatam; vence a de treino mais rápido
+TOLERANCIA_ROC_AUC = 0.005
+
+# XGBoost: limite de rodadas e paciência da parada antecipada na validação
+RODADAS_MAXIMAS_XGB = 600
+PACIENCIA_XGB = 30
+
+ESPACO_BUSCA = {
+    'RF': {
+        'n_estimators': [50, 100, 200],
+        'max_depth': [6, 10, 14, None],
+        'min_samples_leaf': [1, 2, 5],
+        'max_features': ['sqrt', 0.5, None]
+    },
+    'XGB': {
+        'max_depth': [3, 4, 6, 8],
+        'learning_rate': [0.03, 0.1, 0.3],
+        'subsample': [0.7, 0.85, 1.0],
+        'colsample_bytree': [0.7, 1.0],
+        'min_child_weight': [1, 5]
+    }
+}
+
+
+def _sortear_configuracoes(chave, quantidade, rng):
+    """Configurações aleatórias do espaço; a primeira é sempre a padrão"""
+    espaco = ESPACO_BUSCA[chave]
+    configuracoes = [dict(HIPERPARAMETROS_PADRAO[chave])]
+    vistas = {json.dumps(configuracoes[0], sort_keys=True)}
+
+    tentativas = 0
+    while len(configuracoes) < quantidade and tentativas < quantidade * 20:
+        tentativas += 1
+        configuracao = {
+            parametro: valores[rng.integers(len(valores))]
+            for parametro, valores in espaco.items()
+        }
+        configuracao = {
+            p: (v.item() if isinstance(v, np.generic) else v) for p, v in configuracao.items()
+        }
+        assinatura = json.dumps(configuracao, sort_keys=True)
+        if assinatura not in vistas:
+            vistas.add(assinatura)
+            configuracoes.append(configuracao)
+
+    return configuracoes
+
+
+def _avaliar_configuracao(chave, params, X_fit, y_fit, X_val, y_val, n_threads):
+    """
+    ROC-AUC na validação e tempo de treino; no XGB usa parada antecipada
+    e devolve também as rodadas úteis
+    """
+    inicio = time.perf_counter()
+    if chave == 'XGB':
+        params = {
+            **params,
+            'n_estimators': RODADAS_MAXIMAS_XGB,
+            'early_stopping_rounds': PACIENCIA_XGB,
+            # Para na mesma métrica usada para escolher a configuração
+            'eval_metric': 'auc'
+        }
+        modelo = CRIADORES_MODELOS[chave](y_fit, n_threads, params)
+        modelo.fit(X_fit, y_fit, eval_set=[(X_val, y_val)], verbose=False)
+        rodadas = modelo.best_iteration + 1
+    else:
+        modelo = CRIADORES_MODELOS[chave](y_fit, n_threads, params)
+        modelo.fit(X_fit, y_fit)
+        rodadas = None
+
+    tempo = time.perf_counter() - inicio
+    return roc_auc_score(y_val, modelo.predict_proba(X_val)[:, 1]), tempo, rodadas
+
+
+def _successive_halving(chave, X_fit, y_fit, X_val, y_val, orcamento_segundos, n_threads, rng):
+    """
+    Rodadas com cada vez mais linhas de treino e cada vez menos configurações
+
+    Returns:
+        Dict com 'params' vencedores, 'roc_auc' na validação, 'avaliacoes' e 'rodadas'
+    """
+    inicio = time.perf_counter()
+    configuracoes = _sortear_configuracoes(chave, CONFIGURACOES_POR_MODELO, rng)
+    padrao = configuracoes[0]
+
+    n_rodadas = max(1, int(np.ceil(np.log(len(configuracoes)) / np.log(FATOR_DESCARTE))) + 1)
+    ordem = rng.permutation(len(X_fit))
+
+    melhor = {'params': configuracoes[0], 'roc_auc': None, 'linhas': 0}
+    avaliacoes = 0
+    rodadas_executadas = 0
+
+    for rodada in range(n_rodadas):
+        linhas = len(X_fit) // FATOR_DESCARTE ** (n_rodadas - 1 - rodada)
+        linhas = min(len(X_fit), max(linhas, LINHAS_MINIMAS_RODADA))
+        indices = ordem[:linhas]
+        X_rodada, y_rodada = X_fit.iloc[indices], y_fit.iloc[indices]
+
+        # Sem as duas classes não dá para treinar nessa fatia
+        if y_rodada.nunique() < 2:
+            continue
+
+        pontuadas = []
+        for params in configuracoes:
+            # Orçamento conferido a cada configuração, inclusive na primeira rodada;
+            # pelo menos uma (a padrão, sorteada primeiro) é sempre avaliada
+            if avaliacoes > 0 and time.perf_counter() - inicio > orcamento_segundos:
+                break
+            roc_auc, tempo, rodadas_xgb = _avaliar_configuracao(
+                chave, params, X_rodada, y_rodada, X_val, y_val, n_threads
+            )
+            avaliacoes += 1
+            pontuadas.append((roc_auc, tempo, params, rodadas_xgb))
+
+        if not pontuadas:
+            break
+
+        rodadas_executadas += 1
+        # Ordenação estável: em empate fica a configuração sorteada antes (a padrão primeiro)
+        pontuadas.sort(key=lambda item: -item[0])
+
+        # Só as rodadas com mais dados substituem o vencedor
+        if linhas >= melhor['linhas']:
+            empatadas = [item for item in pontuadas if item[0] >= pontuadas[0][0] - TOLERANCIA_ROC_AUC]
+            roc_auc, _, params, rodadas_xgb = min(empatadas, key=lambda item: item[1])
+            if rodadas_xgb is not None:
+                params = {**params, 'n_estimators': int(rodadas_xgb)}
+            melhor = {'params': params, 'roc_auc': float(roc_auc), 'linhas': linhas}
+
+        configuracoes = [item[2] for item in pontuadas[:max(1, len(pontuadas) // FATOR_DESCARTE)]]
+        if padrao not in configuracoes and any(item[2] is padrao for item in pontuadas):
+            # A configuração padrão segue até o fim como referência de custo
+            configuracoes.append(padrao)
+        if len(pontuadas) <= 1 or time.perf_counter() - inicio > orcamento_segundos:
+            break
+
+    if chave == 'XGB' and melhor['linhas'] < len(X_fit):
+        # Rodadas da parada antecipada crescem com os dados: escala proporcional
+        escala = len(X_fit) / max(melhor['linhas'], 1)
+        melhor['params'] = {
+            **melhor['params'],
+            'n_estimators': int(min(RODADAS_MAXIMAS_XGB, round(melhor['params']['n_estimators'] * escala)))
+        }
+
+    return {
+        'params': melhor['params'],
+        'roc_auc': melhor['roc_auc'],
+        'avaliacoes': avaliacoes,
+        'rodadas': rodadas_executadas
+    }
+
+
+def ajustar_hiperparametros(X_train, y_train, orcamento_segundos=ORCAMENTO_PADRAO_SEGUNDOS,
+                            proporcao_validacao=0.2, semente=42, n_cpus=None):
+    """
+    Busca hiperparâmetros para RF e XGBoost dentro de um orçamento de tempo
+
+    Separa uma validação estratificada do treino (o teste não é tocado),
+    roda successive halving em cada modelo com metade do orçamento e usa
+    parada antecipada no XGBoost para definir n_estimators.
+
+    Args:
+        X_train, y_train: Dados de treino (os mesmos de treinar_modelos)
+        orcamento_segundos: Tempo de parede total da busca
+        proporcao_validacao: Fração do treino usada como validação
+        semente: Semente do sorteio das configurações e da validação
+        n_cpus: Núcleos disponíveis (padrão: os.cpu_count())
+
+    Returns:
+        Dict 'RF'/'XGB' -> parâmetros vencedores, mais 'detalhes'
+        (ROC-AUC de validação, avaliações e tempo de cada busca)
+    """
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        X_train, y_train, test_size=proporcao_validacao,
+        random_state=semente, stratify=y_train
+    )
+    rng = np.random.default_rng(semente)
+    orcamento = orcamento_threads(n_cpus)
+    n_threads = orcamento['RF'] + orcamento['XGB']
+
+    vencedores = {}
+    detalhes = {}
+
+    for chave in ('RF', 'XGB'):
+        inicio = time.perf_counter()
+        resultado = _successive_halving(
+            chave, X_fit, y_fit, X_val, y_val, orcamento_segundos / 2, n_threads, rng
+        )
+        vencedores[chave] = resultado['params']
+        detalhes[chave] = {
+            'roc_auc_validacao': resultado['roc_auc'],
+            'avaliacoes': resultado['avaliacoes'],
+            'rodadas': resultado['rodadas'],
+            'segundos': round(time.perf_counter() - inicio, 3)
+        }
+
+    vencedores['detalhes'] = detalhes
+    return vencedores
+
+
+def salvar_hiperparametros(hiperparametros, fingerprint=None, diretorio=DIRETORIO_REGISTRO):
+    """
+    Grava os hiperparâmetros vencedores (substitui os anteriores)
+
+    Returns:
+        Caminho do arquivo gravado
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    caminho = os.path.join(diretorio, ARQUIVO_HIPERPARAMETROS)
+    temporario = f'{caminho}.{uuid.uuid4().hex}.tmp'
+
+    conteudo = {
+        **hiperparametros,
+        'fingerprint': fingerprint,
+        'ajustado_em': datetime.now().isoformat(timespec='seconds')
+    }
+
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(conteudo, f, ensure_ascii=False, indent=2)
+
+    os.replace(temporario, caminho)
+    return caminho
+
+
+def carregar_hiperparametros(diretorio=DIRETORIO_REGISTRO):
+    """
+    Lê os hiperparâmetros salvos
+
+    Returns:
+        Dict 'RF'/'XGB' -> parâmetros (pronto para treinar_modelos), ou
+        None se nunca houve ajuste
+    """
+    caminho = os.path.join(diretorio, ARQUIVO_HIPERPARAMETROS)
+
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            conteudo = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    return {chave: conteudo[chave] for chave in CRIADORES_MODELOS if chave in conteudo}
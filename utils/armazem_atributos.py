@@ -0,0 +1,316 @@
+"""
+Módulo do armazém de atributos dos candidatos em arquivo mapeado em memória
+
+A matriz de atributos imputada (n_candidatos × 9, float64), a máscara de
+imputados e os arrays numéricos dos índices do pool (buckets e códigos)
+ficam num arquivo de layout fixo com um cabeçalho pequeno. Processos do
+Streamlit, o servidor HTTP e os workers do lote mapeiam o mesmo arquivo
+somente leitura: as páginas são do cache do sistema e não são copiadas
+para cada processo.
+
+Layout do arquivo:
+    8 bytes   MAGICO
+    4 bytes   versão do formato (uint32 little-endian)
+    4 bytes   tamanho do cabeçalho JSON (uint32 little-endian)
+    JSON      versao, linhas, colunas (nome -> posição) e blocos (offset, dtype, shape)
+    blocos    alinhados em ALINHAMENTO bytes, em ordem C
+
+Cada versão dos dados é um arquivo próprio, nunca reescrito; ARQUIVO_ATUAL
+aponta para a versão publicada mais recente e é trocado atomicamente.
+Leitores que já mapearam a versão anterior seguem com ela; quem ainda vai
+abrir um arquivo pelo caminho (workers do lote) o fixa com fixar_arquivo.
+"""
+
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import numpy as np
+
+from utils.features import COLUNAS_ATRIBUTOS
+
+
+DIRETORIO_ARMAZEM = 'armazem_atributos'
+ARQUIVO_ATUAL = 'atual.json'
+
+MAGICO = b'MATCHATR'
+# 2: blocos extras com os índices do pool
+VERSAO_FORMATO = 2
+
+# Início de cada bloco múltiplo de 64 bytes (linha de cache)
+ALINHAMENTO = 64
+
+# Arquivos mantidos no diretório (o atual e os fixados nunca são removidos)
+MAX_ARQUIVOS_ARMAZEM = 3
+
+# Marcadores de fixação mais antigos que isso (processo que caiu) são ignorados
+MAX_IDADE_FIXACAO = 24 * 3600
+
+_PREFIXO = struct.Struct('<8sII')
+
+# Arquivos já mapeados neste processo (um mapeamento por arquivo)
+_mapeados = {}
+_trava = threading.Lock()
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# GRAVAÇÃO
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _nome_arquivo(versao):
+    # A versão pode ser qualquer texto: o nome usa um hash curto dela (e do formato)
+    chave = f'{VERSAO_FORMATO}:{versao}'
+    return 'atributos_' + hashlib.sha256(chave.encode('utf-8')).hexdigest()[:16] + '.mat'
+
+
+def _alinhar(posicao):
+    return -(-posicao // ALINHAMENTO) * ALINHAMENTO
+
+
+def _montar_cabecalho(versao, arrays):
+    """Cabeçalho JSON com os offsets dos blocos já calculados"""
+    blocos = {}
+    # Offsets dependem do tamanho do próprio cabeçalho: reserva um múltiplo de ALINHAMENTO
+    tamanho_reservado = ALINHAMENTO
+    while True:
+        posicao = _alinhar(_PREFIXO.size + tamanho_reservado)
+        for nome, array in arrays.items():
+            blocos[nome] = {'offset': posicao, 'dtype': array.dtype.str, 'shape': list(array.shape)}
+            posicao = _alinhar(posicao + array.nbytes)
+
+        cabecalho = json.dumps({
+            'versao': versao,
+            'linhas': int(len(arrays['atributos'])),
+            'colunas': {coluna: j for j, coluna in enumerate(COLUNAS_ATRIBUTOS)},
+            'blocos': blocos
+        }).encode('utf-8')
+
+        if len(cabecalho) <= tamanho_reservado:
+            return cabecalho.ljust(tamanho_reservado), posicao
+        tamanho_reservado = _alinhar(len(cabecalho))
+
+
+def publicar_atributos(atributos, imputados, versao, diretorio=DIRETORIO_ARMAZEM, indices=None):
+    """
+    Grava uma versão dos atributos no armazém e a torna a atual
+
+    Idempotente: se a versão já existe, só atualiza o ponteiro. A gravação
+    vai para um temporário e entra com os.replace, então nenhum leitor vê
+    um arquivo pela metade.
+
+    Args:
+        atributos: Matriz (n_candidatos, 9) de matriz_atributos (imputada)
+        imputados: Máscara booleana (n_candidatos, 9) dos valores imputados
+        versao: Identificador do conteúdo (ex.: fingerprint dos dados)
+        diretorio: Pasta do armazém
+        indices: Dict opcional nome -> array numérico (índices do pool)
+
+    Returns:
+        Caminho do arquivo da versão
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    caminho = os.path.join(diretorio, _nome_arquivo(versao))
+
+    if not os.path.exists(caminho):
+        atributos = np.ascontiguousarray(atributos, dtype='<f8')
+        imputados = np.ascontiguousarray(imputados, dtype=np.bool_)
+        if atributos.shape != (len(atributos), len(COLUNAS_ATRIBUTOS)) or imputados.shape != atributos.shape:
+            raise ValueError(f'Atributos com formato inesperado: {atributos.shape} / {imputados.shape}')
+
+        arrays = {'atributos': atributos, 'imputados': imputados}
+        for nome, array in (indices or {}).items():
+            array = np.asarray(array)
+            if array.dtype.kind not in 'biuf':
+                raise ValueError(f'Índice {nome} não numérico: {array.dtype}')
+            # Little-endian explícito: o arquivo é o mesmo em qualquer máquina
+            arrays[nome] = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder('<'))
+
+        cabecalho, tamanho_total = _montar_cabecalho(versao, arrays)
+        temporario = f'{caminho}.{uuid.uuid4().hex}.tmp'
+
+        with open(temporario, 'wb') as f:
+            f.write(_PREFIXO.pack(MAGICO, VERSAO_FORMATO, len(cabecalho)))
+            f.write(cabecalho)
+            for array in arrays.values():
+                f.seek(_alinhar(f.tell()))
+                f.write(array.tobytes())
+            f.truncate(tamanho_total)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(temporario, caminho)
+
+    _gravar_atual(versao, os.path.basename(caminho), diretorio)
+    _limpar(diretorio)
+    return caminho
+
+
+def _gravar_atual(versao, arquivo, diretorio):
+    # Troca atômica do ponteiro: leitores veem a versão antiga ou a nova
+    caminho = os.path.join(diretorio, ARQUIVO_ATUAL)
+    temporario = f'{caminho}.{uuid.uuid4().hex}.tmp'
+
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump({'versao': versao, 'arquivo': arquivo}, f, ensure_ascii=False)
+
+    os.replace(temporario, caminho)
+
+
+@contextmanager
+def fixar_arquivo(caminho):
+    """
+    Impede que _limpar (de qualquer processo) remova o arquivo durante o bloco
+
+    Para quem ainda vai abrir o arquivo pelo caminho, como os workers do
+    lote em restaurar_pool. Grava um marcador '<arquivo>.<pid>.<id>.fixo'
+    ao lado do arquivo e o remove no fim.
+    """
+    marcador = f'{caminho}.{os.getpid()}.{uuid.uuid4().hex[:8]}.fixo'
+    with open(marcador, 'w', encoding='utf-8'):
+        pass
+
+    try:
+        yield caminho
+    finally:
+        try:
+            os.remove(marcador)
+        except OSError:
+            pass
+
+
+def _fixados(diretorio, nomes):
+    """Arquivos com marcador de fixação recente"""
+    fixados = set()
+    agora = time.time()
+
+    for marcador in os.listdir(diretorio):
+        if not marcador.endswith('.fixo'):
+            continue
+        nome = marcador.split('.mat.', 1)[0] + '.mat'
+        try:
+            if agora - os.path.getmtime(os.path.join(diretorio, marcador)) <= MAX_IDADE_FIXACAO:
+                fixados.add(nome)
+        except OSError:
+            pass
+
+    return fixados & set(nomes)
+
+
+def _limpar(diretorio):
+    """Remove os arquivos mais antigos além de MAX_ARQUIVOS_ARMAZEM"""
+    atual = _ler_atual(diretorio)
+    arquivos = sorted(
+        (nome for nome in os.listdir(diretorio) if nome.startswith('atributos_') and nome.endswith('.mat')),
+        key=lambda nome: os.path.getmtime(os.path.join(diretorio, nome))
+    )
+    fixados = _fixados(diretorio, arquivos)
+
+    excedentes = len(arquivos) - MAX_ARQUIVOS_ARMAZEM
+    for nome in arquivos:
+        if excedentes <= 0:
+            break
+        if (atual is not None and nome == atual['arquivo']) or nome in fixados:
+            continue
+        # No Linux quem já mapeou o arquivo continua lendo normalmente
+        caminho = os.path.abspath(os.path.join(diretorio, nome))
+        try:
+            os.remove(caminho)
+        except OSError:
+            pass
+        with _trava:
+            _mapeados.pop(caminho, None)
+        excedentes -= 1
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# LEITURA
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _ler_atual(diretorio):
+    try:
+        with open(os.path.join(diretorio, ARQUIVO_ATUAL), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def abrir_atributos(caminho):
+    """
+    Mapeia um arquivo do armazém somente leitura (sem cópia)
+
+    Args:
+        caminho: Arquivo gravado por publicar_atributos
+
+    Returns:
+        Dict com 'versao', 'linhas', 'colunas' (nome -> posição), 'arquivo',
+        'atributos' (float64, n × 9), 'imputados' (bool, n × 9) e
+        'indices' (nome -> array), todos np.memmap somente leitura
+
+    Raises:
+        ValueError: arquivo de outro formato, corrompido ou com colunas diferentes
+    """
+    caminho = os.path.abspath(caminho)
+    with _trava:
+        if caminho in _mapeados:
+            return _mapeados[caminho]
+
+    with open(caminho, 'rb') as f:
+        prefixo = f.read(_PREFIXO.size)
+        magico, formato, tamanho_cabecalho = (
+            _PREFIXO.unpack(prefixo) if len(prefixo) == _PREFIXO.size else (None, None, 0)
+        )
+        if magico != MAGICO or formato != VERSAO_FORMATO:
+            raise ValueError(f'{caminho}: não é um armazém de atributos (formato {VERSAO_FORMATO})')
+        cabecalho = json.loads(f.read(tamanho_cabecalho).decode('utf-8'))
+        tamanho_arquivo = os.fstat(f.fileno()).st_size
+
+    if list(cabecalho['colunas']) != list(COLUNAS_ATRIBUTOS):
+        raise ValueError(f'{caminho}: colunas {list(cabecalho["colunas"])} diferentes de COLUNAS_ATRIBUTOS')
+
+    armazem = {
+        'versao': cabecalho['versao'],
+        'linhas': cabecalho['linhas'],
+        'colunas': cabecalho['colunas'],
+        'arquivo': caminho,
+        'indices': {}
+    }
+    for nome, bloco in cabecalho['blocos'].items():
+        dtype = np.dtype(bloco['dtype'])
+        shape = tuple(bloco['shape'])
+        if bloco['offset'] + dtype.itemsize * int(np.prod(shape)) > tamanho_arquivo:
+            raise ValueError(f'{caminho}: bloco {nome} truncado')
+        array = np.memmap(caminho, dtype=dtype, mode='r', offset=bloco['offset'], shape=shape)
+        if nome in ('atributos', 'imputados'):
+            armazem[nome] = array
+        else:
+            armazem['indices'][nome] = array
+
+    with _trava:
+        return _mapeados.setdefault(caminho, armazem)
+
+
+def abrir_versao(versao, diretorio=DIRETORIO_ARMAZEM):
+    """Mapeia a versão indicada, ou None se ela não estiver no armazém"""
+    caminho = os.path.join(diretorio, _nome_arquivo(versao))
+    if not os.path.exists(caminho):
+        return None
+
+    armazem = abrir_atributos(caminho)
+    return armazem if armazem['versao'] == versao else None
+
+
+def abrir_atual(diretorio=DIRETORIO_ARMAZEM):
+    """Mapeia a versão apontada por ARQUIVO_ATUAL, ou None se não houver"""
+    atual = _ler_atual(diretorio)
+    if atual is None:
+        return None
+
+    try:
+        return abrir_atributos(os.path.join(diretorio, atual['arquivo']))
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,302 @@
+"""
+Módulo de atualização incremental dos modelos com os novos matches
+"""
+
+import copy
+import os
+import time
+
+import numpy as np
+import xgboost as xgb
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import SGDClassifier
+from sklearn.pipeline import Pipeline
+
+from utils.comparacao import avaliar_modelos, NOMES_MODELOS
+from utils.preparacao import preparar_dados_completos
+from utils.registro_modelos import calcular_fingerprint_abas
+
+
+# Opcional (MATCH_INCREMENTAL=1): sem ela todo treino é completo, com a divisão
+# estratificada; com ela a divisão passa a ser estável por par (outras métricas)
+ATUALIZACAO_INCREMENTAL = os.environ.get('MATCH_INCREMENTAL', '').strip().lower() in ('1', 'true', 'sim')
+
+# Salvaguarda: depois de tantas atualizações seguidas, o próximo treino é completo
+MAX_ATUALIZACOES_INCREMENTAIS = 10
+
+# Com mais linhas novas que essa fração do histórico, o treino completo compensa
+FRACAO_MAXIMA_LINHAS_NOVAS = 0.25
+
+# XGBoost: rodadas de boosting adicionadas por atualização
+RODADAS_XGB_INCREMENTAIS = 20
+
+# RF: fração das árvores (as mais antigas) substituídas por árvores novas
+FRACAO_ARVORES_RENOVADAS = 0.2
+
+# LR: épocas de SGD sobre as linhas novas, partindo dos coeficientes atuais
+EPOCAS_LR = 5
+TAXA_APRENDIZADO_LR = 0.01
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# PLANEJAMENTO
+# ═══════════════════════════════════════════════════════════════════════════
+
+def metadados_dados(candidatos, vagas, matches):
+    """Impressões digitais usadas para decidir entre atualizar e retreinar"""
+    return {
+        'base': calcular_fingerprint_abas({'candidatos': candidatos, 'vagas': vagas}),
+        'hash_matches': calcular_fingerprint_abas({'matches': matches}),
+        'n_matches': len(matches),
+        'divisao': 'estavel' if ATUALIZACAO_INCREMENTAL else 'estratificada'
+    }
+
+
+def planejar_atualizacao(ativa, candidatos, vagas, matches):
+    """
+    Decide se os novos dados permitem atualizar a versão ativa
+
+    Só há atualização incremental com ATUALIZACAO_INCREMENTAL ligada,
+    quando a versão ativa usou a mesma divisão estável, candidatos e vagas
+    não mudaram e a aba de matches apenas ganhou linhas no final.
+
+    Args:
+        ativa: Artefatos da versão ativa (carregar_versao()) ou None
+        candidatos, vagas, matches: DataFrames atuais
+
+    Returns:
+        Dict com 'modo' ('incremental' ou 'completo'), 'motivo',
+        'n_matches_anterior' e os 'metadados' da nova versão
+    """
+    metadados = metadados_dados(candidatos, vagas, matches)
+    anteriores = (ativa or {}).get('metadados') or {}
+    atualizacoes = anteriores.get('atualizacoes', 0)
+
+    def completo(motivo):
+        return {
+            'modo': 'completo',
+            'motivo': motivo,
+            # A comparação só é justa se a versão ativa veio de atualizações dos mesmos dados base
+            'comparar': anteriores.get('origem') == 'incremental' and anteriores.get('base') == metadados['base'],
+            'n_matches_anterior': anteriores.get('n_matches'),
+            'metadados': {**metadados, 'origem': 'completo', 'atualizacoes': 0}
+        }
+
+    if not ATUALIZACAO_INCREMENTAL:
+        return completo('atualização incremental desligada')
+    if not anteriores:
+        return completo('sem versão anterior')
+    if anteriores.get('divisao') != 'estavel':
+        return completo('versão ativa com outra divisão treino/teste')
+    if anteriores.get('base') != metadados['base']:
+        return completo('candidatos ou vagas mudaram')
+
+    n_anterior = anteriores.get('n_matches', 0)
+    if n_anterior <= 0 or len(matches) <= n_anterior:
+        return completo('matches sem linhas novas no final')
+    if calcular_fingerprint_abas({'matches': matches.iloc[:n_anterior]}) != anteriores.get('hash_matches'):
+        return completo('linhas antigas de matches foram alteradas')
+    if atualizacoes >= MAX_ATUALIZACOES_INCREMENTAIS:
+        return completo('retreino completo periódico')
+    if len(matches) - n_anterior > FRACAO_MAXIMA_LINHAS_NOVAS * n_anterior:
+        return completo('muitas linhas novas')
+
+    return {
+        'modo': 'incremental',
+        'motivo': f'{len(matches) - n_anterior} linhas novas em matches',
+        'comparar': False,
+        'n_matches_anterior': n_anterior,
+        'metadados': {**metadados, 'origem': 'incremental', 'atualizacoes': atualizacoes + 1}
+    }
+
+
+def preparar_dados(candidatos, vagas, matches, exibir_estatisticas=True, levantar_erros=False):
+    """
+    preparar_dados_completos marcando a linha de origem de cada registro
+    na aba de matches (coluna 'linha_matches')
+    """
+    matches = matches.assign(linha_matches=np.arange(len(matches)))
+    return preparar_dados_completos(candidatos, vagas, matches, exibir_estatisticas, levantar_erros)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# ATUALIZAÇÃO DE CADA MODELO
+# ═══════════════════════════════════════════════════════════════════════════
+
+def atualizar_lr(modelo, X_novo, y_novo, y_todos):
+    """
+    Passos de SGD (perda logística) sobre as linhas novas, partindo dos
+    coeficientes atuais; o scaler é mantido para os coeficientes continuarem
+    na mesma escala
+
+    Args:
+        modelo: Pipeline (scaler + LogisticRegression)
+        X_novo, y_novo: Linhas novas
+        y_todos: Labels de todo o treino (pesos das classes e regularização)
+
+    Returns:
+        Nova Pipeline com uma LogisticRegression atualizada
+    """
+    scaler = modelo.named_steps['scaler']
+    lr = modelo.named_steps['lr']
+
+    # Mesmo 'balanced' do treino completo, calculado sobre todo o histórico
+    contagens = np.bincount(np.asarray(y_todos, dtype=int), minlength=2)
+    pesos_classe = len(y_todos) / (2 * np.maximum(contagens, 1))
+
+    sgd = SGDClassifier(
+        loss='log_loss',
+        # Equivalente ao C da LogisticRegression: alpha = 1 / (C * n)
+        alpha=1.0 / (lr.C * len(y_todos)),
+        learning_rate='constant',
+        eta0=TAXA_APRENDIZADO_LR,
+        max_iter=EPOCAS_LR,
+        tol=None,
+        random_state=42
+    )
+    sgd.fit(
+        scaler.transform(X_novo), y_novo,
+        coef_init=lr.coef_, intercept_init=lr.intercept_,
+        sample_weight=pesos_classe[np.asarray(y_novo, dtype=int)]
+    )
+
+    novo_lr = copy.deepcopy(lr)
+    novo_lr.coef_ = sgd.coef_.copy()
+    novo_lr.intercept_ = sgd.intercept_.copy()
+
+    return Pipeline([('scaler', scaler), ('lr', novo_lr)])
+
+
+def atualizar_rf(modelo, X_todos, y_todos, semente=0):
+    """
+    Renova as árvores mais antigas da floresta com árvores treinadas em
+    todo o histórico (inclusive as linhas novas)
+
+    Returns:
+        Novo RandomForestClassifier com o mesmo número de árvores
+    """
+    n_trocar = max(1, int(round(len(modelo.estimators_) * FRACAO_ARVORES_RENOVADAS)))
+
+    auxiliar = RandomForestClassifier(**{
+        **modelo.get_params(),
+        'n_estimators': n_trocar,
+        'random_state': semente
+    })
+    auxiliar.fit(X_todos, y_todos)
+
+    novo = copy.deepcopy(modelo)
+    novo.estimators_ = novo.estimators_[n_trocar:] + auxiliar.estimators_
+    return novo
+
+
+def atualizar_xgb(modelo, X_novo, y_novo):
+    """
+    Continua o boosting a partir do booster atual, só com as linhas novas
+
+    Returns:
+        Novo XGBClassifier com RODADAS_XGB_INCREMENTAIS árvores a mais
+    """
+    params = modelo.get_params()
+    params.update(n_estimators=RODADAS_XGB_INCREMENTAIS, early_stopping_rounds=None)
+
+    novo = xgb.XGBClassifier(**params)
+    novo.fit(X_novo, y_novo, xgb_model=modelo.get_booster(), verbose=False)
+    return novo
+
+
+def atualizar_modelos(modelos, conjuntos, n_matches_anterior, semente=0, progresso=None):
+    """
+    Atualiza os 3 modelos com as linhas de treino vindas dos novos matches
+
+    Args:
+        modelos: dict com os modelos da versão ativa
+        conjuntos: Treino e teste de cache_preparacao.dividir_preparados
+        n_matches_anterior: Linhas de matches usadas pela versão ativa
+        semente: Semente das árvores novas do RF (ex.: número da atualização)
+        progresso: Função opcional chamada com (chave, 'iniciado'/'concluido')
+
+    Returns:
+        Dict no formato de treinar_modelos (modelos, resultados, previsões,
+        probabilidades e tempos)
+    """
+    novas = conjuntos['linha_train'] >= n_matches_anterior
+    X_todos, y_todos = conjuntos['X_train'], conjuntos['y_train']
+    X_novo, y_novo = X_todos[novas], y_todos[novas]
+
+    # Sem as duas classes nas linhas novas, LR e XGB ficam como estão
+    duas_classes = y_novo.nunique() == 2
+
+    atualizadores = {
+        'LR': lambda: atualizar_lr(modelos['LR'], X_novo, y_novo, y_todos) if duas_classes else modelos['LR'],
+        'RF': lambda: atualizar_rf(modelos['RF'], X_todos, y_todos, semente),
+        'XGB': lambda: atualizar_xgb(modelos['XGB'], X_novo, y_novo) if duas_classes else modelos['XGB']
+    }
+
+    inicio_total = time.perf_counter()
+    inicio_cpu_total = time.process_time()
+    novos_modelos = {}
+    tempos = {}
+
+    for chave in NOMES_MODELOS:
+        if progresso is not None:
+            progresso(chave, 'iniciado')
+        inicio = time.perf_counter()
+        # Um modelo por vez: a CPU do processo inclui as threads do RF e do XGB
+        inicio_cpu = time.process_time()
+        novos_modelos[chave] = atualizadores[chave]()
+        tempos[chave] = {
+            'parede': time.perf_counter() - inicio,
+            'cpu': time.process_time() - inicio_cpu,
+            'cpu_medida': 'processo',
+            'threads': 1
+        }
+        if progresso is not None:
+            progresso(chave, 'concluido')
+
+    avaliacao = avaliar_modelos(novos_modelos, conjuntos['X_test'], conjuntos['y_test'])
+    tempos['total'] = {
+        'parede': time.perf_counter() - inicio_total,
+        'cpu': time.process_time() - inicio_cpu_total
+    }
+
+    return {
+        'modelos': novos_modelos,
+        **avaliacao,
+        'tempos': tempos,
+        'linhas_novas': int(novas.sum())
+    }
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# COMPARAÇÃO
+# ═══════════════════════════════════════════════════════════════════════════
+
+def comparar_resultados(resultados_incremental, resultados_completo):
+    """
+    Compara as métricas dos modelos atualizados incrementalmente com as
+    do treino completo, no mesmo conjunto de teste
+
+    Args:
+        resultados_incremental, resultados_completo: DataFrames 'resultados'
+
+    Returns:
+        Lista de dicts (JSON) por modelo com as métricas dos dois e a
+        diferença completo - incremental
+    """
+    metricas = ['Acurácia', 'Precisão', 'Recall', 'F1-Score', 'ROC-AUC', 'Score_Total']
+    comparacao = []
+
+    for (_, inc), (_, comp) in zip(resultados_incremental.iterrows(), resultados_completo.iterrows()):
+        comparacao.append({
+            'Modelo': comp['Modelo'],
+            **{
+                metrica: {
+                    'incremental': float(inc[metrica]),
+                    'completo': float(comp[metrica]),
+                    'diferenca': float(comp[metrica] - inc[metrica])
+                }
+                for metrica in metricas
+            }
+        })
+
+    return comparacao
@@ -0,0 +1,239 @@
+"""
+Módulo de cache da preparação dos dados de treino, endereçado pelo conteúdo
+
+A saída de preparar_dados (matriz X das FEATURES, rótulos y, divisão
+treino/teste e linha de origem em matches) é guardada pela impressão
+digital das três abas: com as mesmas abas, o treino pula validação,
+limpeza, merges e o cálculo das features.
+
+X fica em float32 e y em int8, em memória e em disco (.npz sem
+compressão), com descarte LRU das versões antigas nos dois níveis.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utils.atualizacao_incremental import ATUALIZACAO_INCREMENTAL, preparar_dados
+from utils.features import COLUNAS_ATRIBUTOS, FEATURES
+from utils.preparacao import dividir_treino_teste
+
+
+DIRETORIO_CACHE_PREPARACAO = 'cache_preparacao'
+
+# Muda quando preparar_dados_completos, a divisão ou as FEATURES mudam (invalida o cache)
+VERSAO_PREPARACAO = 2
+
+# Colunas que a preparação lê de cada aba (as demais não mudam X nem y)
+COLUNAS_PREPARACAO = {
+    'candidatos': ['id'] + COLUNAS_ATRIBUTOS,
+    'vagas': ['ID_vaga'] + COLUNAS_ATRIBUTOS,
+    'matches': ['id_vaga', 'id_candidato', 'match']
+}
+
+# Versões mantidas em memória e em disco
+MAX_ENTRADAS_MEMORIA = 4
+MAX_ENTRADAS_DISCO = 8
+
+_memoria = OrderedDict()
+_estatisticas = {'acertos_memoria': 0, 'acertos_disco': 0, 'faltas': 0}
+_trava = threading.Lock()
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# CHAVE E ESTATÍSTICAS
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _atualizar_hash(hasher, serie):
+    if pd.api.types.is_numeric_dtype(serie):
+        hasher.update(serie.to_numpy(dtype=np.float64, na_value=np.nan).tobytes())
+    else:
+        # Texto (ids): uma string só com separadores, bem mais rápido que hash_pandas_object
+        hasher.update('\x1f'.join(serie.astype('string').fillna('\x1e').tolist()).encode('utf-8'))
+
+
+def chave_preparacao(candidatos, vagas, matches):
+    """
+    Impressão digital do conteúdo que a preparação usa
+
+    Só as COLUNAS_PREPARACAO entram, com os tipos e sem converter os
+    números para texto (calcular_fingerprint hasheia tudo como string e
+    custaria tanto quanto preparar); a versão da preparação, as FEATURES e
+    o tipo de divisão treino/teste entram também.
+    """
+    hasher = hashlib.sha256(
+        json.dumps([VERSAO_PREPARACAO, FEATURES, ATUALIZACAO_INCREMENTAL]).encode('utf-8')
+    )
+
+    for nome, df in (('candidatos', candidatos), ('vagas', vagas), ('matches', matches)):
+        colunas = [coluna for coluna in COLUNAS_PREPARACAO[nome] if coluna in df.columns]
+        hasher.update(json.dumps([nome, len(df), colunas, [str(df[c].dtype) for c in colunas]]).encode('utf-8'))
+        for coluna in colunas:
+            _atualizar_hash(hasher, df[coluna])
+
+    return hasher.hexdigest()
+
+
+def estatisticas_cache():
+    """
+    Acertos e faltas do cache neste processo
+
+    Returns:
+        Dict com acertos_memoria, acertos_disco, faltas, acertos,
+        taxa_acerto e entradas_memoria
+    """
+    with _trava:
+        estatisticas = dict(_estatisticas)
+        estatisticas['entradas_memoria'] = len(_memoria)
+
+    estatisticas['acertos'] = estatisticas['acertos_memoria'] + estatisticas['acertos_disco']
+    total = estatisticas['acertos'] + estatisticas['faltas']
+    estatisticas['taxa_acerto'] = estatisticas['acertos'] / total if total else None
+    return estatisticas
+
+
+def _contar(evento):
+    with _trava:
+        _estatisticas[evento] += 1
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# MEMÓRIA E DISCO
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _guardar_memoria(chave, preparados):
+    with _trava:
+        _memoria[chave] = preparados
+        _memoria.move_to_end(chave)
+        while len(_memoria) > MAX_ENTRADAS_MEMORIA:
+            _memoria.popitem(last=False)
+
+
+def _caminho(chave, diretorio):
+    return os.path.join(diretorio, f'{chave}.npz')
+
+
+def _ler_disco(chave, diretorio):
+    caminho = _caminho(chave, diretorio)
+    try:
+        with np.load(caminho, allow_pickle=False) as arquivo:
+            preparados = {nome: arquivo[nome] for nome in ('X', 'y', 'teste', 'linha_matches')}
+    except (OSError, ValueError, KeyError):
+        return None
+
+    for array in preparados.values():
+        array.flags.writeable = False
+
+    # Marca o uso: o descarte em disco remove os menos usados recentemente
+    try:
+        os.utime(caminho)
+    except OSError:
+        pass
+    return preparados
+
+
+def _gravar_disco(chave, preparados, diretorio):
+    os.makedirs(diretorio, exist_ok=True)
+    caminho = _caminho(chave, diretorio)
+    temporario = f'{caminho}.{uuid.uuid4().hex}.tmp'
+
+    with open(temporario, 'wb') as f:
+        np.savez(f, **preparados)
+    os.replace(temporario, caminho)
+
+    arquivos = sorted(
+        (os.path.join(diretorio, nome) for nome in os.listdir(diretorio) if nome.endswith('.npz')),
+        key=os.path.getmtime
+    )
+    for antigo in arquivos[:-MAX_ENTRADAS_DISCO]:
+        try:
+            os.remove(antigo)
+        except OSError:
+            pass
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# PREPARAÇÃO COM CACHE
+# ═══════════════════════════════════════════════════════════════════════════
+
+def obter_preparados(candidatos, vagas, matches, diretorio=DIRETORIO_CACHE_PREPARACAO):
+    """
+    Dados de treino preparados, do cache ou de preparar_dados
+
+    Args:
+        candidatos, vagas, matches: DataFrames tipados
+        diretorio: Pasta do cache em disco (None = só memória)
+
+    Returns:
+        Dict com 'X' (float32, n × len(FEATURES)), 'y' (int8), 'teste'
+        (máscara de dividir_treino_teste), 'linha_matches' (int64),
+        'chave' e 'origem' ('memoria', 'disco' ou 'preparado')
+
+    Raises:
+        ValueError: abas sem as colunas necessárias (a mensagem as lista)
+    """
+    chave = chave_preparacao(candidatos, vagas, matches)
+
+    with _trava:
+        preparados = _memoria.get(chave)
+        if preparados is not None:
+            _memoria.move_to_end(chave)
+    if preparados is not None:
+        _contar('acertos_memoria')
+        return {**preparados, 'chave': chave, 'origem': 'memoria'}
+
+    preparados = _ler_disco(chave, diretorio) if diretorio is not None else None
+    if preparados is not None:
+        _contar('acertos_disco')
+        _guardar_memoria(chave, preparados)
+        return {**preparados, 'chave': chave, 'origem': 'disco'}
+
+    _contar('faltas')
+    # Roda na thread do treino: erros viram exceção (st.error não apareceria)
+    dados = preparar_dados(candidatos, vagas, matches, exibir_estatisticas=False, levantar_erros=True)
+
+    preparados = {
+        'X': np.ascontiguousarray(dados[FEATURES].to_numpy(dtype=np.float32)),
+        'y': dados['match'].to_numpy(dtype=np.int8),
+        'teste': dividir_treino_teste(dados, estavel=ATUALIZACAO_INCREMENTAL),
+        'linha_matches': dados['linha_matches'].to_numpy(dtype=np.int64)
+    }
+    for array in preparados.values():
+        array.flags.writeable = False
+
+    _guardar_memoria(chave, preparados)
+    if diretorio is not None:
+        try:
+            _gravar_disco(chave, preparados, diretorio)
+        except OSError:
+            pass
+
+    return {**preparados, 'chave': chave, 'origem': 'preparado'}
+
+
+def dividir_preparados(preparados):
+    """
+    Treino e teste a partir de obter_preparados
+
+    Returns:
+        Dict com X_train, y_train, X_test, y_test (X como DataFrame float32
+        com as FEATURES, y como Series int8) e 'linha_train' (posição de
+        cada linha de treino na aba de matches)
+    """
+    X = pd.DataFrame(preparados['X'], columns=FEATURES, copy=False)
+    y = pd.Series(preparados['y'], name='match')
+    teste = preparados['teste']
+
+    return {
+        'X_train': X[~teste],
+        'y_train': y[~teste],
+        'X_test': X[teste],
+        'y_test': y[teste],
+        'linha_train': preparados['linha_matches'][~teste]
+    }
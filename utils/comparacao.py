@@ -14,117 +14,140 @@ from sklearn.metrics import (
     f1_score, roc_auc_score, roc_curve
 )
 import xgboost as xgb
-import matplotlib.pyplot as plt
+import matplotlib
+from matplotlib.figure import Figure
 import seaborn as sns
-import tempfile
+import hashlib
+import json
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
 
+from utils.features import (
+    COLUNAS_ATRIBUTOS, matriz_atributos, vetor_vaga,
+    calcular_matriz_features, preencher_nan_features
+)
+from utils.pontuacao import calcular_scores_aspectos, calcular_score_ponderado, pontuar_com_tabelas
+from utils.ranking import top_k_streaming
+from utils.indice_buckets import buscar_top_k, indice_compensa
+from utils.indice_perfil import prefiltrar_por_perfil
+from utils.inferencia import prever_deduplicado
+
+
+# Serializa as renderizações (o estilo do seaborn entra nos rcParams globais)
+TRAVA_GRAFICOS = threading.RLock()
+
+# Gráficos já renderizados, pelo hash de resultados e probabilidades (LRU)
+MAX_GRAFICOS_EM_CACHE = 16
+_cache_graficos = OrderedDict()
+_graficos_em_andamento = {}
+_trava_cache_graficos = threading.Lock()
+_executor_graficos = ThreadPoolExecutor(max_workers=1, thread_name_prefix='graficos')
+
+# Candidatos pontuados por vez nos caminhos sem poda (tabelas e features): os
+# intermediários ficam limitados ao bloco e o armazém mapeado é lido aos pedaços
+TAMANHO_BLOCO_CANDIDATOS = 262_144
+
+# Nome exibido de cada modelo, na ordem da tabela de resultados
+NOMES_MODELOS = {
+    'LR': 'Logistic Regression',
+    'RF': 'Random Forest',
+    'XGB': 'XGBoost'
+}
 
-def treinar_modelos(X_train, y_train, X_test, y_test):
+
+def orcamento_threads(n_cpus=None):
     """
-    Treina 3 modelos de ML e retorna resultados
-    
-    Args:
-        X_train, y_train: Dados de treino
-        X_test, y_test: Dados de teste
-    
+    Divide os núcleos entre os 3 treinos simultâneos
+
+    LR usa 1 thread; o restante é dividido entre RF e XGB, para que
+    os dois não disputem os mesmos núcleos com n_jobs=-1.
+
     Returns:
-        Dict com modelos, resultados, previsões e probabilidades
+        Dict 'LR'/'RF'/'XGB' -> quantidade de threads
     """
-    
-    modelos = {}
-    previsoes = {}
-    probabilidades = {}
-    resultados = []
-    
-    # ═══════════════════════════════════════════════════════════════════
-    # MODELO 1: LOGISTIC REGRESSION
-    # ═══════════════════════════════════════════════════════════════════
-    lr_pipeline = Pipeline([
+    n_cpus = n_cpus or os.cpu_count() or 1
+    restante = max(n_cpus - 1, 1)
+
+    return {
+        'LR': 1,
+        'RF': max(1, restante - restante // 2),
+        'XGB': max(1, restante // 2)
+    }
+
+
+# Hiperparâmetros usados quando não há ajuste salvo (ver utils/ajuste_hiperparametros.py)
+HIPERPARAMETROS_PADRAO = {
+    'LR': {'max_iter': 1000},
+    'RF': {'n_estimators': 100, 'max_depth': 10},
+    'XGB': {'n_estimators': 100, 'max_depth': 6, 'learning_rate': 0.1}
+}
+
+
+def _criar_lr(y_train, n_threads, params=None):
+    params = {**HIPERPARAMETROS_PADRAO['LR'], **(params or {})}
+    return Pipeline([
         ('scaler', StandardScaler()),
-        ('lr', LogisticRegression(max_iter=1000, random_state=42, class_weight='balanced'))
+        ('lr', LogisticRegression(random_state=42, class_weight='balanced', **params))
     ])
-    
-    lr_pipeline.fit(X_train, y_train)
-    y_pred_lr = lr_pipeline.predict(X_test)
-    y_proba_lr = lr_pipeline.predict_proba(X_test)[:, 1]
-    
-    modelos['LR'] = lr_pipeline
-    previsoes['LR'] = y_pred_lr
-    probabilidades['LR'] = y_proba_lr
-    
-    resultados.append({
-        'Modelo': 'Logistic Regression',
-        'Acurácia': accuracy_score(y_test, y_pred_lr),
-        'Precisão': precision_score(y_test, y_pred_lr, zero_division=0),
-        'Recall': recall_score(y_test, y_pred_lr, zero_division=0),
-        'F1-Score': f1_score(y_test, y_pred_lr, zero_division=0),
-        'ROC-AUC': roc_auc_score(y_test, y_proba_lr)
-    })
-    
-    # ═══════════════════════════════════════════════════════════════════
-    # MODELO 2: RANDOM FOREST
-    # ═══════════════════════════════════════════════════════════════════
-    rf = RandomForestClassifier(
-        n_estimators=100,
-        max_depth=10,
+
+
+def _criar_rf(y_train, n_threads, params=None):
+    params = {**HIPERPARAMETROS_PADRAO['RF'], **(params or {})}
+    return RandomForestClassifier(
         random_state=42,
         class_weight='balanced',
-        n_jobs=-1
+        n_jobs=n_threads,
+        **params
     )
+
+
+def _criar_xgb(y_train, n_threads, params=None):
+    params = {**HIPERPARAMETROS_PADRAO['XGB'], **(params or {})}
     
-    rf.fit(X_train, y_train)
-    y_pred_rf = rf.predict(X_test)
-    y_proba_rf = rf.predict_proba(X_test)[:, 1]
-    
-    modelos['RF'] = rf
-    previsoes['RF'] = y_pred_rf
-    probabilidades['RF'] = y_proba_rf
-    
-    resultados.append({
-        'Modelo': 'Random Forest',
-        'Acurácia': accuracy_score(y_test, y_pred_rf),
-        'Precisão': precision_score(y_test, y_pred_rf, zero_division=0),
-        'Recall': recall_score(y_test, y_pred_rf, zero_division=0),
-        'F1-Score': f1_score(y_test, y_pred_rf, zero_division=0),
-        'ROC-AUC': roc_auc_score(y_test, y_proba_rf)
-    })
-    
-    # ═══════════════════════════════════════════════════════════════════
-    # MODELO 3: XGBOOST
-    # ═══════════════════════════════════════════════════════════════════
     # Calcular scale_pos_weight
     neg = (y_train == 0).sum()
     pos = (y_train == 1).sum()
     scale_pos_weight = neg / pos if pos > 0 else 1.0
     
-    xgb_model = xgb.XGBClassifier(
-        n_estimators=100,
-        max_depth=6,
-        learning_rate=0.1,
+    params = {'eval_metric': 'logloss', **params}
+    
+    return xgb.XGBClassifier(
         random_state=42,
         scale_pos_weight=scale_pos_weight,
-        n_jobs=-1,
-        eval_metric='logloss'
+        n_jobs=n_threads,
+        **params
     )
+
+
+CRIADORES_MODELOS = {
+    'LR': _criar_lr,
+    'RF': _criar_rf,
+    'XGB': _criar_xgb
+}
+
+
+def _avaliar(chave, modelo, X_test, y_test):
+    """Previsões e métricas de um modelo no conjunto de teste"""
+    y_pred = modelo.predict(X_test)
+    y_proba = modelo.predict_proba(X_test)[:, 1]
+    
+    metricas = {
+        'Modelo': NOMES_MODELOS[chave],
+        'Acurácia': accuracy_score(y_test, y_pred),
+        'Precisão': precision_score(y_test, y_pred, zero_division=0),
+        'Recall': recall_score(y_test, y_pred, zero_division=0),
+        'F1-Score': f1_score(y_test, y_pred, zero_division=0),
+        'ROC-AUC': roc_auc_score(y_test, y_proba)
+    }
     
-    xgb_model.fit(X_train, y_train)
-    y_pred_xgb = xgb_model.predict(X_test)
-    y_proba_xgb = xgb_model.predict_proba(X_test)[:, 1]
-    
-    modelos['XGB'] = xgb_model
-    previsoes['XGB'] = y_pred_xgb
-    probabilidades['XGB'] = y_proba_xgb
-    
-    resultados.append({
-        'Modelo': 'XGBoost',
-        'Acurácia': accuracy_score(y_test, y_pred_xgb),
-        'Precisão': precision_score(y_test, y_pred_xgb, zero_division=0),
-        'Recall': recall_score(y_test, y_pred_xgb, zero_division=0),
-        'F1-Score': f1_score(y_test, y_pred_xgb, zero_division=0),
-        'ROC-AUC': roc_auc_score(y_test, y_proba_xgb)
-    })
-    
+    return y_pred, y_proba, metricas
+
+
+def _tabela_resultados(resultados):
     # Calcular score total
     df_resultados = pd.DataFrame(resultados)
     df_resultados['Score_Total'] = (
@@ -132,16 +155,168 @@ def treinar_modelos(X_train, y_train, X_test, y_test):
         df_resultados['F1-Score'] +
         df_resultados['ROC-AUC']
     ) / 3
+    return df_resultados
+
+
+def _treinar_e_avaliar(chave, X_train, y_train, X_test, y_test, n_threads, params=None,
+                       progresso=None, cpu_do_processo=False):
+    """
+    Ajusta um modelo e calcula suas métricas assim que o ajuste termina
+    
+    Com cpu_do_processo (modelos treinados um de cada vez) o 'cpu' é o do
+    processo e inclui as threads internas do RF e do XGB; em paralelo só a
+    thread que chamou o fit pode ser atribuída ao modelo ('cpu_medida'
+    diz qual dos dois foi medido)
+    """
+    if progresso is not None:
+        progresso(chave, 'iniciado')
+    
+    relogio_cpu = time.process_time if cpu_do_processo else time.thread_time
+    inicio_parede = time.perf_counter()
+    inicio_cpu = relogio_cpu()
+    
+    modelo = CRIADORES_MODELOS[chave](y_train, n_threads, params)
+    modelo.fit(X_train, y_train)
+    y_pred, y_proba, metricas = _avaliar(chave, modelo, X_test, y_test)
+    
+    tempos = {
+        'parede': time.perf_counter() - inicio_parede,
+        'cpu': relogio_cpu() - inicio_cpu,
+        'cpu_medida': 'processo' if cpu_do_processo else 'thread',
+        'threads': n_threads
+    }
+    
+    if progresso is not None:
+        progresso(chave, 'concluido')
+    
+    return modelo, y_pred, y_proba, metricas, tempos
+
+
+def avaliar_modelos(modelos, X_test, y_test):
+    """
+    Avalia modelos já treinados no conjunto de teste
+    
+    Returns:
+        Dict com resultados, previsões e probabilidades, no mesmo
+        formato de treinar_modelos
+    """
+    previsoes = {}
+    probabilidades = {}
+    resultados = []
+    
+    for chave in CRIADORES_MODELOS:
+        y_pred, y_proba, metricas = _avaliar(chave, modelos[chave], X_test, y_test)
+        previsoes[chave] = y_pred
+        probabilidades[chave] = y_proba
+        resultados.append(metricas)
+    
+    return {
+        'resultados': _tabela_resultados(resultados),
+        'previsoes': previsoes,
+        'probabilidades': probabilidades
+    }
+
+
+def treinar_modelos(X_train, y_train, X_test, y_test, paralelo=True, n_cpus=None,
+                    hiperparametros=None, progresso=None):
+    """
+    Treina 3 modelos de ML e retorna resultados
+    
+    Com paralelo=True os três ajustes rodam ao mesmo tempo em uma pool de
+    threads, cada um com sua cota de núcleos (orcamento_threads); o tempo
+    total fica próximo ao do modelo mais lento, e não à soma dos três.
+    
+    Args:
+        X_train, y_train: Dados de treino
+        X_test, y_test: Dados de teste
+        paralelo: Treina os modelos simultaneamente
+        n_cpus: Núcleos disponíveis (padrão: os.cpu_count())
+        hiperparametros: dict opcional 'RF'/'XGB'/'LR' -> parâmetros que
+                         substituem HIPERPARAMETROS_PADRAO (ex.: os
+                         vencedores salvos por ajustar_hiperparametros)
+        progresso: Função opcional chamada com (chave, 'iniciado'/'concluido')
+                   quando cada modelo começa e termina (pode vir de outra thread)
+    
+    Returns:
+        Dict com modelos, resultados, previsões, probabilidades e tempos
+        ('parede' e 'cpu' em segundos por modelo e no 'total'; em paralelo
+        o 'cpu' de cada modelo é só o da thread que chamou o fit, sem as
+        threads internas do RF e do XGB ('cpu_medida': 'thread'), e em
+        sequência é o do processo durante o modelo ('cpu_medida':
+        'processo'); o 'total' inclui todas as threads)
+    """
+    
+    orcamento = orcamento_threads(n_cpus)
+    hiperparametros = hiperparametros or {}
+    if not paralelo:
+        # Um de cada vez: cada modelo pode usar todos os núcleos
+        orcamento = {chave: (1 if chave == 'LR' else n_cpus or os.cpu_count() or 1) for chave in orcamento}
+    
+    inicio_parede = time.perf_counter()
+    inicio_cpu = time.process_time()
+    
+    if paralelo:
+        with ThreadPoolExecutor(max_workers=len(CRIADORES_MODELOS)) as executor:
+            futuros = {
+                chave: executor.submit(
+                    _treinar_e_avaliar, chave, X_train, y_train, X_test, y_test,
+                    orcamento[chave], hiperparametros.get(chave), progresso
+                )
+                for chave in CRIADORES_MODELOS
+            }
+            saidas = {chave: futuro.result() for chave, futuro in futuros.items()}
+    else:
+        saidas = {
+            chave: _treinar_e_avaliar(
+                chave, X_train, y_train, X_test, y_test, orcamento[chave],
+                hiperparametros.get(chave), progresso, cpu_do_processo=True
+            )
+            for chave in CRIADORES_MODELOS
+        }
+    
+    modelos = {}
+    previsoes = {}
+    probabilidades = {}
+    resultados = []
+    tempos = {}
+    
+    # Mesma ordem de sempre na tabela: LR, RF, XGB
+    for chave in CRIADORES_MODELOS:
+        modelo, y_pred, y_proba, metricas, tempos_modelo = saidas[chave]
+        modelos[chave] = modelo
+        previsoes[chave] = y_pred
+        probabilidades[chave] = y_proba
+        resultados.append(metricas)
+        tempos[chave] = tempos_modelo
+    
+    tempos['total'] = {
+        'parede': time.perf_counter() - inicio_parede,
+        'cpu': time.process_time() - inicio_cpu
+    }
+    
+    df_resultados = _tabela_resultados(resultados)
     
     return {
         'modelos': modelos,
         'resultados': df_resultados,
         'previsoes': previsoes,
-        'probabilidades': probabilidades
+        'probabilidades': probabilidades,
+        'tempos': tempos
     }
 
 
-def gerar_recomendacoes(candidatos, vaga, modelos, pesos, fatores_penalizacao):
+def _top_k_em_blocos(n, k, pontuar_bloco, tamanho_bloco):
+    """top_k_streaming sobre pontuar_bloco(inicio, fim), em blocos de até tamanho_bloco posições"""
+    blocos = (
+        pontuar_bloco(inicio, min(inicio + tamanho_bloco, n))
+        for inicio in range(0, n, tamanho_bloco)
+    )
+    return top_k_streaming(blocos, k)
+
+
+def gerar_recomendacoes(candidatos, vaga, modelos, pesos, fatores_penalizacao, k=10, pool=None,
+                        score_perfil_minimo=None, compilados=None,
+                        tamanho_bloco=TAMANHO_BLOCO_CANDIDATOS):
     """
     Gera recomendações para uma vaga específica
     
@@ -151,220 +326,270 @@ def gerar_recomendacoes(candidatos, vaga, modelos, pesos, fatores_penalizacao):
         modelos: dict com modelos treinados
         pesos: dict com pesos de cada aspecto
         fatores_penalizacao: dict com fatores de penalização
+        k: Quantidade de candidatos retornados
+        pool: Pool pré-normalizado de preparar_pool (evita reconverter
+              os candidatos a cada chamada e usa o índice de buckets)
+        score_perfil_minimo: Se informado, só considera candidatos com
+              score_perfil >= esse valor (pré-filtro pela KD-tree do pool)
+        compilados: Modelos de compilar_modelos (opcional) para prever as k linhas
+        tamanho_bloco: Candidatos pontuados por vez quando não há poda por
+              buckets (o top k de cada bloco é mesclado num heap de k)
     
     Returns:
-        DataFrame com top 10 candidatos ranqueados
+        DataFrame com os top k candidatos ranqueados
     """
     
-    candidatos = candidatos.copy()
-    
     # ═══════════════════════════════════════════════════════════════════
-    # CONVERTER COLUNAS PARA NUMÉRICO
+    # CONVERTER COLUNAS PARA NUMÉRICO (valores vazios recebem o padrão)
     # ═══════════════════════════════════════════════════════════════════
-    colunas_para_converter = [
-        'Intervalo_Idade_Código',
-        'Nível_Formação_Código',
-        'Área_Atuação_Código',
-        'Nível do cargo código',
-        'Regime código',
-        'autoridade',
-        'prestigio',
-        'preservacao',
-        'formalidade'
-    ]
-    
-    for col in colunas_para_converter:
-        if col in candidatos.columns:
-            candidatos[col] = pd.to_numeric(candidatos[col], errors='coerce')
-    
-    # Preencher NaN com valores padrão
-    candidatos = candidatos.fillna({
-        'Intervalo_Idade_Código': 2,
-        'Nível_Formação_Código': 4,
-        'Área_Atuação_Código': 1,
-        'Nível do cargo código': 3,
-        'Regime código': 0,
-        'autoridade': 25.0,
-        'prestigio': 25.0,
-        'preservacao': 25.0,
-        'formalidade': 25.0
-    })
+    if pool is not None:
+        atributos = pool['atributos']
+    else:
+        atributos = matriz_atributos(candidatos)
+    
+    vetor = vetor_vaga(vaga)
+    indice = pool.get('indice_buckets') if pool is not None else None
+    
+    # Pré-filtro pelo perfil: a KD-tree devolve só quem está no raio compatível
+    universo = None
+    if score_perfil_minimo is not None and pool is not None and 'indice_perfil' in pool:
+        universo = prefiltrar_por_perfil(
+            pool['indice_perfil'], vetor, fatores_penalizacao['perfil'], score_perfil_minimo
+        )
     
-    # ═══════════════════════════════════════════════════════════════════
-    # CALCULAR FEATURES
-    # ═══════════════════════════════════════════════════════════════════
-    features_lista = []
-    
-    for idx, cand in candidatos.iterrows():
-        features = {
-            'diff_idade': abs(float(cand['Intervalo_Idade_Código']) - float(vaga['codigo_idade'])),
-            'diff_formacao': abs(float(cand['Nível_Formação_Código']) - float(vaga['codigo_formacao'])),
-            'diff_area': abs(float(cand['Área_Atuação_Código']) - float(vaga['codigo_area'])),
-            'diff_cargo': abs(float(cand['Nível do cargo código']) - float(vaga['codigo_cargo'])),
-            'diff_regime': abs(float(cand['Regime código']) - float(vaga['codigo_regime'])),
-            'diff_autoridade': abs(float(cand['autoridade']) - float(vaga['autoridade'])),
-            'diff_prestigio': abs(float(cand['prestigio']) - float(vaga['prestigio'])),
-            'diff_preservacao': abs(float(cand['preservacao']) - float(vaga['preservacao'])),
-            'diff_formalidade': abs(float(cand['formalidade']) - float(vaga['formalidade']))
-        }
+    if (
+        score_perfil_minimo is None and indice is not None
+        and indice_compensa(indice) and not np.isnan(vetor).any()
+    ):
+        # ═══════════════════════════════════════════════════════════════
+        # BUSCA COM PODA: só pontua buckets que podem entrar no top k
+        # ═══════════════════════════════════════════════════════════════
+        posicoes, _, _ = buscar_top_k(indice, atributos, vetor, pesos, fatores_penalizacao, k)
         
-        features['distancia_perfil'] = np.sqrt(
-            features['diff_autoridade']**2 +
-            features['diff_prestigio']**2 +
-            features['diff_preservacao']**2 +
-            features['diff_formalidade']**2
-        )
+        matriz_top = calcular_matriz_features(atributos[posicoes], vetor)
+        scores_top = calcular_scores_aspectos(matriz_top, fatores_penalizacao)
+        score_top = calcular_score_ponderado(scores_top, pesos)
+    elif pool is not None and pool.get('indice_codigos') is not None and not np.isnan(vetor).any():
+        # ═══════════════════════════════════════════════════════════════
+        # PONTUAR POR TABELAS: 5 consultas por código + termo de perfil
+        # ═══════════════════════════════════════════════════════════════
+        def pontuar_bloco(inicio, fim):
+            posicoes_bloco = slice(inicio, fim) if universo is None else universo[inicio:fim]
+            score_ponderado, score_perfil = pontuar_com_tabelas(
+                pool['indice_codigos'], atributos, vetor, pesos, fatores_penalizacao, posicoes_bloco
+            )
+            if score_perfil_minimo is not None:
+                score_ponderado = np.where(score_perfil >= score_perfil_minimo, score_ponderado, np.nan)
+            return score_ponderado
         
-        features_lista.append(features)
-    
-    df_predicao = pd.DataFrame(features_lista)
-    
-    # Tratar NaN
-    for col in df_predicao.columns:
-        max_val = df_predicao[col].max()
-        if pd.isna(max_val) or max_val == 0:
-            max_val = 10
-        df_predicao[col] = df_predicao[col].fillna(max_val)
-    
-    # ═══════════════════════════════════════════════════════════════════
-    # FAZER PREVISÕES COM OS 3 MODELOS
-    # ═══════════════════════════════════════════════════════════════════
-    candidatos['prob_lr'] = modelos['LR'].predict_proba(df_predicao)[:, 1]
-    candidatos['prob_rf'] = modelos['RF'].predict_proba(df_predicao)[:, 1]
-    candidatos['prob_xgb'] = modelos['XGB'].predict_proba(df_predicao)[:, 1]
+        n = len(atributos) if universo is None else len(universo)
+        locais, score_top = _top_k_em_blocos(n, k, pontuar_bloco, tamanho_bloco)
+        posicoes = locais if universo is None else universo[locais]
+        
+        matriz_top = calcular_matriz_features(atributos[posicoes], vetor)
+        scores_top = calcular_scores_aspectos(matriz_top, fatores_penalizacao)
+    else:
+        # ═══════════════════════════════════════════════════════════════
+        # FEATURES E SCORES POR BLOCO (todos os candidatos ou os pré-filtrados)
+        # ═══════════════════════════════════════════════════════════════
+        # Os atributos dos candidatos já vêm imputados: NaN nas features só
+        # vem da vaga (a coluna inteira), então preencher por bloco dá o
+        # mesmo resultado que preencher tudo de uma vez
+        def pontuar_bloco(inicio, fim):
+            base = atributos[inicio:fim] if universo is None else atributos[universo[inicio:fim]]
+            matriz = preencher_nan_features(calcular_matriz_features(base, vetor))
+            scores = calcular_scores_aspectos(matriz, fatores_penalizacao)
+            score_ponderado = calcular_score_ponderado(scores, pesos)
+            
+            if score_perfil_minimo is not None:
+                # Filtro exato (NaN nunca entra no ranking)
+                score_ponderado = np.where(
+                    scores['perfil'] >= score_perfil_minimo, score_ponderado, np.nan
+                )
+            return score_ponderado
+        
+        # ═══════════════════════════════════════════════════════════════
+        # RANQUEAR (top k de cada bloco mesclado num heap de k)
+        # ═══════════════════════════════════════════════════════════════
+        n = len(atributos) if universo is None else len(universo)
+        locais, score_top = _top_k_em_blocos(n, k, pontuar_bloco, tamanho_bloco)
+        posicoes = locais if universo is None else universo[locais]
+        
+        matriz_top = preencher_nan_features(calcular_matriz_features(atributos[posicoes], vetor))
+        scores_top = calcular_scores_aspectos(matriz_top, fatores_penalizacao)
     
     # ═══════════════════════════════════════════════════════════════════
-    # CALCULAR SCORES 0-100 POR ASPECTO
+    # MONTAR SÓ AS k LINHAS VENCEDORAS
     # ═══════════════════════════════════════════════════════════════════
-    candidatos['score_area'] = 100 - np.minimum(
-        df_predicao['diff_area'] * fatores_penalizacao['area'],
-        100
-    )
-    
-    candidatos['score_perfil'] = 100 - np.minimum(
-        df_predicao['distancia_perfil'] * fatores_penalizacao['perfil'],
-        100
-    )
-    
-    candidatos['score_cargo'] = 100 - np.minimum(
-        df_predicao['diff_cargo'] * fatores_penalizacao['cargo'],
-        100
-    )
-    
-    candidatos['score_formacao'] = 100 - np.minimum(
-        df_predicao['diff_formacao'] * fatores_penalizacao['formacao'],
-        100
-    )
+    top_10 = candidatos.iloc[posicoes].copy()
     
-    candidatos['score_idade'] = 100 - np.minimum(
-        df_predicao['diff_idade'] * fatores_penalizacao['idade'],
-        100
-    )
+    for j, col in enumerate(COLUNAS_ATRIBUTOS):
+        if col in top_10.columns:
+            top_10[col] = atributos[posicoes, j]
     
-    candidatos['score_regime'] = 100 - np.minimum(
-        df_predicao['diff_regime'] * fatores_penalizacao['regime'],
-        100
+    # Previsões dos 3 modelos apenas para os candidatos selecionados
+    probabilidades = prever_deduplicado(
+        modelos, matriz_top, chaves=['LR', 'RF', 'XGB'], compilados=compilados
     )
+    top_10['prob_lr'] = probabilidades['LR']
+    top_10['prob_rf'] = probabilidades['RF']
+    top_10['prob_xgb'] = probabilidades['XGB']
     
-    # ═══════════════════════════════════════════════════════════════════
-    # SCORE PONDERADO FINAL
-    # ═══════════════════════════════════════════════════════════════════
-    candidatos['score_ponderado'] = (
-        candidatos['score_area'] * pesos['area'] +
-        candidatos['score_perfil'] * pesos['perfil'] +
-        candidatos['score_cargo'] * pesos['cargo'] +
-        candidatos['score_formacao'] * pesos['formacao'] +
-        candidatos['score_idade'] * pesos['idade'] +
-        candidatos['score_regime'] * pesos['regime']
-    )
+    for aspecto, valores in scores_top.items():
+        top_10[f'score_{aspecto}'] = valores
     
-    # ═══════════════════════════════════════════════════════════════════
-    # RANQUEAR E RETORNAR TOP 10
-    # ═══════════════════════════════════════════════════════════════════
-    top_10 = candidatos.nlargest(10, 'score_ponderado')
+    top_10['score_ponderado'] = score_top
     
     return top_10
 
 
+def _chave_graficos(df_resultados, y_test, probabilidades):
+    """Hash do conteúdo que entra nos gráficos (resultados, rótulos e probabilidades)"""
+    hasher = hashlib.sha256()
+    hasher.update(pd.util.hash_pandas_object(df_resultados, index=False).to_numpy().tobytes())
+    hasher.update(json.dumps(list(map(str, df_resultados.columns))).encode('utf-8'))
+
+    for nome, valores in [('y_test', y_test)] + sorted(probabilidades.items()):
+        array = np.ascontiguousarray(np.asarray(valores))
+        hasher.update(f'{nome}:{array.dtype.str}:{array.shape}'.encode('utf-8'))
+        hasher.update(array.tobytes())
+
+    return hasher.hexdigest()
+
+
 def gerar_graficos_comparacao(df_resultados, y_test, probabilidades):
     """
     Gera gráficos de comparação dos modelos
     
+    Memoizado pelo conteúdo: os mesmos resultados e probabilidades
+    devolvem os PNGs já gerados, sem redesenhar.
+    
     Args:
         df_resultados: DataFrame com resultados dos modelos
         y_test: Labels verdadeiros
         probabilidades: Dict com probabilidades de cada modelo
     
     Returns:
-        Dict com paths dos gráficos salvos
+        Dict com o conteúdo PNG (bytes) de 'metricas' e 'roc'
     """
-    
-    # Criar diretório temporário compatível com Windows
-    temp_dir = tempfile.gettempdir()
-    
-    # Configurar estilo
-    sns.set_style("whitegrid")
-    plt.rcParams['figure.figsize'] = (12, 5)
-    
-    # ═══════════════════════════════════════════════════════════════════
-    # GRÁFICO 1: COMPARAÇÃO DE MÉTRICAS
-    # ═══════════════════════════════════════════════════════════════════
-    fig1, ax1 = plt.subplots(figsize=(10, 6))
-    
-    metricas = ['Acurácia', 'Precisão', 'Recall', 'F1-Score', 'ROC-AUC']
-    x = np.arange(len(metricas))
-    width = 0.25
-    
-    for i, modelo in enumerate(df_resultados['Modelo']):
-        valores = df_resultados.iloc[i][metricas].values
-        ax1.bar(x + i*width, valores, width, label=modelo)
-    
-    ax1.set_xlabel('Métricas', fontsize=12)
-    ax1.set_ylabel('Score', fontsize=12)
-    ax1.set_title('Comparação de Desempenho dos Modelos', fontsize=14, fontweight='bold')
-    ax1.set_xticks(x + width)
-    ax1.set_xticklabels(metricas)
-    ax1.legend()
-    ax1.grid(True, alpha=0.3)
-    
-    path_metricas = os.path.join(temp_dir, 'comparacao_metricas.png')
-    plt.tight_layout()
-    plt.savefig(path_metricas, dpi=150, bbox_inches='tight')
-    plt.close()
-    
-    # ═══════════════════════════════════════════════════════════════════
-    # GRÁFICO 2: CURVAS ROC
-    # ═══════════════════════════════════════════════════════════════════
-    fig2, ax2 = plt.subplots(figsize=(8, 6))
-    
-    cores = ['#800c0f', '#e1a125', '#292727']
-    
-    for i, (modelo_nome, prob) in enumerate(probabilidades.items()):
-        fpr, tpr, _ = roc_curve(y_test, prob)
-        auc = roc_auc_score(y_test, prob)
+    return gerar_graficos_em_segundo_plano(df_resultados, y_test, probabilidades).result()
+
+
+def gerar_graficos_em_segundo_plano(df_resultados, y_test, probabilidades):
+    """
+    Agenda os gráficos numa thread e retorna na hora
+
+    Chamadas com o mesmo conteúdo compartilham o resultado em cache ou a
+    renderização em andamento.
+
+    Returns:
+        Future com o dict de gerar_graficos_comparacao
+    """
+    chave = _chave_graficos(df_resultados, y_test, probabilidades)
+
+    with _trava_cache_graficos:
+        if chave in _cache_graficos:
+            _cache_graficos.move_to_end(chave)
+            futuro = Future()
+            futuro.set_result(_cache_graficos[chave])
+            return futuro
+
+        futuro = _graficos_em_andamento.get(chave)
+        if futuro is None:
+            futuro = _executor_graficos.submit(
+                _renderizar_e_guardar, chave, df_resultados, y_test, probabilidades
+            )
+            _graficos_em_andamento[chave] = futuro
+
+    return futuro
+
+
+def _renderizar_e_guardar(chave, df_resultados, y_test, probabilidades):
+    try:
+        # rcParams do estilo são globais do matplotlib: uma renderização por vez
+        with TRAVA_GRAFICOS:
+            graficos = _gerar_graficos_comparacao(df_resultados, y_test, probabilidades)
+    except BaseException:
+        with _trava_cache_graficos:
+            _graficos_em_andamento.pop(chave, None)
+        raise
+
+    with _trava_cache_graficos:
+        _cache_graficos[chave] = graficos
+        while len(_cache_graficos) > MAX_GRAFICOS_EM_CACHE:
+            _cache_graficos.popitem(last=False)
+        _graficos_em_andamento.pop(chave, None)
+
+    return graficos
+
+
+def _figura_png(fig):
+    """Conteúdo PNG da figura (em memória, sem arquivo)"""
+    buffer = BytesIO()
+    fig.tight_layout()
+    fig.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
+    return buffer.getvalue()
+
+
+def _gerar_graficos_comparacao(df_resultados, y_test, probabilidades):
+    # API de objetos do matplotlib (Figure): nada passa pelo estado global do pyplot
+    with matplotlib.rc_context(sns.axes_style("whitegrid")):
         
-        if modelo_nome == 'LR':
-            label = f'Logistic Regression (AUC = {auc:.3f})'
-        elif modelo_nome == 'RF':
-            label = f'Random Forest (AUC = {auc:.3f})'
-        else:
-            label = f'XGBoost (AUC = {auc:.3f})'
+        # ═══════════════════════════════════════════════════════════════
+        # GRÁFICO 1: COMPARAÇÃO DE MÉTRICAS
+        # ═══════════════════════════════════════════════════════════════
+        fig1 = Figure(figsize=(10, 6))
+        ax1 = fig1.subplots()
         
-        ax2.plot(fpr, tpr, color=cores[i], linewidth=2, label=label)
-    
-    ax2.plot([0, 1], [0, 1], 'k--', linewidth=1, alpha=0.5)
-    ax2.set_xlabel('Taxa de Falsos Positivos', fontsize=12)
-    ax2.set_ylabel('Taxa de Verdadeiros Positivos', fontsize=12)
-    ax2.set_title('Curvas ROC dos Modelos', fontsize=14, fontweight='bold')
-    ax2.legend(loc='lower right')
-    ax2.grid(True, alpha=0.3)
-    
-    path_roc = os.path.join(temp_dir, 'curvas_roc.png')
-    plt.tight_layout()
-    plt.savefig(path_roc, dpi=150, bbox_inches='tight')
-    plt.close()
+        metricas = ['Acurácia', 'Precisão', 'Recall', 'F1-Score', 'ROC-AUC']
+        x = np.arange(len(metricas))
+        width = 0.25
+        
+        for i, modelo in enumerate(df_resultados['Modelo']):
+            valores = df_resultados.iloc[i][metricas].values
+            ax1.bar(x + i*width, valores, width, label=modelo)
+        
+        ax1.set_xlabel('Métricas', fontsize=12)
+        ax1.set_ylabel('Score', fontsize=12)
+        ax1.set_title('Comparação de Desempenho dos Modelos', fontsize=14, fontweight='bold')
+        ax1.set_xticks(x + width)
+        ax1.set_xticklabels(metricas)
+        ax1.legend()
+        ax1.grid(True, alpha=0.3)
+        
+        png_metricas = _figura_png(fig1)
+        
+        # ═══════════════════════════════════════════════════════════════
+        # GRÁFICO 2: CURVAS ROC
+        # ═══════════════════════════════════════════════════════════════
+        fig2 = Figure(figsize=(8, 6))
+        ax2 = fig2.subplots()
+        
+        cores = ['#800c0f', '#e1a125', '#292727']
+        
+        for i, (modelo_nome, prob) in enumerate(probabilidades.items()):
+            fpr, tpr, _ = roc_curve(y_test, prob)
+            auc = roc_auc_score(y_test, prob)
+            
+            if modelo_nome == 'LR':
+                label = f'Logistic Regression (AUC = {auc:.3f})'
+            elif modelo_nome == 'RF':
+                label = f'Random Forest (AUC = {auc:.3f})'
+            else:
+                label = f'XGBoost (AUC = {auc:.3f})'
+            
+            ax2.plot(fpr, tpr, color=cores[i], linewidth=2, label=label)
+        
+        ax2.plot([0, 1], [0, 1], 'k--', linewidth=1, alpha=0.5)
+        ax2.set_xlabel('Taxa de Falsos Positivos', fontsize=12)
+        ax2.set_ylabel('Taxa de Verdadeiros Positivos', fontsize=12)
+        ax2.set_title('Curvas ROC dos Modelos', fontsize=14, fontweight='bold')
+        ax2.legend(loc='lower right')
+        ax2.grid(True, alpha=0.3)
+        
+        png_roc = _figura_png(fig2)
     
     return {
-        'metricas': path_metricas,
-        'roc': path_roc
-    }
\ No newline at end of file
+        'metricas': png_metricas,
+        'roc': png_roc
+    }
@@ -0,0 +1,271 @@
+"""
+Módulo de geração de dados sintéticos com o mesmo esquema das abas
+do Google Sheets (candidatos, vagas e matches)
+
+Os códigos seguem os dicionários de utils/dicionarios.py, o perfil
+comportamental soma 100 (uma casa decimal, e parte dos perfis com
+CASAS_PERFIS_PRECISOS casas, como na planilha real) e o rótulo dos
+matches depende do score de negócio do par, para que os modelos tenham
+sinal a aprender. Tudo é vetorizado: de mil a dezenas de milhões de linhas.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.dicionarios import (
+    faixas_etarias, niveis_formacao, areas_atuacao, niveis_cargo, regimes,
+    clusters_areas, PESOS_PADRAO, FATORES_PENALIZACAO_PADRAO
+)
+from utils.features import COLUNAS_ATRIBUTOS, VALORES_PADRAO
+from utils.pontuacao import calcular_scores_aspectos, calcular_score_ponderado
+
+
+# Distribuição de cada código (pesos relativos, na ordem das chaves do dicionário)
+PESOS_FAIXAS_ETARIAS = [4, 16, 20, 17, 13, 10, 7, 5, 4, 3, 1]
+PESOS_NIVEIS_FORMACAO = [1, 2, 3, 3, 20, 3, 8, 12, 22, 5, 12, 2, 5, 1, 2]
+PESOS_NIVEIS_CARGO = [6, 8, 20, 28, 10, 9, 10, 3, 6]
+PESOS_REGIMES = [35, 35, 15, 15]
+
+# Peso de cada cluster de áreas (uniforme dentro do cluster)
+PESOS_CLUSTERS = {
+    'Negócios': 38, 'Criativo': 17, 'Tecnologia': 15, 'Engenharia': 10,
+    'Infraestrutura': 8, 'Agronegócio': 4, 'Saúde': 6, 'Segurança': 2
+}
+
+# Concentração de Dirichlet do perfil (autoridade, prestígio, preservação, formalidade)
+DIRICHLET_PERFIL = [2.0, 1.6, 2.4, 2.0]
+
+# Fração dos perfis com CASAS_PERFIS_PRECISOS casas decimais (os demais em décimos):
+# precisão além de 4 casas faz a referência do benchmark pegar arredondamentos
+FRACAO_PERFIS_PRECISOS = 0.25
+CASAS_PERFIS_PRECISOS = 6
+
+# Fração de células vazias (códigos) e de perfis vazios nas abas de candidatos e vagas
+FRACAO_FALTANTES = 0.01
+
+# Fração dos matches sorteados entre candidatos da mesma área da vaga
+FRACAO_MESMA_AREA = 0.5
+
+# Probabilidade de match = sigmoide((score de negócio - CENTRO) / ESCALA)
+CENTRO_SCORE_MATCH = 70.0
+ESCALA_SCORE_MATCH = 6.0
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SORTEIO DOS ATRIBUTOS
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _sortear(dicionario, pesos, n, rng):
+    codigos = np.array(list(dicionario.keys()))
+    pesos = np.asarray(pesos, dtype=np.float64)
+    return codigos[rng.choice(len(codigos), n, p=pesos / pesos.sum())]
+
+
+def _sortear_areas(n, rng):
+    codigos, pesos = [], []
+    for cluster, areas in clusters_areas.items():
+        codigos += areas
+        pesos += [PESOS_CLUSTERS[cluster] / len(areas)] * len(areas)
+    pesos = np.asarray(pesos)
+    return np.array(codigos)[rng.choice(len(codigos), n, p=pesos / pesos.sum())]
+
+
+def gerar_perfis(n, rng, fracao_precisos=FRACAO_PERFIS_PRECISOS):
+    """
+    Perfis comportamentais (n, 4), todos >= 0 e somando 100: uma casa
+    decimal, ou CASAS_PERFIS_PRECISOS casas numa fração fracao_precisos
+    das linhas
+
+    Sorteia em unidades da última casa e distribui o resto pelos maiores
+    restos (arredondar cada coluna isoladamente não garante a soma).
+    """
+    escala = np.where(rng.random(n) < fracao_precisos, 10.0 ** (CASAS_PERFIS_PRECISOS + 2), 1000.0)
+    unidades = rng.dirichlet(DIRICHLET_PERFIL, n) * escala[:, None]
+    base = np.floor(unidades)
+    faltam = (escala - base.sum(axis=1)).astype(np.int64)
+
+    # Posição de cada coluna na ordem decrescente da parte fracionária
+    ordem = np.argsort(-(unidades - base), axis=1)
+    posicao = np.empty_like(ordem)
+    np.put_along_axis(posicao, ordem, np.arange(4)[None, :], axis=1)
+
+    base += posicao < faltam[:, None]
+    return base / (escala[:, None] / 100)
+
+
+def gerar_atributos(n, rng):
+    """
+    Matriz (n, 9) na ordem de COLUNAS_ATRIBUTOS, sem faltantes
+
+    Returns:
+        np.ndarray float64
+    """
+    atributos = np.empty((n, len(COLUNAS_ATRIBUTOS)), dtype=np.float64)
+    atributos[:, 0] = _sortear(faixas_etarias, PESOS_FAIXAS_ETARIAS, n, rng)
+    atributos[:, 1] = _sortear(niveis_formacao, PESOS_NIVEIS_FORMACAO, n, rng)
+    atributos[:, 2] = _sortear_areas(n, rng)
+    atributos[:, 3] = _sortear(niveis_cargo, PESOS_NIVEIS_CARGO, n, rng)
+    atributos[:, 4] = _sortear(regimes, PESOS_REGIMES, n, rng)
+    atributos[:, 5:] = gerar_perfis(n, rng)
+    return atributos
+
+
+def _aplicar_faltantes(atributos, fracao, rng):
+    """Esvazia códigos isolados e perfis inteiros (como células vazias na planilha)"""
+    if fracao <= 0:
+        return atributos
+
+    atributos = atributos.copy()
+    atributos[:, :5][rng.random((len(atributos), 5)) < fracao] = np.nan
+    atributos[rng.random(len(atributos)) < fracao, 5:] = np.nan
+    return atributos
+
+
+def _tabela(atributos, como_texto):
+    """DataFrame com as colunas de atributos, em texto (como a planilha) ou numérico"""
+    tabela = {}
+
+    for j, coluna in enumerate(COLUNAS_ATRIBUTOS):
+        valores = atributos[:, j]
+        if not como_texto:
+            tabela[coluna] = valores
+            continue
+
+        vazios = np.isnan(valores)
+        # Códigos inteiros; perfil pelo repr curto (ex.: '25.3' ou '25.314159').
+        # Via pandas: strings Python, sem o array unicode de largura fixa do NumPy
+        numeros = pd.Series(np.where(vazios, 0, valores))
+        texto = (numeros.astype(np.int64) if j < 5 else numeros).astype(str)
+        texto[vazios] = ''
+        tabela[coluna] = texto
+
+    return pd.DataFrame(tabela)
+
+
+def _rotulos(dicionario, codigos):
+    """Descrição do dicionário para cada código ('' quando vazio)"""
+    serie = pd.Series(codigos)
+    return serie.map(dicionario).fillna('').to_numpy()
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# ABAS
+# ═══════════════════════════════════════════════════════════════════════════
+
+def gerar_candidatos(n, rng, como_texto=True, fracao_faltantes=FRACAO_FALTANTES):
+    """
+    Aba de candidatos
+
+    Returns:
+        Tupla (DataFrame, matriz de atributos sem faltantes usada nos matches)
+    """
+    atributos = gerar_atributos(n, rng)
+    com_faltantes = _aplicar_faltantes(atributos, fracao_faltantes, rng)
+
+    df = _tabela(com_faltantes, como_texto)
+    ids = pd.Series(np.arange(1, n + 1)).astype(str)
+    df.insert(0, 'id', ids.to_numpy())
+    df.insert(1, 'Nome Completo', ('Candidato ' + ids).to_numpy())
+    df['Área de Atuação'] = _rotulos(areas_atuacao, com_faltantes[:, 2])
+    df['Nível do cargo atual'] = _rotulos(niveis_cargo, com_faltantes[:, 3])
+    df['Nível de Formação'] = _rotulos(niveis_formacao, com_faltantes[:, 1])
+
+    return df, _imputar(com_faltantes)
+
+
+def gerar_vagas(n, rng, como_texto=True, fracao_faltantes=FRACAO_FALTANTES):
+    """
+    Aba de vagas
+
+    Returns:
+        Tupla (DataFrame, matriz de atributos sem faltantes usada nos matches)
+    """
+    atributos = gerar_atributos(n, rng)
+    com_faltantes = _aplicar_faltantes(atributos, fracao_faltantes, rng)
+
+    df = _tabela(com_faltantes, como_texto)
+    df.insert(0, 'ID_vaga', pd.Series(np.arange(1, n + 1)).astype(str).radd('V').to_numpy())
+
+    return df, _imputar(com_faltantes)
+
+
+def _imputar(atributos):
+    """Mesmos valores padrão de matriz_atributos para os faltantes"""
+    padroes = np.array([VALORES_PADRAO[coluna] for coluna in COLUNAS_ATRIBUTOS], dtype=np.float64)
+    return np.where(np.isnan(atributos), padroes, atributos)
+
+
+def gerar_matches(atributos_candidatos, ids_candidatos, atributos_vagas, ids_vagas, n, rng,
+                  como_texto=True):
+    """
+    Aba de matches: pares candidato × vaga com rótulo sorteado a partir
+    do score de negócio do par
+
+    Metade dos pares (FRACAO_MESMA_AREA) usa candidatos da mesma área da
+    vaga, como numa triagem real; o restante é sorteado sem restrição.
+    """
+    n_candidatos = len(atributos_candidatos)
+    vagas = rng.integers(0, len(atributos_vagas), n)
+    candidatos = rng.integers(0, n_candidatos, n)
+
+    # Candidatos agrupados por área: sorteio dentro do bloco da área da vaga
+    ordem = np.argsort(atributos_candidatos[:, 2], kind='stable')
+    areas_ordenadas = atributos_candidatos[ordem, 2]
+    area_vaga = atributos_vagas[vagas, 2]
+    inicio = np.searchsorted(areas_ordenadas, area_vaga, side='left')
+    fim = np.searchsorted(areas_ordenadas, area_vaga, side='right')
+
+    mesma_area = (rng.random(n) < FRACAO_MESMA_AREA) & (fim > inicio)
+    deslocamento = (rng.random(n) * np.maximum(fim - inicio, 1)).astype(np.int64)
+    candidatos = np.where(mesma_area, ordem[np.minimum(inicio + deslocamento, n_candidatos - 1)], candidatos)
+
+    # Score de negócio do par (mesmas features do treino)
+    diferencas = np.abs(atributos_candidatos[candidatos] - atributos_vagas[vagas])
+    matriz = np.concatenate(
+        [diferencas, np.sqrt((diferencas[:, 5:] ** 2).sum(axis=1, keepdims=True))], axis=1
+    )
+    score = calcular_score_ponderado(calcular_scores_aspectos(matriz, FATORES_PENALIZACAO_PADRAO), PESOS_PADRAO)
+
+    probabilidade = 1 / (1 + np.exp(-(score - CENTRO_SCORE_MATCH) / ESCALA_SCORE_MATCH))
+    match = (rng.random(n) < probabilidade).astype(np.int64)
+
+    return pd.DataFrame({
+        'id_vaga': ids_vagas[vagas],
+        'id_candidato': ids_candidatos[candidatos],
+        'match': match.astype(str) if como_texto else match
+    })
+
+
+def gerar_abas(n_candidatos, n_vagas=None, n_matches=None, semente=42, como_texto=True,
+               fracao_faltantes=FRACAO_FALTANTES):
+    """
+    Gera as três abas com o esquema do Google Sheets
+
+    Args:
+        n_candidatos: Linhas da aba de candidatos
+        n_vagas: Linhas da aba de vagas (padrão: n_candidatos // 200, mínimo 20)
+        n_matches: Linhas da aba de matches (padrão: n_candidatos)
+        semente: Semente do gerador (mesma semente = mesmas abas)
+        como_texto: True devolve tudo em texto, como vem da planilha;
+                    False devolve códigos e perfil numéricos (tipar_dataframe
+                    aceita os dois). O pico fica perto de 800 bytes por linha
+                    de candidato em texto e 650 em numérico (10 milhões de
+                    linhas: use False e reserve ~6 GB)
+        fracao_faltantes: Fração de células vazias em candidatos e vagas
+
+    Returns:
+        Dict 'candidatos', 'vagas', 'matches' -> DataFrame
+    """
+    n_vagas = max(20, n_candidatos // 200) if n_vagas is None else n_vagas
+    n_matches = n_candidatos if n_matches is None else n_matches
+    rng = np.random.default_rng(semente)
+
+    candidatos, atributos_candidatos = gerar_candidatos(n_candidatos, rng, como_texto, fracao_faltantes)
+    vagas, atributos_vagas = gerar_vagas(n_vagas, rng, como_texto, fracao_faltantes)
+    matches = gerar_matches(
+        atributos_candidatos, candidatos['id'].to_numpy(),
+        atributos_vagas, vagas['ID_vaga'].to_numpy(),
+        n_matches, rng, como_texto
+    )
+
+    return {'candidatos': candidatos, 'vagas': vagas, 'matches': matches}
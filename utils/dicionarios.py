@@ -141,4 +141,16 @@ PESOS_PADRAO = {
     'formacao': 0.10,
     'idade': 0.03,
     'regime': 0.02
-}
\ No newline at end of file
+}
+
+# ═══════════════════════════════════════════════════════════════════════════
+# FATORES DE PENALIZAÇÃO PADRÃO (pontos perdidos por unidade de diferença)
+# ═══════════════════════════════════════════════════════════════════════════
+FATORES_PENALIZACAO_PADRAO = {
+    'area': 10.0,
+    'perfil': 1.5,
+    'cargo': 12.5,
+    'formacao': 7.0,
+    'idade': 10.0,
+    'regime': 25.0
+}
@@ -0,0 +1,107 @@
+"""
+Módulo de tipagem compacta das abas carregadas do Google Sheets
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Tipo lógico de cada coluna conhecida das abas
+ESQUEMA_COLUNAS = {
+    # Códigos dos dicionários (inteiros pequenos)
+    'Intervalo_Idade_Código': 'codigo',
+    'Nível_Formação_Código': 'codigo',
+    'Nível do cargo código': 'codigo',
+    'Área_Atuação_Código': 'codigo',
+    'Regime código': 'codigo',
+    'match': 'codigo',
+
+    # Perfil comportamental
+    'autoridade': 'perfil',
+    'prestigio': 'perfil',
+    'preservacao': 'perfil',
+    'formalidade': 'perfil',
+
+    # Identificadores (usados nos merges, mantidos como texto)
+    'id': 'id',
+    'ID_vaga': 'id',
+    'id_vaga': 'id',
+    'id_candidato': 'id'
+}
+
+# Colunas de texto com menos valores distintos que isso (proporção) viram category
+LIMITE_CATEGORIA = 0.5
+
+
+def _tipo_texto():
+    # Strings Arrow quando pyarrow está disponível (vem junto com o streamlit)
+    try:
+        return pd.StringDtype('pyarrow')
+    except ImportError:
+        return pd.StringDtype()
+
+
+def _tipar_codigo(serie):
+    numeros = pd.to_numeric(serie, errors='coerce')
+    validos = numeros.dropna()
+
+    if validos.empty:
+        return numeros.astype('Int8')
+
+    if (validos % 1 == 0).all():
+        for tipo in ('int8', 'int16'):
+            limites = np.iinfo(tipo)
+            if validos.min() >= limites.min and validos.max() <= limites.max:
+                return numeros.astype(tipo.capitalize())
+
+    # Códigos fracionários ficam em float64 (float32 mudaria o valor)
+    return numeros.astype('float64')
+
+
+def _tipar_texto(serie):
+    if len(serie) > 0 and serie.nunique(dropna=True) <= LIMITE_CATEGORIA * len(serie):
+        return serie.astype('category')
+    return serie.astype(_tipo_texto())
+
+
+def tipar_dataframe(df):
+    """
+    Converte as colunas de uma aba para tipos compactos, uma única vez
+
+    Códigos viram Int8/Int16 (nulos preservados), o perfil comportamental
+    vira float64 (float32 arredondaria os valores digitados e mudaria
+    distâncias, scores e rankings), identificadores viram strings Arrow e
+    os demais textos viram category (poucos valores distintos) ou strings
+    Arrow.
+
+    Args:
+        df: DataFrame com as colunas em texto (como vem do Google Sheets)
+
+    Returns:
+        Novo DataFrame com os tipos compactos
+    """
+    colunas = {}
+
+    for col in df.columns:
+        tipo = ESQUEMA_COLUNAS.get(col)
+
+        if tipo == 'codigo':
+            colunas[col] = _tipar_codigo(df[col])
+        elif tipo == 'perfil':
+            colunas[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+        elif tipo == 'id':
+            colunas[col] = df[col].astype(_tipo_texto())
+        else:
+            colunas[col] = _tipar_texto(df[col])
+
+    return pd.DataFrame(colunas, index=df.index)
+
+
+def para_float64(serie):
+    """
+    Converte uma coluna (texto, Int8/Int16 ou float64) em float64 com NaN
+    """
+    if isinstance(serie.dtype, np.dtype) and serie.dtype == np.float64:
+        return serie
+
+    return pd.to_numeric(serie, errors='coerce').astype(np.float64)
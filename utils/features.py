@@ -0,0 +1,185 @@
+"""
+Módulo de cálculo vetorizado das features candidato × vaga
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.esquema import para_float64
+
+
+# Ordem das features usada no treino e na previsão dos modelos
+FEATURES = [
+    'diff_idade',
+    'diff_formacao',
+    'diff_area',
+    'diff_cargo',
+    'diff_regime',
+    'diff_autoridade',
+    'diff_prestigio',
+    'diff_preservacao',
+    'diff_formalidade',
+    'distancia_perfil'
+]
+
+# Colunas do candidato, na mesma ordem das diferenças em FEATURES
+COLUNAS_ATRIBUTOS = [
+    'Intervalo_Idade_Código',
+    'Nível_Formação_Código',
+    'Área_Atuação_Código',
+    'Nível do cargo código',
+    'Regime código',
+    'autoridade',
+    'prestigio',
+    'preservacao',
+    'formalidade'
+]
+
+# Chaves equivalentes no dicionário da vaga
+CHAVES_VAGA = [
+    'codigo_idade',
+    'codigo_formacao',
+    'codigo_area',
+    'codigo_cargo',
+    'codigo_regime',
+    'autoridade',
+    'prestigio',
+    'preservacao',
+    'formalidade'
+]
+
+# Valores usados quando o atributo do candidato está vazio
+VALORES_PADRAO = {
+    'Intervalo_Idade_Código': 2,
+    'Nível_Formação_Código': 4,
+    'Área_Atuação_Código': 1,
+    'Nível do cargo código': 3,
+    'Regime código': 0,
+    'autoridade': 25.0,
+    'prestigio': 25.0,
+    'preservacao': 25.0,
+    'formalidade': 25.0
+}
+
+
+def matriz_atributos(candidatos, retornar_imputados=False, imputar=True):
+    """
+    Converte os atributos dos candidatos em uma matriz numérica
+
+    Args:
+        candidatos: DataFrame com candidatos (colunas texto ou numéricas)
+        retornar_imputados: Se True, retorna também a máscara dos valores
+                            preenchidos com o padrão
+        imputar: Se False, valores vazios continuam NaN (vagas: o padrão
+                 é de candidato, não um requisito)
+
+    Returns:
+        np.ndarray float64 (n_candidatos, 9) na ordem de COLUNAS_ATRIBUTOS,
+        com valores vazios preenchidos por VALORES_PADRAO
+        (e a máscara bool (n_candidatos, 9) se retornar_imputados)
+    """
+    atributos = np.empty((len(candidatos), len(COLUNAS_ATRIBUTOS)), dtype=np.float64)
+    imputados = np.zeros(atributos.shape, dtype=bool)
+
+    for j, col in enumerate(COLUNAS_ATRIBUTOS):
+        if col in candidatos.columns:
+            atributos[:, j] = para_float64(candidatos[col]).to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            atributos[:, j] = np.nan
+
+        vazios = np.isnan(atributos[:, j])
+        if imputar and vazios.any():
+            atributos[vazios, j] = VALORES_PADRAO[col]
+            imputados[:, j] = vazios
+
+    if retornar_imputados:
+        return atributos, imputados
+
+    return atributos
+
+
+def vetor_vaga(vagas):
+    """
+    Converte uma ou várias vagas em vetor(es) na ordem de CHAVES_VAGA
+
+    Args:
+        vagas: dict de uma vaga ou lista de dicts
+
+    Returns:
+        np.ndarray float64 (9,) para uma vaga ou (n_vagas, 9) para uma lista
+    """
+    if isinstance(vagas, dict):
+        return np.array([float(vagas[k]) for k in CHAVES_VAGA], dtype=np.float64)
+
+    return np.array(
+        [[float(v[k]) for k in CHAVES_VAGA] for v in vagas],
+        dtype=np.float64
+    ).reshape(-1, len(CHAVES_VAGA))
+
+
+def calcular_matriz_features(atributos, vagas):
+    """
+    Calcula as features de todos os candidatos contra uma ou várias vagas
+    em uma única operação de broadcast
+
+    Args:
+        atributos: Matriz (n_candidatos, 9) de matriz_atributos
+        vagas: Vetor (9,) de uma vaga ou matriz (n_vagas, 9)
+
+    Returns:
+        np.ndarray (n_candidatos, 10) para uma vaga ou
+        (n_candidatos, n_vagas, 10) para várias, na ordem de FEATURES
+    """
+    atributos = np.asarray(atributos, dtype=np.float64)
+    vagas = np.asarray(vagas, dtype=np.float64)
+
+    if vagas.ndim == 1:
+        diffs = np.abs(atributos - vagas)
+    else:
+        diffs = np.abs(atributos[:, None, :] - vagas[None, :, :])
+
+    matriz = np.empty(diffs.shape[:-1] + (len(FEATURES),), dtype=np.float64)
+    matriz[..., :9] = diffs
+
+    # Distância euclidiana do perfil (soma na mesma ordem do cálculo original)
+    matriz[..., 9] = np.sqrt(
+        diffs[..., 5]**2 +
+        diffs[..., 6]**2 +
+        diffs[..., 7]**2 +
+        diffs[..., 8]**2
+    )
+
+    return matriz
+
+
+def preencher_nan_features(matriz):
+    """
+    Preenche NaN de cada feature com o máximo da coluna (ou 10 se não houver)
+
+    Args:
+        matriz: Matriz de features (..., 10), alterada no próprio array
+
+    Returns:
+        A mesma matriz, sem NaN
+    """
+    colunas = matriz.reshape(-1, matriz.shape[-1])
+
+    for j in range(colunas.shape[1]):
+        vazios = np.isnan(colunas[:, j])
+        if not vazios.any():
+            continue
+
+        max_val = np.nanmax(colunas[:, j]) if not vazios.all() else np.nan
+        if np.isnan(max_val) or max_val == 0:
+            max_val = 10
+        colunas[vazios, j] = max_val
+
+    return matriz
+
+
+def features_dataframe(matriz, index=None):
+    """
+    Envolve a matriz de features (n, 10) em um DataFrame com os nomes
+    usados no treino dos modelos
+    """
+    return pd.DataFrame(matriz, columns=FEATURES, index=index, copy=False)
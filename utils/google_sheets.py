@@ -7,6 +7,35 @@ from google.oauth2.service_account import Credentials
 import pandas as pd
 import streamlit as st
 import os
+import hashlib
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from gspread.utils import fill_gaps, rowcol_to_a1
+
+from utils.snapshot import (
+    MODO_OFFLINE, salvar_snapshot, carregar_snapshot, ler_metadados, atualizar_metadados
+)
+
+
+# Intervalo mínimo entre atualizações dos snapshots em segundo plano
+INTERVALO_ATUALIZACAO = 300
+
+# Abas que só recebem linhas novas no fim (sincronização incremental)
+ABAS_INCREMENTAIS = ('matches',)
+
+# Recarga completa obrigatória depois de tantas sincronizações incrementais
+MAX_SINCRONIZACOES_INCREMENTAIS = 20
+
+# Linhas antigas sorteadas e conferidas em cada sincronização incremental
+AMOSTRA_VERIFICACAO = 3
+
+_ultima_atualizacao = {}
+_trava_atualizacao = threading.Lock()
+
+_log = logging.getLogger(__name__)
 
 
 @st.cache_resource
@@ -59,65 +88,123 @@ def conectar_google_sheets():
         return None
 
 
-@st.cache_data(ttl=300, show_spinner=False)
-def carregar_planilha(nome_ou_url_ou_id, aba=0):
+def _abrir_planilha(client, nome_ou_url_ou_id):
+    """Abre a planilha detectando automaticamente se é URL, ID ou nome"""
+    if 'docs.google.com' in str(nome_ou_url_ou_id):
+        return client.open_by_url(nome_ou_url_ou_id)
+    elif len(str(nome_ou_url_ou_id)) > 30 and '/' not in str(nome_ou_url_ou_id):
+        return client.open_by_key(nome_ou_url_ou_id)
+    else:
+        return client.open(nome_ou_url_ou_id)
+
+
+def _revisao_planilha(planilha):
+    """Data da última alteração da planilha (None se indisponível)"""
+    try:
+        return planilha.get_lastUpdateTime()
+    except Exception:
+        return None
+
+
+def _valores_para_dataframe(todos_valores, inicio=0):
+    """
+    Converte a matriz de valores de uma aba em DataFrame
+    (primeira linha = headers, colunas sem nome renomeadas)
+    
+    O índice é a posição da linha de dados na aba, a partir de inicio
+    (a linha de dados 0 é a linha 2 da planilha).
+    """
+    if len(todos_valores) == 0:
+        return pd.DataFrame()
+    
+    # Primeira linha = headers
+    headers_originais = todos_valores[0]
+    
+    # Renomear colunas vazias
+    headers_limpos = []
+    contador_vazio = 1
+    for h in headers_originais:
+        if h == '' or h.strip() == '':
+            headers_limpos.append(f'Coluna_Vazia_{contador_vazio}')
+            contador_vazio += 1
+        else:
+            headers_limpos.append(h.strip())
+    
+    # Criar DataFrame
+    dados = todos_valores[1:]  # Pular header
+    df = pd.DataFrame(
+        dados,
+        columns=headers_limpos,
+        index=pd.RangeIndex(inicio, inicio + len(dados))
+    )
+    
+    # Remover linhas completamente vazias
+    df = df.replace('', pd.NA).dropna(how='all')
+    
+    return df
+
+
+def _intervalo_aba(aba):
+    """Intervalo A1 que cobre a aba inteira"""
+    return "'" + aba.replace("'", "''") + "'"
+
+
+def carregar_abas(nome_ou_url_ou_id, abas):
     """
-    Carrega dados de uma planilha do Google Sheets
+    Carrega várias abas abrindo a planilha uma única vez
+    
+    Todos os valores vêm em uma só requisição values:batchGet; a revisão
+    da planilha (para os snapshots) é consultada em paralelo.
     
     Args:
         nome_ou_url_ou_id: Nome da planilha, URL completa OU ID direto
-        aba: Índice da aba (0 = primeira) ou nome da aba
+        abas: Lista com os nomes das abas
     
     Returns:
-        DataFrame com os dados
+        Dict com 'abas' (aba -> DataFrame) e 'tempos' (segundos por etapa),
+        ou None em caso de erro
     """
+    tempos = {}
+    
     try:
+        inicio = time.perf_counter()
         client = conectar_google_sheets()
+        tempos['conexao'] = time.perf_counter() - inicio
         
         if client is None:
             return None
         
-        # Detectar automaticamente se é URL, ID ou nome
-        if 'docs.google.com' in str(nome_ou_url_ou_id):
-            planilha = client.open_by_url(nome_ou_url_ou_id)
-        elif len(str(nome_ou_url_ou_id)) > 30 and '/' not in str(nome_ou_url_ou_id):
-            planilha = client.open_by_key(nome_ou_url_ou_id)
-        else:
-            planilha = client.open(nome_ou_url_ou_id)
-        
-        # Abrir aba específica
-        if isinstance(aba, int):
-            worksheet = planilha.get_worksheet(aba)
-        else:
-            worksheet = planilha.worksheet(aba)
-        
-        # Ler dados brutos
-        todos_valores = worksheet.get_all_values()
+        inicio = time.perf_counter()
+        planilha = _abrir_planilha(client, nome_ou_url_ou_id)
+        tempos['abertura'] = time.perf_counter() - inicio
         
-        if len(todos_valores) == 0:
-            return pd.DataFrame()
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futuro_revisao = executor.submit(_revisao_planilha, planilha)
+            resposta = planilha.values_batch_get([_intervalo_aba(aba) for aba in abas])
+            revisao = futuro_revisao.result()
+        tempos['valores'] = time.perf_counter() - inicio
         
-        # Primeira linha = headers
-        headers_originais = todos_valores[0]
+        inicio = time.perf_counter()
+        resultado = {}
+        estados = {}
+        for aba, intervalo in zip(abas, resposta.get('valueRanges', [])):
+            # A API omite células vazias no fim das linhas: completar o retângulo
+            valores = fill_gaps(intervalo.get('values', []))
+            resultado[aba] = _valores_para_dataframe(valores)
+            estados[aba] = _estado_sincronizacao(valores)
+        tempos['conversao'] = time.perf_counter() - inicio
         
-        # Renomear colunas vazias
-        headers_limpos = []
-        contador_vazio = 1
-        for h in headers_originais:
-            if h == '' or h.strip() == '':
-                headers_limpos.append(f'Coluna_Vazia_{contador_vazio}')
-                contador_vazio += 1
-            else:
-                headers_limpos.append(h.strip())
-        
-        # Criar DataFrame
-        dados = todos_valores[1:]  # Pular header
-        df = pd.DataFrame(dados, columns=headers_limpos)
-        
-        # Remover linhas completamente vazias
-        df = df.replace('', pd.NA).dropna(how='all')
+        inicio = time.perf_counter()
+        try:
+            for aba, df in resultado.items():
+                salvar_snapshot(nome_ou_url_ou_id, aba, df, revisao, extras=estados[aba])
+            _ultima_atualizacao[str(nome_ou_url_ou_id)] = time.monotonic()
+        except Exception:
+            pass
+        tempos['snapshot'] = time.perf_counter() - inicio
         
-        return df
+        return {'abas': resultado, 'tempos': tempos}
     
     except gspread.exceptions.SpreadsheetNotFound:
         st.error(f"❌ Planilha '{nome_ou_url_ou_id}' não encontrada!")
@@ -134,6 +221,305 @@ def carregar_planilha(nome_ou_url_ou_id, aba=0):
         return None
 
 
+def _estado_sincronizacao(valores, sincronizacoes_incrementais=0):
+    """
+    Metadados que permitem buscar depois apenas as linhas novas da aba e
+    reconhecer uma recarga completa que não mudou nada
+    """
+    conteudo = hashlib.sha1()
+    for linha in valores:
+        conteudo.update('\x1f'.join(map(str, linha)).encode('utf-8') + b'\x1e')
+    
+    return {
+        'linhas_brutas': len(valores),
+        'cabecalho': list(valores[0]) if valores else [],
+        'checksum_ultima_linha': (
+            _checksum_linha(valores[-1], len(valores[0])) if len(valores) > 1 else None
+        ),
+        'checksum_conteudo': conteudo.hexdigest(),
+        'sincronizacoes_incrementais': sincronizacoes_incrementais
+    }
+
+
+def _checksum_linha(linha, n_colunas):
+    # Normaliza a largura para a do cabeçalho antes de calcular
+    linha = (list(map(str, linha)) + [''] * n_colunas)[:n_colunas]
+    return hashlib.sha1('\x1f'.join(linha).encode('utf-8')).hexdigest()
+
+
+def _linha_do_snapshot(df, rotulo, n_colunas):
+    """Reconstrói a linha bruta (strings, vazios = '') a partir do snapshot"""
+    if rotulo not in df.index:
+        return [''] * n_colunas
+    return ['' if pd.isna(v) else str(v) for v in df.loc[rotulo].tolist()]
+
+
+def _plano_incremental(aba, df, metadados):
+    """
+    Intervalos A1 necessários para sincronizar uma aba incrementalmente
+    
+    Returns:
+        Dict com os intervalos (cabeçalho, linhas de verificação e cauda)
+        ou None se a aba precisa de recarga completa
+    """
+    if (
+        df is None or metadados is None
+        or metadados.get('linhas_brutas', 0) < 2
+        or not metadados.get('cabecalho')
+        or len(df.columns) != len(metadados.get('cabecalho', []))
+        or metadados.get('sincronizacoes_incrementais', 0) >= MAX_SINCRONIZACOES_INCREMENTAIS
+    ):
+        return None
+    
+    n_colunas = len(metadados['cabecalho'])
+    coluna_final = ''.join(c for c in rowcol_to_a1(1, n_colunas) if c.isalpha())
+    ultima_linha = metadados['linhas_brutas']
+    nome = _intervalo_aba(aba)
+    
+    # Algumas linhas antigas sorteadas para detectar edições no meio da aba
+    anteriores = [r for r in df.index if r + 2 < ultima_linha]
+    amostra = random.sample(anteriores, min(AMOSTRA_VERIFICACAO, len(anteriores)))
+    
+    return {
+        'cabecalho': f"{nome}!A1:{coluna_final}1",
+        'amostra': [(r, f"{nome}!A{r + 2}:{coluna_final}{r + 2}") for r in amostra],
+        # A cauda começa na última linha conhecida, para conferir que ela não mudou
+        'cauda': f"{nome}!A{ultima_linha}:{coluna_final}",
+        'n_colunas': n_colunas
+    }
+
+
+def _aplicar_incremental(df, metadados, plano, valores):
+    """
+    Confere as linhas já conhecidas e anexa as novas ao snapshot
+    
+    Args:
+        valores: Dict intervalo -> lista de linhas retornadas pela API
+    
+    Returns:
+        Tupla (DataFrame atualizado, novo estado, linhas novas) ou None se
+        alguma linha antiga mudou (recarga completa necessária)
+    """
+    n_colunas = plano['n_colunas']
+    
+    def completar(linhas):
+        return fill_gaps(linhas, cols=n_colunas) if linhas else []
+    
+    cabecalho = completar(valores.get(plano['cabecalho'], []))
+    if not cabecalho or cabecalho[0] != completar([metadados['cabecalho']])[0]:
+        return None
+    
+    for rotulo, intervalo in plano['amostra']:
+        linha = (completar(valores.get(intervalo, [])) or [[''] * n_colunas])[0]
+        if linha != _linha_do_snapshot(df, rotulo, n_colunas):
+            return None
+    
+    cauda = completar(valores.get(plano['cauda'], []))
+    ultima_conhecida = cauda[0] if cauda else [''] * n_colunas
+    if _checksum_linha(ultima_conhecida, n_colunas) != metadados.get('checksum_ultima_linha'):
+        return None
+    
+    novas = cauda[1:]
+    linhas_brutas = metadados['linhas_brutas'] + len(novas)
+    estado = {
+        'linhas_brutas': linhas_brutas,
+        'cabecalho': metadados['cabecalho'],
+        'checksum_ultima_linha': _checksum_linha(cauda[-1], n_colunas),
+        'sincronizacoes_incrementais': metadados.get('sincronizacoes_incrementais', 0) + 1
+    }
+    
+    if not novas:
+        return df, estado, 0
+    
+    df_novas = _valores_para_dataframe(
+        [metadados['cabecalho']] + novas,
+        inicio=metadados['linhas_brutas'] - 1
+    )
+    df_novas.columns = df.columns
+    
+    return pd.concat([df, df_novas]), estado, len(df_novas)
+
+
+def sincronizar_abas(nome_ou_url_ou_id, abas):
+    """
+    Atualiza os snapshots das abas alteradas desde a última gravação
+    
+    Abas em ABAS_INCREMENTAIS (só crescem, como 'matches') baixam apenas as
+    linhas anexadas: o cabeçalho, a última linha conhecida e algumas linhas
+    antigas sorteadas são conferidas e, se algo mudou, a aba é recarregada
+    inteira. A cada MAX_SINCRONIZACOES_INCREMENTAIS sincronizações a recarga
+    completa também é feita por segurança.
+    
+    Uma aba sem linhas novas (ou recarregada com o mesmo conteúdo) não é
+    regravada: só a revisão é atualizada nos metadados, então salvo_em e
+    versao_snapshots não mudam e o app não recarrega nada.
+    
+    Returns:
+        Dict aba -> {'modo': 'inalterada'|'incremental'|'completa', 'linhas_novas'}
+    """
+    client = conectar_google_sheets()
+    if client is None:
+        return {}
+    
+    planilha = _abrir_planilha(client, nome_ou_url_ou_id)
+    revisao = _revisao_planilha(planilha)
+    
+    relatorio = {}
+    intervalos = []
+    planos = {}
+    completas = []
+    snapshots = {}
+    
+    for aba in abas:
+        metadados = ler_metadados(nome_ou_url_ou_id, aba)
+        
+        # Planilha não mudou desde o snapshot: nada a baixar
+        if revisao is not None and metadados is not None and metadados.get('revisao') == revisao:
+            relatorio[aba] = {'modo': 'inalterada', 'linhas_novas': 0}
+            continue
+        
+        plano = None
+        if aba in ABAS_INCREMENTAIS:
+            df, metadados = carregar_snapshot(nome_ou_url_ou_id, aba)
+            plano = _plano_incremental(aba, df, metadados)
+            snapshots[aba] = (df, metadados)
+        
+        if plano is None:
+            completas.append(aba)
+            intervalos.append(_intervalo_aba(aba))
+        else:
+            planos[aba] = plano
+            intervalos.extend(
+                [plano['cabecalho'], plano['cauda']] + [i for _, i in plano['amostra']]
+            )
+    
+    if not intervalos:
+        return relatorio
+    
+    # Uma única requisição para todas as abas (completas e incrementais)
+    resposta = planilha.values_batch_get(intervalos)
+    valores = {
+        intervalo: faixa.get('values', [])
+        for intervalo, faixa in zip(intervalos, resposta.get('valueRanges', []))
+    }
+    
+    for aba, plano in planos.items():
+        df, metadados = snapshots[aba]
+        aplicado = _aplicar_incremental(df, metadados, plano, valores)
+        
+        if aplicado is None:
+            # Linha antiga alterada: recarregar a aba inteira
+            intervalo = _intervalo_aba(aba)
+            valores[intervalo] = planilha.values_batch_get([intervalo])['valueRanges'][0].get('values', [])
+            completas.append(aba)
+            continue
+        
+        df_atualizado, estado, linhas_novas = aplicado
+        if linhas_novas == 0:
+            if metadados.get('revisao') != revisao:
+                atualizar_metadados(nome_ou_url_ou_id, aba, {'revisao': revisao})
+            relatorio[aba] = {'modo': 'inalterada', 'linhas_novas': 0}
+            continue
+        
+        salvar_snapshot(nome_ou_url_ou_id, aba, df_atualizado, revisao, extras=estado)
+        relatorio[aba] = {'modo': 'incremental', 'linhas_novas': linhas_novas}
+    
+    for aba in completas:
+        todos_valores = fill_gaps(valores.get(_intervalo_aba(aba), []))
+        estado = _estado_sincronizacao(todos_valores)
+        
+        metadados = ler_metadados(nome_ou_url_ou_id, aba)
+        if metadados is not None and metadados.get('checksum_conteudo') == estado['checksum_conteudo']:
+            # Outra aba mudou a revisão da planilha; esta continua igual
+            atualizar_metadados(nome_ou_url_ou_id, aba, {'revisao': revisao, **estado})
+            relatorio[aba] = {'modo': 'inalterada', 'linhas_novas': 0}
+            continue
+        
+        df = _valores_para_dataframe(todos_valores)
+        salvar_snapshot(nome_ou_url_ou_id, aba, df, revisao, extras=estado)
+        relatorio[aba] = {'modo': 'completa', 'linhas_novas': len(df)}
+    
+    return relatorio
+
+
+def _atualizar_snapshots(nome_ou_url_ou_id, abas):
+    """Sincroniza os snapshots em segundo plano (roda em thread)"""
+    try:
+        sincronizar_abas(nome_ou_url_ou_id, abas)
+    
+    except Exception:
+        # Sem conexão: o app continua com os snapshots atuais
+        _log.warning('Atualização dos snapshots de %s falhou', nome_ou_url_ou_id, exc_info=True)
+
+
+def atualizar_snapshots_em_segundo_plano(nome_ou_url_ou_id, abas, forcar=False):
+    """
+    Dispara a atualização dos snapshots em uma thread, no máximo uma vez
+    a cada INTERVALO_ATUALIZACAO segundos por planilha
+    
+    Deve ser chamada a cada uso (cada execução do script no app, a cada
+    intervalo no servidor), fora de funções em cache. No modo offline ou
+    enquanto alguma aba não tem snapshot (a carga completa em primeiro
+    plano grava os snapshots) não faz nada.
+    
+    Returns:
+        A thread iniciada ou None se a atualização não foi necessária
+    """
+    if MODO_OFFLINE or any(ler_metadados(nome_ou_url_ou_id, aba) is None for aba in abas):
+        return None
+    
+    chave = str(nome_ou_url_ou_id)
+    
+    with _trava_atualizacao:
+        ultima = _ultima_atualizacao.get(chave)
+        if not forcar and ultima is not None and time.monotonic() - ultima < INTERVALO_ATUALIZACAO:
+            return None
+        _ultima_atualizacao[chave] = time.monotonic()
+    
+    thread = threading.Thread(
+        target=_atualizar_snapshots,
+        args=(nome_ou_url_ou_id, list(abas)),
+        name='atualizacao-snapshots',
+        daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def carregar_abas_com_snapshot(nome_ou_url_ou_id, abas, offline=None):
+    """
+    Carrega várias abas priorizando os snapshots locais
+    
+    Se todas as abas têm snapshot, retorna imediatamente (a atualização
+    fica com atualizar_snapshots_em_segundo_plano, chamada por fora).
+    Caso contrário baixa do Google Sheets e, se a API falhar, usa o que
+    houver em disco.
+    
+    Args:
+        nome_ou_url_ou_id: Nome, URL ou ID da planilha
+        abas: Lista com os nomes das abas
+        offline: Se True, nunca acessa a API (padrão: variável MATCH_OFFLINE)
+    
+    Returns:
+        Dict com 'abas' (aba -> DataFrame, None para abas que não puderam
+        ser carregadas) e 'tempos' (segundos por etapa)
+    """
+    offline = MODO_OFFLINE if offline is None else offline
+    
+    inicio = time.perf_counter()
+    resultado = {aba: carregar_snapshot(nome_ou_url_ou_id, aba)[0] for aba in abas}
+    tempos = {'snapshot_local': time.perf_counter() - inicio}
+    
+    if offline or all(df is not None for df in resultado.values()):
+        return {'abas': resultado, 'tempos': tempos}
+    
+    carregado = carregar_abas(nome_ou_url_ou_id, abas)
+    if carregado is not None:
+        resultado.update(carregado['abas'])
+        tempos.update(carregado['tempos'])
+    
+    return {'abas': resultado, 'tempos': tempos}
+
 def salvar_em_planilha(df, nome_ou_url_ou_id, aba):
     """
     Salva um DataFrame em uma planilha do Google Sheets
@@ -153,12 +539,7 @@ def salvar_em_planilha(df, nome_ou_url_ou_id, aba):
             return False
         
         # Abrir planilha
-        if 'docs.google.com' in str(nome_ou_url_ou_id):
-            planilha = client.open_by_url(nome_ou_url_ou_id)
-        elif len(str(nome_ou_url_ou_id)) > 30 and '/' not in str(nome_ou_url_ou_id):
-            planilha = client.open_by_key(nome_ou_url_ou_id)
-        else:
-            planilha = client.open(nome_ou_url_ou_id)
+        planilha = _abrir_planilha(client, nome_ou_url_ou_id)
         
         # Tentar abrir aba existente ou criar nova
         try:
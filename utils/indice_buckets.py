@@ -0,0 +1,170 @@
+"""
+Módulo de índice por buckets de códigos para busca top-k com poda
+(branch-and-bound sobre o score de negócio separável)
+"""
+
+import numpy as np
+
+from utils.features import FEATURES, calcular_matriz_features
+from utils.pontuacao import calcular_scores_aspectos, calcular_score_ponderado
+
+
+# Colunas de atributos que definem o bucket (os 5 códigos discretos)
+COLUNAS_CODIGOS = slice(0, 5)
+COLUNAS_PERFIL = slice(5, 9)
+
+# Quantidade mínima de candidatos pontuados por lote durante a busca
+TAMANHO_LOTE = 4096
+
+# A poda só compensa quando cada bucket agrupa, em média, pelo menos tantos candidatos
+CANDIDATOS_POR_BUCKET_MINIMO = 4
+
+
+def construir_indice_buckets(atributos):
+    """
+    Agrupa os candidatos pelos 5 códigos discretos
+
+    Args:
+        atributos: Matriz (n_candidatos, 9) de matriz_atributos ou
+                   pool['atributos']
+
+    Returns:
+        Dict com, para cada bucket: os códigos, os candidatos (posições em
+        ordem crescente) e a caixa envolvente do perfil (mínimo e máximo)
+    """
+    atributos = np.asarray(atributos, dtype=np.float64)
+
+    codigos = atributos[:, COLUNAS_CODIGOS]
+
+    if np.all(codigos == np.round(codigos)) and np.abs(codigos).max(initial=0) < 2**11:
+        # Códigos inteiros pequenos: uma chave int64 por candidato (unique 1-D é bem mais rápido)
+        deslocados = codigos.astype(np.int64) + 2**11
+        chave_unica = np.zeros(len(codigos), dtype=np.int64)
+        for j in range(deslocados.shape[1]):
+            chave_unica = (chave_unica << 12) | deslocados[:, j]
+        _, primeiros, inverso = np.unique(chave_unica, return_index=True, return_inverse=True)
+        chaves = codigos[primeiros]
+    else:
+        chaves, inverso = np.unique(codigos, axis=0, return_inverse=True)
+    inverso = inverso.ravel()
+
+    # Posições agrupadas por bucket, preservando a ordem original dentro de cada um
+    ordem = np.argsort(inverso, kind='stable')
+    contagens = np.bincount(inverso, minlength=len(chaves))
+    inicios = np.concatenate([[0], np.cumsum(contagens)])
+
+    perfis = atributos[ordem, COLUNAS_PERFIL]
+    perfil_min = np.minimum.reduceat(perfis, inicios[:-1], axis=0)
+    perfil_max = np.maximum.reduceat(perfis, inicios[:-1], axis=0)
+
+    return {
+        'chaves': chaves,
+        'ordem': ordem,
+        'inicios': inicios,
+        'perfil_min': perfil_min,
+        'perfil_max': perfil_max,
+        'n_candidatos': len(atributos)
+    }
+
+
+def indice_compensa(indice):
+    """
+    Indica se a busca com poda tende a ser mais rápida que pontuar todos
+    (com poucos candidatos por bucket, calcular os limites custa quase o mesmo)
+    """
+    return len(indice['chaves']) * CANDIDATOS_POR_BUCKET_MINIMO <= indice['n_candidatos']
+
+
+def limites_superiores(indice, vaga, pesos, fatores_penalizacao):
+    """
+    Maior score ponderado possível de cada bucket para a vaga
+
+    Os aspectos discretos são exatos no bucket; o perfil usa a menor
+    distância entre o perfil da vaga e a caixa envolvente do bucket.
+
+    Args:
+        vaga: Vetor (9,) de vetor_vaga
+
+    Returns:
+        np.ndarray (n_buckets,) com o limite superior do score
+    """
+    n_buckets = len(indice['chaves'])
+    perfil_vaga = vaga[COLUNAS_PERFIL]
+
+    # Distância de cada eixo até a caixa (0 se a vaga está dentro do intervalo)
+    fora = np.maximum(
+        np.maximum(indice['perfil_min'] - perfil_vaga, 0),
+        perfil_vaga - indice['perfil_max']
+    )
+
+    matriz = np.zeros((n_buckets, len(FEATURES)), dtype=np.float64)
+    matriz[:, :5] = np.abs(indice['chaves'] - vaga[COLUNAS_CODIGOS])
+    matriz[:, 9] = np.sqrt(
+        fora[:, 0]**2 +
+        fora[:, 1]**2 +
+        fora[:, 2]**2 +
+        fora[:, 3]**2
+    )
+
+    scores = calcular_scores_aspectos(matriz, fatores_penalizacao)
+    return calcular_score_ponderado(scores, pesos)
+
+
+def buscar_top_k(indice, atributos, vaga, pesos, fatores_penalizacao, k=10):
+    """
+    Top-k pelo score ponderado pulando buckets que não podem entrar no ranking
+
+    Os buckets são visitados do maior para o menor limite superior; a busca
+    para quando o limite do próximo bucket fica abaixo do k-ésimo score
+    atual. O resultado é idêntico a pontuar todos os candidatos
+    (empates resolvidos pela menor posição).
+
+    Args:
+        indice: Índice de construir_indice_buckets
+        atributos: A mesma matriz usada para construir o índice
+        vaga: Vetor (9,) de vetor_vaga (sem NaN)
+        pesos, fatores_penalizacao: Como em gerar_recomendacoes
+        k: Quantidade de candidatos
+
+    Returns:
+        Tupla (posições, scores, candidatos pontuados), do maior para o menor
+    """
+    limites = limites_superiores(indice, vaga, pesos, fatores_penalizacao)
+    ordem_buckets = np.argsort(-limites, kind='stable')
+
+    inicios = indice['inicios']
+    melhores_pos = np.empty(0, dtype=np.intp)
+    melhores_score = np.empty(0, dtype=np.float64)
+    pontuados = 0
+
+    b = 0
+    while b < len(ordem_buckets):
+        # Poda: nenhum candidato dos buckets restantes supera o k-ésimo atual
+        if len(melhores_pos) >= k and limites[ordem_buckets[b]] < melhores_score[-1]:
+            break
+
+        # Junta buckets até formar um lote de tamanho razoável
+        lote = []
+        tamanho = 0
+        while b < len(ordem_buckets) and (tamanho < TAMANHO_LOTE or not lote):
+            bucket = ordem_buckets[b]
+            if lote and len(melhores_pos) >= k and limites[bucket] < melhores_score[-1]:
+                break
+            lote.append(indice['ordem'][inicios[bucket]:inicios[bucket + 1]])
+            tamanho += inicios[bucket + 1] - inicios[bucket]
+            b += 1
+
+        posicoes = np.concatenate(lote)
+        matriz = calcular_matriz_features(atributos[posicoes], vaga)
+        scores = calcular_score_ponderado(
+            calcular_scores_aspectos(matriz, fatores_penalizacao), pesos
+        )
+        pontuados += len(posicoes)
+
+        todas_pos = np.concatenate([melhores_pos, posicoes])
+        todos_scores = np.concatenate([melhores_score, scores])
+        selecao = np.lexsort((todas_pos, -todos_scores))[:k]
+        melhores_pos = todas_pos[selecao]
+        melhores_score = todos_scores[selecao]
+
+    return melhores_pos, melhores_score, pontuados
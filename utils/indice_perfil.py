@@ -0,0 +1,109 @@
+"""
+Módulo de índice espacial (KD-tree) sobre o perfil comportamental 4-D
+"""
+
+import numpy as np
+from sklearn.neighbors import KDTree
+
+from utils.features import COLUNAS_ATRIBUTOS
+
+
+# Posições de autoridade, prestigio, preservacao e formalidade na matriz de atributos
+COLUNAS_PERFIL = slice(5, 9)
+
+# Folga relativa no raio para não perder candidatos por arredondamento
+FOLGA_RAIO = 1e-9
+
+
+def construir_indice_perfil(atributos, tamanho_folha=40):
+    """
+    Constrói a KD-tree sobre os perfis dos candidatos
+
+    Args:
+        atributos: Matriz (n_candidatos, 9) de matriz_atributos ou pool['atributos']
+        tamanho_folha: leaf_size da KDTree
+
+    Returns:
+        Dict com a árvore e a quantidade de candidatos
+    """
+    perfis = np.ascontiguousarray(np.asarray(atributos, dtype=np.float64)[:, COLUNAS_PERFIL])
+
+    return {
+        'arvore': KDTree(perfis, leaf_size=tamanho_folha),
+        'colunas': COLUNAS_ATRIBUTOS[COLUNAS_PERFIL],
+        'n_candidatos': len(perfis)
+    }
+
+
+def _perfil_vaga(vaga):
+    vaga = np.asarray(vaga, dtype=np.float64)
+    # Aceita o vetor completo da vaga (9,) ou só o perfil (4,)
+    return (vaga[COLUNAS_PERFIL] if vaga.shape[-1] == 9 else vaga).reshape(1, -1)
+
+
+def perfis_mais_proximos(indice, vaga, k):
+    """
+    Os k candidatos com perfil mais próximo ao da vaga
+
+    Args:
+        indice: Índice de construir_indice_perfil
+        vaga: Vetor da vaga (9,) de vetor_vaga ou perfil (4,)
+        k: Quantidade de candidatos
+
+    Returns:
+        Tupla (posições, distâncias), da menor para a maior distância
+    """
+    k = min(int(k), indice['n_candidatos'])
+    if k <= 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float64)
+
+    distancias, posicoes = indice['arvore'].query(_perfil_vaga(vaga), k=k)
+    return posicoes[0], distancias[0]
+
+
+def candidatos_no_raio(indice, vaga, raio):
+    """
+    Todos os candidatos com distância de perfil até raio
+
+    Returns:
+        Tupla (posições em ordem crescente, distâncias correspondentes)
+    """
+    posicoes, distancias = indice['arvore'].query_radius(
+        _perfil_vaga(vaga), r=raio, return_distance=True
+    )
+    ordem = np.argsort(posicoes[0], kind='stable')
+    return posicoes[0][ordem], distancias[0][ordem]
+
+
+def raio_para_score_perfil(score_minimo, fator_perfil):
+    """
+    Maior distância de perfil que ainda garante score_perfil >= score_minimo
+
+    score_perfil = 100 - min(distancia * fator, 100)
+    """
+    if score_minimo <= 0:
+        return np.inf
+    if fator_perfil <= 0:
+        return np.inf if score_minimo <= 100 else -1.0
+    return max(100.0 - score_minimo, 0.0) / fator_perfil
+
+
+def prefiltrar_por_perfil(indice, vaga, fator_perfil, score_minimo):
+    """
+    Posições dos candidatos que podem ter score_perfil >= score_minimo
+
+    O raio recebe uma pequena folga: o resultado é um superconjunto, e o
+    filtro exato deve ser aplicado depois sobre o score calculado.
+
+    Returns:
+        np.ndarray de posições em ordem crescente (None se o filtro não restringe)
+    """
+    raio = raio_para_score_perfil(score_minimo, fator_perfil)
+
+    if np.isinf(raio):
+        return None
+    if raio < 0:
+        return np.empty(0, dtype=np.intp)
+
+    posicoes, _ = candidatos_no_raio(indice, vaga, raio * (1 + FOLGA_RAIO) + FOLGA_RAIO)
+    return posicoes
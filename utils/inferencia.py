@@ -0,0 +1,134 @@
+"""
+Módulo de inferência deduplicada: cada linha de features distinta
+passa pelos modelos uma única vez
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.features import features_dataframe
+from utils.preditor_compilado import compilado_compensa, prever_compilado
+
+
+# Colunas de perfil na matriz de features (diff_autoridade ... distancia_perfil)
+COLUNAS_PERFIL_FEATURES = slice(5, 10)
+
+# Casas decimais do perfil antes de deduplicar (None = sem arredondar, resultado exato)
+CASAS_PERFIL_DEDUPLICACAO = None
+
+# Contadores acumulados desde o início do processo (ou do último zerar_estatisticas)
+_estatisticas = {'chamadas': 0, 'linhas': 0, 'linhas_unicas': 0}
+_trava_estatisticas = threading.Lock()
+
+
+def linhas_unicas(matriz, casas_perfil=None):
+    """
+    Reduz a matriz de features às linhas distintas
+
+    Args:
+        matriz: Matriz de features (n, 10), sem NaN
+        casas_perfil: Se informado, arredonda as colunas de perfil antes
+                      de comparar (as linhas únicas saem arredondadas)
+
+    Returns:
+        Tupla (linhas únicas, inverso) com unicas[inverso] == matriz
+    """
+    matriz = np.asarray(matriz, dtype=np.float64)
+
+    if casas_perfil is not None:
+        matriz = matriz.copy()
+        matriz[:, COLUNAS_PERFIL_FEATURES] = np.round(matriz[:, COLUNAS_PERFIL_FEATURES], casas_perfil)
+
+    if len(matriz) == 0:
+        return matriz, np.empty(0, dtype=np.intp)
+
+    # Hash por linha + factorize (bem mais rápido que np.unique(axis=0))
+    hashes = pd.util.hash_pandas_object(pd.DataFrame(matriz, copy=False), index=False).to_numpy()
+    inverso, _ = pd.factorize(hashes)
+
+    # factorize numera na ordem da primeira ocorrência
+    novos = inverso > np.maximum.accumulate(np.concatenate([[-1], inverso[:-1]]))
+    unicas = matriz[np.flatnonzero(novos)]
+
+    if not np.array_equal(unicas[inverso], matriz):
+        # Colisão de hash (improvável): comparação exata byte a byte
+        bytes_linhas = np.ascontiguousarray(matriz).view(np.dtype((np.void, matriz.dtype.itemsize * matriz.shape[1])))
+        _, primeiros, inverso = np.unique(bytes_linhas.ravel(), return_index=True, return_inverse=True)
+        unicas = matriz[primeiros]
+
+    return unicas, inverso.ravel().astype(np.intp, copy=False)
+
+
+def prever_deduplicado(modelos, matriz, casas_perfil=CASAS_PERFIL_DEDUPLICACAO, chaves=None,
+                       compilados=None, contagem=None):
+    """
+    Probabilidade da classe positiva de cada modelo, prevendo cada linha
+    distinta uma única vez e espalhando o resultado de volta
+
+    Args:
+        modelos: dict com modelos treinados ('LR', 'RF', 'XGB')
+        matriz: Matriz de features (n, 10), sem NaN
+        casas_perfil: Arredondamento opcional das colunas de perfil
+        chaves: Modelos a usar (padrão: todos de modelos)
+        compilados: dict opcional de compilar_modelos; usado no lugar do
+                    modelo original quando compensa para o tamanho do lote
+        contagem: dict opcional preenchido com 'linhas', 'linhas_unicas' e
+                  'razao' desta chamada (estatisticas_deduplicacao soma todas)
+
+    Returns:
+        Dict chave do modelo -> np.ndarray (n,) de probabilidades
+    """
+    unicas, inverso = linhas_unicas(matriz, casas_perfil)
+    compilados = compilados or {}
+    df_unicas = None
+
+    probabilidades = {}
+    for chave in (modelos.keys() if chaves is None else chaves):
+        compilado = compilados.get(chave)
+        if compilado is not None and compilado_compensa(compilado, len(unicas)):
+            prob = prever_compilado(compilado, unicas)
+        else:
+            if df_unicas is None:
+                df_unicas = features_dataframe(unicas)
+            prob = modelos[chave].predict_proba(df_unicas)[:, 1]
+        probabilidades[chave] = prob[inverso]
+
+    with _trava_estatisticas:
+        _estatisticas['chamadas'] += 1
+        _estatisticas['linhas'] += len(inverso)
+        _estatisticas['linhas_unicas'] += len(unicas)
+
+    if contagem is not None:
+        contagem.update(
+            linhas=len(inverso), linhas_unicas=len(unicas),
+            razao=len(inverso) / len(unicas) if len(unicas) else 1.0
+        )
+
+    return probabilidades
+
+
+def estatisticas_deduplicacao():
+    """
+    Contadores da deduplicação
+
+    Returns:
+        Dict com chamadas, linhas, linhas_unicas e razao (linhas por linha
+        única; 1.0 quando não há repetição)
+    """
+    with _trava_estatisticas:
+        estatisticas = dict(_estatisticas)
+
+    estatisticas['razao'] = (
+        estatisticas['linhas'] / estatisticas['linhas_unicas']
+        if estatisticas['linhas_unicas'] else 1.0
+    )
+    return estatisticas
+
+
+def zerar_estatisticas():
+    """Zera os contadores da deduplicação"""
+    with _trava_estatisticas:
+        for chave in _estatisticas:
+            _estatisticas[chave] = 0
@@ -0,0 +1,233 @@
+"""
+Módulo de instrumentação por etapa: tempo de parede, CPU e pico de
+memória de cada etapa de uma execução, gravados em JSON lines
+"""
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+
+# Histórico das execuções (uma linha JSON por execução)
+ARQUIVO_LOG_EXECUCOES = os.path.join('logs', 'execucoes.jsonl')
+
+# Intervalo de amostragem da memória residente (segundos)
+INTERVALO_MEMORIA = 0.005
+
+_trava_log = threading.Lock()
+
+# Medições abertas usando o tracemalloc iniciado aqui (liga no primeiro, desliga no último)
+_usos_tracemalloc = 0
+_trava_tracemalloc = threading.Lock()
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# MEDIÇÃO
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _memoria_residente():
+    """RSS do processo em bytes (Linux), ou None"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _iniciar_tracemalloc():
+    """
+    Liga o tracemalloc para uma medição (contagem de referências)
+
+    Returns:
+        Memória rastreada no início, ou None se o tracemalloc já foi ligado
+        por outro código (não é desligado nem tem o pico zerado aqui)
+    """
+    global _usos_tracemalloc
+    with _trava_tracemalloc:
+        if _usos_tracemalloc == 0:
+            if tracemalloc.is_tracing():
+                return None
+            tracemalloc.start()
+        _usos_tracemalloc += 1
+        return tracemalloc.get_traced_memory()[0]
+
+
+def _parar_tracemalloc(inicial):
+    """Pico acima de inicial em bytes; desliga o tracemalloc na última medição"""
+    global _usos_tracemalloc
+    with _trava_tracemalloc:
+        pico_bytes = tracemalloc.get_traced_memory()[1] - inicial
+        _usos_tracemalloc -= 1
+        if _usos_tracemalloc == 0:
+            tracemalloc.stop()
+        return pico_bytes
+
+
+@contextmanager
+def _medidor():
+    """
+    Mede o bloco: tempo de parede, CPU e pico de memória acima do início
+
+    CPU e memória são do processo inteiro (incluem outras threads). A
+    memória é o RSS amostrado numa thread; sem /proc usa tracemalloc, que
+    só vê alocações do Python e do NumPy e, com medições aninhadas, dá o
+    pico desde a mais externa (memória None se outro código já o usava).
+
+    Produz um dict preenchido ao final do bloco
+    """
+    medicao = {}
+    inicial = _memoria_residente()
+    pico = [inicial]
+    parar = threading.Event()
+
+    if inicial is not None:
+        def amostrar():
+            while not parar.wait(INTERVALO_MEMORIA):
+                pico[0] = max(pico[0], _memoria_residente() or 0)
+        amostrador = threading.Thread(target=amostrar, name='memoria-etapa', daemon=True)
+        amostrador.start()
+    else:
+        inicial_rastreada = _iniciar_tracemalloc()
+
+    inicio = time.perf_counter()
+    inicio_cpu = time.process_time()
+    try:
+        yield medicao
+    finally:
+        medicao['parede'] = time.perf_counter() - inicio
+        medicao['cpu'] = time.process_time() - inicio_cpu
+
+        if inicial is not None:
+            parar.set()
+            amostrador.join()
+            pico_bytes = max(pico[0], _memoria_residente() or 0) - inicial
+        elif inicial_rastreada is not None:
+            pico_bytes = _parar_tracemalloc(inicial_rastreada)
+        else:
+            pico_bytes = None
+
+        medicao['memoria_pico_mb'] = max(pico_bytes, 0) / 2**20 if pico_bytes is not None else None
+
+
+def medir(funcao, *args, **kwargs):
+    """
+    Executa funcao medindo tempo de parede, CPU e pico de memória (do processo)
+
+    Returns:
+        Tupla (resultado, {'parede', 'cpu', 'memoria_pico_mb'})
+    """
+    with _medidor() as medicao:
+        resultado = funcao(*args, **kwargs)
+    return resultado, medicao
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# EXECUÇÕES
+# ═══════════════════════════════════════════════════════════════════════════
+
+def nova_execucao(tipo, contexto=None):
+    """
+    Inicia o registro de uma execução
+
+    Args:
+        tipo: Tipo da execução (ex.: 'recomendacao', 'treino')
+        contexto: dict opcional (JSON) gravado junto (vaga, versão, tamanhos)
+
+    Returns:
+        Dict da execução, preenchido por medir_etapa
+    """
+    return {
+        'id': uuid.uuid4().hex[:12],
+        'tipo': tipo,
+        'inicio': datetime.now().isoformat(timespec='seconds'),
+        'contexto': dict(contexto or {}),
+        'etapas': []
+    }
+
+
+@contextmanager
+def medir_etapa(execucao, etapa):
+    """
+    Mede um bloco como uma etapa da execução (registrada mesmo com exceção)
+
+    Uso:
+        with medir_etapa(execucao, 'graficos'):
+            ...
+    """
+    registro = {'etapa': etapa}
+    try:
+        with _medidor() as medicao:
+            yield registro
+    except BaseException:
+        registro['erro'] = True
+        raise
+    finally:
+        execucao['etapas'].append({**registro, **medicao})
+
+
+def adicionar_etapa(execucao, etapa, parede, cpu=None, memoria_pico_mb=None, **extras):
+    """Registra uma etapa medida por fora (ex.: tempos de treinar_modelos)"""
+    execucao['etapas'].append({
+        'etapa': etapa, 'parede': parede, 'cpu': cpu, 'memoria_pico_mb': memoria_pico_mb, **extras
+    })
+
+
+def totais_execucao(execucao):
+    """Soma de parede e CPU das etapas de primeiro nível (sem as sub-etapas)"""
+    etapas = [e for e in execucao['etapas'] if not e.get('subetapa')]
+    return {
+        'parede': sum(e['parede'] for e in etapas),
+        'cpu': sum(e['cpu'] or 0 for e in etapas)
+    }
+
+
+def registrar_execucao(execucao, arquivo=ARQUIVO_LOG_EXECUCOES):
+    """
+    Acrescenta a execução como uma linha JSON no log
+
+    Returns:
+        Caminho do arquivo
+    """
+    pasta = os.path.dirname(arquivo)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+
+    linha = json.dumps({**execucao, 'totais': totais_execucao(execucao)}, ensure_ascii=False, default=str)
+
+    # Uma única escrita em modo append por linha: sessões não se intercalam
+    with _trava_log, open(arquivo, 'a', encoding='utf-8') as f:
+        f.write(linha + '\n')
+
+    return arquivo
+
+
+def ler_historico(arquivo=ARQUIVO_LOG_EXECUCOES, limite=50, tipo=None):
+    """
+    Últimas execuções do log (linhas corrompidas são ignoradas)
+
+    Returns:
+        Lista de dicts, da mais antiga para a mais recente
+    """
+    try:
+        with open(arquivo, 'r', encoding='utf-8') as f:
+            linhas = f.readlines()
+    except OSError:
+        return []
+
+    execucoes = []
+    for linha in reversed(linhas):
+        try:
+            execucao = json.loads(linha)
+        except ValueError:
+            continue
+        if tipo is None or execucao.get('tipo') == tipo:
+            execucoes.append(execucao)
+        if len(execucoes) >= limite:
+            break
+
+    return execucoes[::-1]
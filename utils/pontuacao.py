@@ -0,0 +1,295 @@
+"""
+Módulo de pontuação em lote: vários candidatos × várias vagas
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.dicionarios import (
+    PESOS_PADRAO, FATORES_PENALIZACAO_PADRAO,
+    faixas_etarias, niveis_formacao, areas_atuacao, niveis_cargo, regimes
+)
+from utils.features import (
+    FEATURES, CHAVES_VAGA, matriz_atributos, vetor_vaga,
+    calcular_matriz_features, preencher_nan_features
+)
+from utils.inferencia import CASAS_PERFIL_DEDUPLICACAO, prever_deduplicado
+
+
+# Aspecto de negócio -> feature usada na penalização
+ASPECTOS = {
+    'area': 'diff_area',
+    'perfil': 'distancia_perfil',
+    'cargo': 'diff_cargo',
+    'formacao': 'diff_formacao',
+    'idade': 'diff_idade',
+    'regime': 'diff_regime'
+}
+
+MODELOS_PROBABILIDADE = {
+    'LR': 'prob_lr',
+    'RF': 'prob_rf',
+    'XGB': 'prob_xgb'
+}
+
+# Aspectos discretos na ordem das 5 primeiras colunas de atributos, com o dicionário de códigos
+ASPECTOS_CODIGOS = [
+    ('idade', faixas_etarias),
+    ('formacao', niveis_formacao),
+    ('area', areas_atuacao),
+    ('cargo', niveis_cargo),
+    ('regime', regimes)
+]
+
+# Orçamento padrão de memória para os blocos intermediários
+MEMORIA_PADRAO_MB = 256
+
+
+def calcular_scores_aspectos(matriz, fatores_penalizacao):
+    """
+    Calcula os scores 0-100 de cada aspecto a partir da matriz de features
+
+    Args:
+        matriz: Matriz de features (..., 10) na ordem de FEATURES
+        fatores_penalizacao: dict com fatores de penalização
+
+    Returns:
+        Dict aspecto -> array de scores com o formato de matriz[..., 0]
+    """
+    return {
+        aspecto: 100 - np.minimum(
+            matriz[..., FEATURES.index(feature)] * fatores_penalizacao[aspecto],
+            100
+        )
+        for aspecto, feature in ASPECTOS.items()
+    }
+
+
+def calcular_score_ponderado(scores, pesos):
+    """
+    Combina os scores por aspecto no score de negócio final
+    """
+    return (
+        scores['area'] * pesos['area'] +
+        scores['perfil'] * pesos['perfil'] +
+        scores['cargo'] * pesos['cargo'] +
+        scores['formacao'] * pesos['formacao'] +
+        scores['idade'] * pesos['idade'] +
+        scores['regime'] * pesos['regime']
+    )
+
+
+def vagas_para_matriz(vagas):
+    """
+    Normaliza as especificações de vagas para uma matriz (n_vagas, 9)
+
+    Args:
+        vagas: DataFrame no formato da aba 'vagas', lista de dicts
+               no formato do dict da sidebar, um único dict ou np.ndarray
+
+    Returns:
+        Tupla (ids das vagas, matriz float64 (n_vagas, 9)); campos vazios
+        ficam NaN em todos os formatos
+    """
+    if isinstance(vagas, pd.DataFrame):
+        ids = vagas['ID_vaga'].tolist() if 'ID_vaga' in vagas.columns else list(range(len(vagas)))
+        # A aba de vagas usa os mesmos nomes de coluna dos candidatos; sem
+        # imputar: a mesma vaga em dict ou DataFrame recebe os mesmos scores
+        return ids, matriz_atributos(vagas, imputar=False)
+
+    if isinstance(vagas, dict):
+        vagas = [vagas]
+
+    if isinstance(vagas, np.ndarray):
+        matriz = np.asarray(vagas, dtype=np.float64).reshape(-1, len(CHAVES_VAGA))
+        return list(range(len(matriz))), matriz
+
+    ids = [v.get('id', i) for i, v in enumerate(vagas)]
+    return ids, vetor_vaga(vagas)
+
+
+def pontuar_vagas(candidatos, vagas, modelos=None, pesos=None,
+                  fatores_penalizacao=None, memoria_mb=MEMORIA_PADRAO_MB,
+                  dtype=np.float32, casas_perfil=CASAS_PERFIL_DEDUPLICACAO,
+                  compilados=None):
+    """
+    Pontua todos os candidatos contra várias vagas de uma só vez
+
+    As vagas são processadas em blocos: cada bloco monta a matriz de features
+    (n_candidatos, vagas_do_bloco, 10) por broadcast, de forma que o tamanho
+    dos intermediários fique dentro de memoria_mb.
+
+    Args:
+        candidatos: DataFrame com candidatos, pool de preparar_pool ou
+                    matriz de matriz_atributos
+        vagas: Especificações das vagas (ver vagas_para_matriz)
+        modelos: dict com modelos treinados (opcional; sem ele só calcula
+                 o score de negócio)
+        pesos: dict com pesos de cada aspecto (padrão: PESOS_PADRAO)
+        fatores_penalizacao: dict com fatores (padrão: FATORES_PENALIZACAO_PADRAO)
+        memoria_mb: Orçamento de memória para os blocos intermediários
+        dtype: Tipo das matrizes de probabilidade (o score de negócio é
+               sempre float64, como em gerar_recomendacoes)
+        casas_perfil: Arredondamento do perfil antes de deduplicar as
+                      linhas de features na inferência (None = exato)
+        compilados: Modelos de compilar_modelos (opcional)
+
+    Returns:
+        Dict com 'ids_vagas' e matrizes (n_candidatos, n_vagas) para
+        'score_ponderado' e, se houver modelos, 'prob_lr', 'prob_rf', 'prob_xgb'
+    """
+    pesos = PESOS_PADRAO if pesos is None else pesos
+    fatores_penalizacao = FATORES_PENALIZACAO_PADRAO if fatores_penalizacao is None else fatores_penalizacao
+
+    if isinstance(candidatos, pd.DataFrame):
+        atributos = matriz_atributos(candidatos)
+    elif isinstance(candidatos, dict):
+        atributos = candidatos['atributos']
+    else:
+        atributos = np.asarray(candidatos, dtype=np.float64)
+
+    ids_vagas, matriz_vagas = vagas_para_matriz(vagas)
+    n_candidatos, n_vagas = len(atributos), len(matriz_vagas)
+
+    saidas = {'score_ponderado': np.empty((n_candidatos, n_vagas), dtype=np.float64)}
+    if modelos is not None:
+        for nome in MODELOS_PROBABILIDADE.values():
+            saidas[nome] = np.empty((n_candidatos, n_vagas), dtype=dtype)
+
+    # Bytes por par candidato × vaga: features + scores dos aspectos
+    bytes_por_par = (len(FEATURES) + len(ASPECTOS) + 2) * 8
+    tamanho_bloco = int(memoria_mb * 1024 * 1024 // max(bytes_por_par * n_candidatos, 1))
+    tamanho_bloco = max(1, min(tamanho_bloco, n_vagas))
+
+    for inicio in range(0, n_vagas, tamanho_bloco):
+        fim = min(inicio + tamanho_bloco, n_vagas)
+
+        bloco = calcular_matriz_features(atributos, matriz_vagas[inicio:fim])
+        if np.isnan(bloco).any():
+            # Mesma regra da vaga única: NaN recebe o máximo da coluna daquela vaga
+            for j in range(fim - inicio):
+                bloco[:, j, :] = preencher_nan_features(bloco[:, j, :].copy())
+
+        scores = calcular_scores_aspectos(bloco, fatores_penalizacao)
+        saidas['score_ponderado'][:, inicio:fim] = calcular_score_ponderado(scores, pesos)
+
+        if modelos is not None:
+            probabilidades = prever_deduplicado(
+                modelos, bloco.reshape(-1, len(FEATURES)), casas_perfil,
+                chaves=MODELOS_PROBABILIDADE.keys(), compilados=compilados
+            )
+            for chave, nome in MODELOS_PROBABILIDADE.items():
+                saidas[nome][:, inicio:fim] = probabilidades[chave].reshape(n_candidatos, fim - inicio)
+
+    saidas['ids_vagas'] = ids_vagas
+    return saidas
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# PONTUAÇÃO POR TABELAS (aspectos discretos)
+# ═══════════════════════════════════════════════════════════════════════════
+
+def indexar_codigos(atributos):
+    """
+    Converte os 5 códigos discretos dos candidatos em índices de tabela
+
+    A faixa de cada tabela cobre os códigos do dicionário e os códigos
+    presentes nos candidatos (mesmo os que não estão no dicionário).
+
+    Args:
+        atributos: Matriz (n_candidatos, 9) de matriz_atributos ou pool['atributos']
+
+    Returns:
+        Dict com 'indices' (int16, n_candidatos × 5) e 'minimos'/'tamanhos'
+        de cada tabela, ou None se algum código não for inteiro
+    """
+    codigos = np.asarray(atributos, dtype=np.float64)[:, :len(ASPECTOS_CODIGOS)]
+
+    if not np.all(np.isfinite(codigos)) or not np.all(codigos == np.round(codigos)):
+        return None
+
+    minimos = np.empty(len(ASPECTOS_CODIGOS), dtype=np.int64)
+    tamanhos = np.empty(len(ASPECTOS_CODIGOS), dtype=np.int64)
+
+    for j, (_, dicionario) in enumerate(ASPECTOS_CODIGOS):
+        conhecidos = list(dicionario.keys())
+        minimos[j] = min(min(conhecidos), codigos[:, j].min(initial=min(conhecidos)))
+        maximo = max(max(conhecidos), codigos[:, j].max(initial=max(conhecidos)))
+        tamanhos[j] = maximo - minimos[j] + 1
+
+    if tamanhos.max() > np.iinfo(np.int16).max:
+        return None
+
+    return {
+        'indices': (codigos - minimos).astype(np.int16),
+        'minimos': minimos,
+        'tamanhos': tamanhos
+    }
+
+
+def tabelas_vaga(indice_codigos, vaga, pesos, fatores_penalizacao):
+    """
+    Monta, para uma vaga, a tabela de cada aspecto discreto já com o peso
+
+    tabela[i] = (100 - min(|codigo_i - codigo_vaga| * fator, 100)) * peso
+
+    Args:
+        indice_codigos: Resultado de indexar_codigos
+        vaga: Vetor (9,) de vetor_vaga
+
+    Returns:
+        Dict aspecto -> np.ndarray float64 indexado pelo índice do código
+    """
+    tabelas = {}
+
+    for j, (aspecto, _) in enumerate(ASPECTOS_CODIGOS):
+        codigos = (indice_codigos['minimos'][j] + np.arange(indice_codigos['tamanhos'][j])).astype(np.float64)
+        score = 100 - np.minimum(np.abs(codigos - vaga[j]) * fatores_penalizacao[aspecto], 100)
+        tabelas[aspecto] = score * pesos[aspecto]
+
+    return tabelas
+
+
+def pontuar_com_tabelas(indice_codigos, atributos, vaga, pesos, fatores_penalizacao, posicoes=None):
+    """
+    Score ponderado com cinco consultas de tabela e um termo de perfil
+
+    A soma segue a mesma ordem de calcular_score_ponderado, então o
+    resultado é idêntico ao caminho de features em ponto flutuante.
+
+    Args:
+        indice_codigos: Resultado de indexar_codigos sobre atributos
+        atributos: Matriz (n_candidatos, 9)
+        vaga: Vetor (9,) de vetor_vaga (sem NaN)
+        posicoes: Subconjunto opcional de candidatos a pontuar
+
+    Returns:
+        Tupla (score ponderado, score do perfil 0-100)
+    """
+    indices = indice_codigos['indices']
+    perfis = np.asarray(atributos, dtype=np.float64)[:, 5:9]
+    if posicoes is not None:
+        indices = indices[posicoes]
+        perfis = perfis[posicoes]
+
+    tabelas = tabelas_vaga(indice_codigos, vaga, pesos, fatores_penalizacao)
+
+    diffs = np.abs(perfis - vaga[5:9])
+    distancia = np.sqrt(
+        diffs[:, 0]**2 +
+        diffs[:, 1]**2 +
+        diffs[:, 2]**2 +
+        diffs[:, 3]**2
+    )
+    score_perfil = 100 - np.minimum(distancia * fatores_penalizacao['perfil'], 100)
+
+    score = (
+        tabelas['area'][indices[:, 2]] +
+        score_perfil * pesos['perfil'] +
+        tabelas['cargo'][indices[:, 3]] +
+        tabelas['formacao'][indices[:, 1]] +
+        tabelas['idade'][indices[:, 0]] +
+        tabelas['regime'][indices[:, 4]]
+    )
+
+    return score, score_perfil
@@ -0,0 +1,176 @@
+"""
+Módulo do pool de candidatos pré-normalizado (um por versão dos dados)
+"""
+
+import numpy as np
+
+from utils.armazem_atributos import abrir_atributos, abrir_versao, publicar_atributos
+from utils.features import COLUNAS_ATRIBUTOS, VALORES_PADRAO, matriz_atributos
+from utils.indice_buckets import construir_indice_buckets
+from utils.indice_perfil import construir_indice_perfil
+from utils.pontuacao import indexar_codigos
+
+
+# Arrays de construir_indice_buckets e de indexar_codigos gravados no armazém
+CAMPOS_INDICE_BUCKETS = ('chaves', 'ordem', 'inicios', 'perfil_min', 'perfil_max')
+CAMPOS_INDICE_CODIGOS = ('indices', 'minimos', 'tamanhos')
+
+
+def _blocos_indices(indice_buckets, indice_codigos):
+    """Arrays dos índices com nomes de bloco do armazém"""
+    blocos = {f'buckets_{campo}': indice_buckets[campo] for campo in CAMPOS_INDICE_BUCKETS}
+    if indice_codigos is not None:
+        blocos.update({f'codigos_{campo}': indice_codigos[campo] for campo in CAMPOS_INDICE_CODIGOS})
+    return blocos
+
+
+def _indices_do_armazem(armazem, atributos):
+    """Índices de buckets e de códigos mapeados do armazém (construídos se ausentes)"""
+    blocos = armazem['indices'] if armazem is not None else {}
+
+    if all(f'buckets_{campo}' in blocos for campo in CAMPOS_INDICE_BUCKETS):
+        indice_buckets = {campo: blocos[f'buckets_{campo}'] for campo in CAMPOS_INDICE_BUCKETS}
+        indice_buckets['n_candidatos'] = armazem['linhas']
+        # Sem os blocos de códigos, indexar_codigos tinha devolvido None
+        indice_codigos = (
+            {campo: blocos[f'codigos_{campo}'] for campo in CAMPOS_INDICE_CODIGOS}
+            if 'codigos_indices' in blocos else None
+        )
+        return indice_buckets, indice_codigos
+
+    return construir_indice_buckets(atributos), indexar_codigos(atributos)
+
+
+def preparar_pool(candidatos, versao=None, diretorio_armazem=None):
+    """
+    Converte e imputa os atributos dos candidatos uma única vez
+
+    O pool é somente leitura e pode ser compartilhado entre sessões
+    (st.cache_resource) e passado para gerar_recomendacoes e pontuar_vagas.
+
+    Com diretorio_armazem (e versao), a matriz de atributos, a máscara de
+    imputados e os índices de buckets e de códigos vêm do arquivo mapeado
+    de utils/armazem_atributos.py, compartilhado entre processos; a versão
+    é publicada se ainda não existir. A KD-tree do perfil é sempre
+    construída em memória.
+
+    Args:
+        candidatos: DataFrame com candidatos
+        versao: Identificador da versão dos dados (ex.: fingerprint)
+        diretorio_armazem: Pasta do armazém de atributos (None = só em memória)
+
+    Returns:
+        Dict com:
+            'versao': identificador da versão
+            'atributos': matriz float64 contígua (n_candidatos, 9)
+            'colunas': ordem das colunas de 'atributos'
+            'ids', 'nomes': arrays com id e Nome Completo (None se ausentes)
+            'index': índice do DataFrame de origem
+            'arquivo': arquivo mapeado do armazém (ou None)
+            'imputacao': valores padrão, máscara e contagem de imputados
+            'indice_buckets': índice de construir_indice_buckets
+            'indice_perfil': KD-tree de construir_indice_perfil
+            'indice_codigos': índices de tabela de indexar_codigos (ou None)
+    """
+    armazem = None
+    if diretorio_armazem is not None and versao is not None:
+        armazem = abrir_versao(versao, diretorio_armazem)
+        if armazem is None or armazem['linhas'] != len(candidatos):
+            atributos, imputados = matriz_atributos(candidatos, retornar_imputados=True)
+            indices = _blocos_indices(construir_indice_buckets(atributos), indexar_codigos(atributos))
+            armazem = abrir_atributos(
+                publicar_atributos(atributos, imputados, versao, diretorio_armazem, indices)
+            )
+
+    if armazem is not None:
+        # np.memmap somente leitura: páginas compartilhadas, sem cópia
+        atributos, imputados = armazem['atributos'], armazem['imputados']
+    else:
+        atributos, imputados = matriz_atributos(candidatos, retornar_imputados=True)
+        atributos = np.ascontiguousarray(atributos)
+
+    ids = candidatos['id'].to_numpy() if 'id' in candidatos.columns else None
+    nomes = candidatos['Nome Completo'].to_numpy() if 'Nome Completo' in candidatos.columns else None
+
+    # Compartilhado entre sessões: ninguém pode alterar
+    for array in (atributos, imputados, ids, nomes):
+        if isinstance(array, np.ndarray):
+            array.flags.writeable = False
+
+    indice_buckets, indice_codigos = _indices_do_armazem(armazem, atributos)
+
+    return {
+        'versao': versao,
+        'atributos': atributos,
+        'colunas': list(COLUNAS_ATRIBUTOS),
+        'ids': ids,
+        'nomes': nomes,
+        'index': candidatos.index,
+        'arquivo': armazem['arquivo'] if armazem is not None else None,
+        'imputacao': {
+            'valores_padrao': dict(VALORES_PADRAO),
+            'imputados': imputados,
+            'contagem': dict(zip(COLUNAS_ATRIBUTOS, imputados.sum(axis=0).tolist()))
+        },
+        'indice_buckets': indice_buckets,
+        'indice_perfil': construir_indice_perfil(atributos),
+        'indice_codigos': indice_codigos
+    }
+
+
+def pool_para_processos(pool, indice_perfil=True):
+    """
+    Cópia rasa do pool para enviar a outros processos (initargs)
+
+    Um np.memmap é serializado com todos os dados; com o armazém, tudo o
+    que está no arquivo (atributos, imputados e índices de buckets e de
+    códigos) vai como None e restaurar_pool mapeia de novo no destino. ids
+    e nomes também vão como None: restaurar_pool os tira dos candidatos
+    que o destino já recebe. Só a KD-tree do perfil é serializada.
+
+    Args:
+        pool: Pool de preparar_pool
+        indice_perfil: Se False, a KD-tree fica de fora (o destino não usa
+                       score_perfil_minimo)
+    """
+    if pool.get('arquivo') is None:
+        return pool
+
+    enviado = {
+        **pool,
+        'atributos': None,
+        'ids': None,
+        'nomes': None,
+        'imputacao': {**pool['imputacao'], 'imputados': None},
+        'indice_buckets': None,
+        'indice_codigos': None
+    }
+    if not indice_perfil:
+        enviado.pop('indice_perfil', None)
+    return enviado
+
+
+def restaurar_pool(pool, candidatos):
+    """
+    Mapeia de novo os arrays removidos por pool_para_processos
+
+    Args:
+        pool: Pool recebido de pool_para_processos
+        candidatos: DataFrame de candidatos do destino (basta 'id' e
+                    'Nome Completo', na ordem do pool)
+    """
+    if pool.get('arquivo') is None or pool['atributos'] is not None:
+        return pool
+
+    armazem = abrir_atributos(pool['arquivo'])
+    indice_buckets, indice_codigos = _indices_do_armazem(armazem, armazem['atributos'])
+
+    return {
+        **pool,
+        'atributos': armazem['atributos'],
+        'ids': candidatos['id'].to_numpy() if 'id' in candidatos.columns else None,
+        'nomes': candidatos['Nome Completo'].to_numpy() if 'Nome Completo' in candidatos.columns else None,
+        'imputacao': {**pool['imputacao'], 'imputados': armazem['imputados']},
+        'indice_buckets': indice_buckets,
+        'indice_codigos': indice_codigos
+    }
@@ -0,0 +1,364 @@
+"""
+Módulo de previsão compilada: os modelos treinados viram arrays NumPy
+contíguos (nós das árvores e coeficientes) avaliados de forma vetorizada,
+sem o overhead do sklearn e do xgboost a cada chamada
+"""
+
+import json
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from utils.features import FEATURES
+
+
+# Maior diferença aceita entre a previsão compilada e o predict_proba original
+TOLERANCIA_PARIDADE = 1e-5
+
+# Pares linha × árvore avaliados por bloco (limita a memória da travessia)
+PARES_POR_BLOCO = 2_000_000
+
+# Acima disso a travessia nativa (C, multithread) do sklearn/xgboost ganha do NumPy
+LINHAS_MAXIMAS_ARVORES = 256
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# EXPORTAÇÃO
+# ═══════════════════════════════════════════════════════════════════════════
+
+def compilar_regressao_logistica(modelo):
+    """
+    Dobra o StandardScaler nos coeficientes da regressão logística
+
+    Args:
+        modelo: Pipeline (scaler + LogisticRegression) ou LogisticRegression
+
+    Returns:
+        Dict com 'coeficientes' (n_features,) e 'intercepto' já na escala original
+    """
+    passos = [p for _, p in modelo.steps] if isinstance(modelo, Pipeline) else [modelo]
+    *transformacoes, lr = passos
+
+    if not isinstance(lr, LogisticRegression) or lr.coef_.shape[0] != 1:
+        raise ValueError("Esperada uma LogisticRegression binária")
+
+    coeficientes = lr.coef_[0].astype(np.float64)
+    intercepto = float(lr.intercept_[0])
+
+    # z = ((x - media) / escala) @ w + b  =  x @ (w / escala) + (b - (media / escala) @ w)
+    for transformacao in reversed(transformacoes):
+        if not isinstance(transformacao, StandardScaler):
+            raise ValueError(f"Transformação não suportada: {type(transformacao).__name__}")
+
+        escala = transformacao.scale_ if transformacao.scale_ is not None else 1.0
+        media = transformacao.mean_ if transformacao.mean_ is not None else 0.0
+
+        coeficientes = coeficientes / escala
+        intercepto = intercepto - float(np.sum(media * coeficientes))
+
+    return {
+        'tipo': 'linear',
+        'coeficientes': np.ascontiguousarray(coeficientes),
+        'intercepto': intercepto
+    }
+
+
+def _renumerar(esquerda, direita):
+    """
+    Nova numeração em largura com os dois filhos de cada nó em posições
+    consecutivas (direita = esquerda + 1)
+
+    Returns:
+        Array antigo -> novo para cada nó
+    """
+    novo = np.full(len(esquerda), -1, dtype=np.int32)
+    novo[0] = 0
+    fila = [0]
+    proximo = 1
+
+    for no in fila:
+        if esquerda[no] >= 0:
+            novo[esquerda[no]] = proximo
+            novo[direita[no]] = proximo + 1
+            proximo += 2
+            fila.extend((esquerda[no], direita[no]))
+
+    return novo
+
+
+def _juntar_arvores(arvores):
+    """Concatena as árvores em arrays únicos de nós, com índices globais"""
+    tamanhos = [len(a['esquerda']) for a in arvores]
+    deslocamentos = np.concatenate([[0], np.cumsum(tamanhos)[:-1]]).astype(np.int32)
+    total = int(sum(tamanhos))
+
+    feature = np.zeros(total, dtype=np.int32)
+    limiar = np.full(total, np.inf, dtype=arvores[0]['limiar'].dtype if arvores else np.float64)
+    filho = np.empty(total, dtype=np.int32)
+    faltante = np.empty(total, dtype=np.int32)
+    valor = np.zeros(total, dtype=np.float64)
+
+    for arvore, deslocamento in zip(arvores, deslocamentos):
+        esquerda = np.asarray(arvore['esquerda'])
+        novo = _renumerar(esquerda, np.asarray(arvore['direita']))
+        destino = novo + deslocamento
+        interno = esquerda >= 0
+
+        # Folhas apontam para si mesmas com limiar infinito: a travessia pode
+        # rodar a profundidade máxima sem desvios
+        filho[destino] = destino
+        faltante[destino] = destino
+        feature[destino[interno]] = arvore['feature'][interno]
+        limiar[destino[interno]] = arvore['limiar'][interno]
+        filho[destino[interno]] = novo[esquerda[interno]] + deslocamento
+        faltante[destino[interno]] = novo[np.asarray(arvore['faltante'])[interno]] + deslocamento
+        valor[destino[~interno]] = arvore['valor'][~interno]
+
+    return {
+        'feature': feature,
+        'limiar': limiar,
+        'filho': filho,
+        'faltante': faltante,
+        'valor': valor,
+        'raizes': deslocamentos,
+        'profundidade': max((a['profundidade'] for a in arvores), default=0)
+    }
+
+
+def _profundidade(esquerda, direita):
+    profundidade = np.zeros(len(esquerda), dtype=np.int32)
+    for no in range(len(esquerda)):
+        if esquerda[no] >= 0:
+            profundidade[esquerda[no]] = profundidade[no] + 1
+            profundidade[direita[no]] = profundidade[no] + 1
+    return int(profundidade.max(initial=0))
+
+
+def compilar_floresta(modelo):
+    """
+    Achata um RandomForestClassifier em arrays de nós
+
+    Returns:
+        Dict com os nós (feature, limiar, filhos, valor da folha = fração da
+        classe positiva) e a raiz de cada árvore
+    """
+    if not isinstance(modelo, RandomForestClassifier) or len(modelo.classes_) != 2:
+        raise ValueError("Esperado um RandomForestClassifier binário")
+
+    arvores = []
+    for estimador in modelo.estimators_:
+        arvore = estimador.tree_
+        contagens = arvore.value[:, 0, :]
+        arvores.append({
+            'feature': arvore.feature,
+            'limiar': arvore.threshold,
+            'esquerda': arvore.children_left,
+            'direita': arvore.children_right,
+            'faltante': arvore.children_right,
+            'valor': contagens[:, 1] / contagens.sum(axis=1),
+            'profundidade': arvore.max_depth
+        })
+
+    return {
+        'tipo': 'arvores',
+        'comparacao': 'menor_igual',
+        'agregacao': 'media',
+        **_juntar_arvores(arvores)
+    }
+
+
+def compilar_xgboost(modelo):
+    """
+    Achata o booster de um XGBClassifier binário em arrays de nós
+
+    Respeita best_iteration quando o treino usou parada antecipada.
+
+    Returns:
+        Dict com os nós, a raiz de cada árvore e a margem base (logit)
+    """
+    booster = modelo.get_booster()
+    estrutura = json.loads(bytes(booster.save_raw(raw_format='json')))
+    aprendiz = estrutura['learner']
+
+    if estrutura['learner']['gradient_booster']['name'] != 'gbtree':
+        raise ValueError("Apenas boosters gbtree são suportados")
+    if aprendiz['objective']['name'] != 'binary:logistic':
+        raise ValueError(f"Objetivo não suportado: {aprendiz['objective']['name']}")
+
+    modelo_arvores = aprendiz['gradient_booster']['model']
+    limites_iteracao = modelo_arvores['iteration_indptr']
+
+    try:
+        n_arvores = limites_iteracao[modelo.best_iteration + 1]
+    except AttributeError:
+        n_arvores = limites_iteracao[-1]
+
+    arvores = []
+    for arvore in modelo_arvores['trees'][:n_arvores]:
+        esquerda = np.asarray(arvore['left_children'], dtype=np.int32)
+        direita = np.asarray(arvore['right_children'], dtype=np.int32)
+        padrao_esquerda = np.asarray(arvore['default_left'], dtype=bool)
+        condicoes = np.asarray(arvore['split_conditions'], dtype=np.float32)
+
+        arvores.append({
+            'feature': np.asarray(arvore['split_indices'], dtype=np.int32),
+            'limiar': condicoes,
+            'esquerda': esquerda,
+            'direita': direita,
+            'faltante': np.where(padrao_esquerda, esquerda, direita),
+            # Nas folhas, split_conditions guarda o valor da folha
+            'valor': condicoes.astype(np.float64),
+            'profundidade': _profundidade(esquerda, direita)
+        })
+
+    base_score = float(aprendiz['learner_model_param']['base_score'].strip('[]'))
+
+    return {
+        'tipo': 'arvores',
+        'comparacao': 'menor',
+        'agregacao': 'logistica',
+        'margem_base': float(np.log(base_score / (1 - base_score))),
+        **_juntar_arvores(arvores)
+    }
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# AVALIAÇÃO
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _percorrer(compilado, X):
+    """Folha alcançada em cada árvore: matriz (n_linhas, n_arvores) de nós"""
+    n_features = X.shape[1]
+    X_plano = X.ravel()
+    base_linhas = (np.arange(len(X), dtype=np.int64) * n_features)[:, None]
+
+    no = np.broadcast_to(compilado['raizes'], (len(X), len(compilado['raizes']))).copy()
+    menor_estrito = compilado['comparacao'] == 'menor'
+    tem_faltantes = np.isnan(X).any()
+
+    for _ in range(compilado['profundidade']):
+        valores = X_plano[base_linhas + compilado['feature'][no]]
+        limiares = compilado['limiar'][no]
+        # Filho direito = filho esquerdo + 1
+        vai_direita = valores >= limiares if menor_estrito else valores > limiares
+        proximo = compilado['filho'][no] + vai_direita
+        if tem_faltantes:
+            proximo = np.where(np.isnan(valores), compilado['faltante'][no], proximo)
+        no = proximo
+
+    return no
+
+
+def prever_compilado(compilado, matriz):
+    """
+    Probabilidade da classe positiva usando o modelo compilado
+
+    Args:
+        compilado: Resultado de compilar_regressao_logistica, compilar_floresta
+                   ou compilar_xgboost
+        matriz: Matriz de features (n, 10) na ordem de FEATURES
+
+    Returns:
+        np.ndarray (n,) de probabilidades
+    """
+    matriz = np.asarray(matriz, dtype=np.float64)
+
+    if compilado['tipo'] == 'linear':
+        margem = matriz @ compilado['coeficientes'] + compilado['intercepto']
+        return 1.0 / (1.0 + np.exp(-margem))
+
+    # Árvores comparam em float32, como no sklearn e no xgboost
+    X = np.ascontiguousarray(matriz, dtype=np.float32)
+    n_arvores = len(compilado['raizes'])
+    tamanho_bloco = max(1, PARES_POR_BLOCO // max(n_arvores, 1))
+    saida = np.empty(len(X), dtype=np.float64)
+
+    for inicio in range(0, len(X), tamanho_bloco):
+        folhas = compilado['valor'][_percorrer(compilado, X[inicio:inicio + tamanho_bloco])]
+
+        if compilado['agregacao'] == 'media':
+            saida[inicio:inicio + tamanho_bloco] = folhas.sum(axis=1) / n_arvores
+        else:
+            margem = compilado['margem_base'] + folhas.sum(axis=1)
+            saida[inicio:inicio + tamanho_bloco] = 1.0 / (1.0 + np.exp(-margem))
+
+    return saida
+
+
+def compilado_compensa(compilado, n_linhas):
+    """
+    Indica se vale usar o modelo compilado para n_linhas
+
+    A regressão logística compilada é sempre mais rápida; as árvores
+    só compensam em lotes pequenos, onde o overhead por chamada domina.
+    """
+    return compilado['tipo'] == 'linear' or n_linhas <= LINHAS_MAXIMAS_ARVORES
+
+
+def matriz_verificacao(n=2000, semente=42):
+    """
+    Matriz de features sintética para conferir a paridade
+
+    Diferenças de código entre 0 e 70 e de perfil entre 0 e 100.
+    """
+    rng = np.random.default_rng(semente)
+    matriz = np.empty((n, len(FEATURES)), dtype=np.float64)
+    matriz[:, :5] = rng.integers(0, [11, 15, 70, 9, 4], size=(n, 5))
+    matriz[:, 5:9] = np.round(rng.uniform(0, 100, size=(n, 4)), 1)
+    matriz[:, 9] = np.sqrt((matriz[:, 5:9] ** 2).sum(axis=1))
+    return matriz
+
+
+def verificar_paridade(modelo, compilado, matriz=None):
+    """
+    Maior diferença absoluta entre o modelo compilado e o predict_proba
+
+    Args:
+        modelo: Modelo original (sklearn ou XGBClassifier)
+        compilado: Sua versão compilada
+        matriz: Features a comparar (padrão: matriz_verificacao())
+
+    Returns:
+        Float com a maior diferença absoluta
+    """
+    from utils.features import features_dataframe
+
+    matriz = matriz_verificacao() if matriz is None else matriz
+    original = modelo.predict_proba(features_dataframe(matriz))[:, 1]
+    return float(np.max(np.abs(original - prever_compilado(compilado, matriz)), initial=0.0))
+
+
+def compilar_modelos(modelos, tolerancia=TOLERANCIA_PARIDADE):
+    """
+    Compila os modelos de treinar_modelos conferindo a paridade de cada um
+
+    Modelos que não puderem ser compilados, ou cuja previsão divergir
+    mais que a tolerância, ficam de fora (o chamador usa o original).
+
+    Args:
+        modelos: dict com 'LR', 'RF' e 'XGB'
+
+    Returns:
+        Dict chave -> modelo compilado
+    """
+    compiladores = {
+        'LR': compilar_regressao_logistica,
+        'RF': compilar_floresta,
+        'XGB': compilar_xgboost
+    }
+    compilados = {}
+
+    for chave, modelo in modelos.items():
+        if chave not in compiladores:
+            continue
+        try:
+            compilado = compiladores[chave](modelo)
+            if verificar_paridade(modelo, compilado) <= tolerancia:
+                compilados[chave] = compilado
+        except (ValueError, KeyError, AttributeError, TypeError):
+            continue
+
+    return compilados
@@ -6,17 +6,22 @@ import pandas as pd
 import numpy as np
 import streamlit as st
 
+from utils.esquema import para_float64
+from utils.features import (
+    matriz_atributos, vetor_vaga, calcular_matriz_features, features_dataframe
+)
 
-def validar_dados(df, tipo):
+
+def colunas_faltando(df, tipo):
     """
-    Valida se o DataFrame tem as colunas necessárias
+    Colunas necessárias ausentes no DataFrame
     
     Args:
         df: DataFrame para validar
         tipo: 'candidatos', 'vagas' ou 'matches'
     
     Returns:
-        True se válido, False caso contrário
+        Lista de colunas faltando (vazia se válido)
     """
     
     colunas_necessarias = {
@@ -52,10 +57,33 @@ def validar_dados(df, tipo):
     }
     
     colunas_esperadas = colunas_necessarias.get(tipo, [])
-    colunas_faltando = [col for col in colunas_esperadas if col not in df.columns]
+    return [col for col in colunas_esperadas if col not in df.columns]
+
+
+def validar_dados(df, tipo, levantar_erros=False):
+    """
+    Valida se o DataFrame tem as colunas necessárias
+    
+    Args:
+        df: DataFrame para validar
+        tipo: 'candidatos', 'vagas' ou 'matches'
+        levantar_erros: Se True, levanta ValueError em vez de mostrar o
+                        erro no Streamlit (fora da thread do script)
+    
+    Returns:
+        True se válido, False caso contrário
     
-    if colunas_faltando:
-        st.error(f"❌ Erros em {tipo}: Colunas faltando: {', '.join(colunas_faltando)}")
+    Raises:
+        ValueError: com levantar_erros, listando as colunas faltando
+    """
+    faltando = colunas_faltando(df, tipo)
+    
+    if faltando:
+        mensagem = f"Erros em {tipo}: Colunas faltando: {', '.join(faltando)}"
+        if levantar_erros:
+            raise ValueError(f"{mensagem}. Colunas disponíveis: {', '.join(map(str, df.columns))}")
+        
+        st.error(f"❌ {mensagem}")
         
         # Mostrar colunas disponíveis para debug
         with st.expander(f"🔍 Colunas disponíveis em {tipo}"):
@@ -90,8 +118,8 @@ def limpar_dados(df, tipo):
     
     for col in colunas_codigo:
         if col in df.columns:
-            # Converter para numérico
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+            # Converter para numérico (já tipado na ingestão: só cast)
+            df[col] = para_float64(df[col])
             
             # Preencher NaN com a moda (valor mais frequente)
             if df[col].notna().sum() > 0:
@@ -109,7 +137,7 @@ def limpar_dados(df, tipo):
     for col in colunas_perfil:
         if col in df.columns:
             # Converter para numérico
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+            df[col] = para_float64(df[col])
             
             # Preencher NaN com 25.0 (valor neutro)
             df[col] = df[col].fillna(25.0)
@@ -122,7 +150,7 @@ def limpar_dados(df, tipo):
     return df
 
 
-def preparar_dados_completos(candidatos, vagas, matches):
+def preparar_dados_completos(candidatos, vagas, matches, exibir_estatisticas=True, levantar_erros=False):
     """
     Prepara dataset completo com merge e cálculo de features
     
@@ -130,20 +158,27 @@ def preparar_dados_completos(candidatos, vagas, matches):
         candidatos: DataFrame com candidatos
         vagas: DataFrame com vagas
         matches: DataFrame com matches
+        exibir_estatisticas: Mostra o expander de estatísticas (False fora
+                             da thread do Streamlit, ex.: treino em segundo plano)
+        levantar_erros: Se True, erros de validação e de preparação são
+                        levantados (ValueError com as colunas faltando) em vez
+                        de mostrados com st.error, que some fora da thread do
+                        script (ex.: treino em segundo plano)
     
     Returns:
-        DataFrame completo com features calculadas
+        DataFrame completo com features calculadas (None em caso de erro,
+        sem levantar_erros)
     """
     
     try:
         # Validar estrutura (sem mensagens de progresso)
-        if not validar_dados(candidatos, 'candidatos'):
+        if not validar_dados(candidatos, 'candidatos', levantar_erros):
             return None
         
-        if not validar_dados(vagas, 'vagas'):
+        if not validar_dados(vagas, 'vagas', levantar_erros):
             return None
         
-        if not validar_dados(matches, 'matches'):
+        if not validar_dados(matches, 'matches', levantar_erros):
             return None
         
         # Limpar dados (sem mensagens)
@@ -231,18 +266,20 @@ def preparar_dados_completos(candidatos, vagas, matches):
             dados = dados.fillna(0)
         
         # Estatísticas (opcional - pode comentar se não quiser ver)
-        with st.expander("📊 Estatísticas do Dataset"):
-            st.write(f"**Total de registros:** {len(dados)}")
-            st.write(f"**Matches bons (1):** {sum(dados['match'] == 1)} ({sum(dados['match'] == 1)/len(dados)*100:.1f}%)")
-            st.write(f"**Matches ruins (0):** {sum(dados['match'] == 0)} ({sum(dados['match'] == 0)/len(dados)*100:.1f}%)")
-            
-            # st.write("\n**Correlações com Match:**")
-            # correlacoes = dados[['diff_idade', 'diff_formacao', 'diff_area', 'diff_cargo', 
-            #                      'diff_regime', 'distancia_perfil', 'match']].corr()['match'].sort_values()
-            # st.dataframe(correlacoes.drop('match').to_frame('Correlação'))
+        if not exibir_estatisticas:
+            return dados
+        
+        exibir_estatisticas_dataset(estatisticas_dataset(dados['match']))
+        
+        # st.write("\n**Correlações com Match:**")
+        # correlacoes = dados[['diff_idade', 'diff_formacao', 'diff_area', 'diff_cargo', 
+        #                      'diff_regime', 'distancia_perfil', 'match']].corr()['match'].sort_values()
+        # st.dataframe(correlacoes.drop('match').to_frame('Correlação'))
         return dados
         
     except Exception as e:
+        if levantar_erros:
+            raise
         st.error(f"❌ Erro na preparação: {str(e)}")
         with st.expander("🔍 Debug - Ver erro completo"):
             import traceback
@@ -250,6 +287,34 @@ def preparar_dados_completos(candidatos, vagas, matches):
         return None
 
 
+def estatisticas_dataset(match):
+    """
+    Contagem de registros e de matches bons/ruins do dataset de treino
+    
+    Args:
+        match: Rótulos (coluna 'match' ou o y do cache de preparação)
+    
+    Returns:
+        Dict com 'registros', 'bons' e 'ruins'
+    """
+    match = np.asarray(match)
+    return {
+        'registros': int(len(match)),
+        'bons': int((match == 1).sum()),
+        'ruins': int((match == 0).sum())
+    }
+
+
+def exibir_estatisticas_dataset(estatisticas):
+    """Expander com as estatísticas de estatisticas_dataset"""
+    total = max(estatisticas['registros'], 1)
+    
+    with st.expander("📊 Estatísticas do Dataset"):
+        st.write(f"**Total de registros:** {estatisticas['registros']}")
+        st.write(f"**Matches bons (1):** {estatisticas['bons']} ({estatisticas['bons']/total*100:.1f}%)")
+        st.write(f"**Matches ruins (0):** {estatisticas['ruins']} ({estatisticas['ruins']/total*100:.1f}%)")
+
+
 def calcular_features_vaga(candidatos, vaga_dict):
     """
     Calcula features para uma vaga nova (matching em tempo real)
@@ -262,57 +327,49 @@ def calcular_features_vaga(candidatos, vaga_dict):
         DataFrame com features calculadas
     """
     
-    candidatos = candidatos.copy()
-    
-    # Garantir que colunas são numéricas
-    colunas_numericas = [
-        'Intervalo_Idade_Código',
-        'Nível_Formação_Código',
-        'Nível do cargo código',
-        'Área_Atuação_Código',
-        'Regime código',
-        'autoridade',
-        'prestigio',
-        'preservacao',
-        'formalidade'
-    ]
-    
-    for col in colunas_numericas:
-        if col in candidatos.columns:
-            candidatos[col] = pd.to_numeric(candidatos[col], errors='coerce')
-    
-    # Preencher NaN
-    candidatos = candidatos.fillna({
-        'Intervalo_Idade_Código': 2,
-        'Nível_Formação_Código': 4,
-        'Nível do cargo código': 3,
-        'Área_Atuação_Código': 1,
-        'Regime código': 0,
-        'autoridade': 25.0,
-        'prestigio': 25.0,
-        'preservacao': 25.0,
-        'formalidade': 25.0
-    })
-    
-    # Calcular diferenças
-    features = pd.DataFrame({
-        'diff_idade': abs(candidatos['Intervalo_Idade_Código'] - vaga_dict['codigo_idade']),
-        'diff_formacao': abs(candidatos['Nível_Formação_Código'] - vaga_dict['codigo_formacao']),
-        'diff_area': abs(candidatos['Área_Atuação_Código'] - vaga_dict['codigo_area']),
-        'diff_cargo': abs(candidatos['Nível do cargo código'] - vaga_dict['codigo_cargo']),
-        'diff_regime': abs(candidatos['Regime código'] - vaga_dict['codigo_regime']),
-        'diff_autoridade': abs(candidatos['autoridade'] - vaga_dict['autoridade']),
-        'diff_prestigio': abs(candidatos['prestigio'] - vaga_dict['prestigio']),
-        'diff_preservacao': abs(candidatos['preservacao'] - vaga_dict['preservacao']),
-        'diff_formalidade': abs(candidatos['formalidade'] - vaga_dict['formalidade'])
-    })
+    # Converter atributos (vazios recebem o padrão) e calcular as diferenças
+    atributos = matriz_atributos(candidatos)
+    matriz = calcular_matriz_features(atributos, vetor_vaga(vaga_dict))
     
-    # Distância euclidiana do perfil
-    features['distancia_perfil'] = np.sqrt(
-        features['diff_autoridade']**2 +
-        features['diff_prestigio']**2 +
-        features['diff_preservacao']**2 +
-        features['diff_formalidade']**2
+    return features_dataframe(matriz, index=candidatos.index)
+
+
+def dividir_treino_teste(dados, proporcao_teste=0.2, estavel=False):
+    """
+    Separa treino e teste
+
+    Por padrão é a divisão aleatória estratificada (random_state=42) usada
+    desde sempre nas métricas do app. Com estavel=True (só quando a
+    atualização incremental está ligada) cada par (id_candidato, id_vaga)
+    cai sempre do mesmo lado, mesmo quando novas linhas chegam na aba de
+    matches, e o teste continua comparável entre treinos completos e
+    atualizações; se algum lado ficar sem as duas classes, volta para a
+    divisão estratificada. As métricas das duas divisões não são
+    comparáveis entre si.
+
+    Args:
+        dados: DataFrame de preparar_dados_completos
+        proporcao_teste: Fração das linhas no teste
+        estavel: Divisão pelo hash do par em vez da aleatória
+
+    Returns:
+        Máscara booleana (True = teste), alinhada a dados
+    """
+    y = dados['match'].to_numpy()
+
+    if estavel:
+        pares = dados[['id_candidato', 'id_vaga']].astype(str)
+        hashes = pd.util.hash_pandas_object(pares, index=False).to_numpy()
+        teste = (hashes % 10_000) < proporcao_teste * 10_000
+
+        if len(np.unique(y[teste])) == 2 and len(np.unique(y[~teste])) == 2:
+            return teste
+
+    from sklearn.model_selection import train_test_split
+    _, indices_teste = train_test_split(
+        np.arange(len(dados)), test_size=proporcao_teste, random_state=42, stratify=y
     )
-    
-    return features
\ No newline at end of file
+    teste = np.zeros(len(dados), dtype=bool)
+    teste[indices_teste] = True
+
+    return teste
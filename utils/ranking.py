@@ -0,0 +1,89 @@
+"""
+Módulo de seleção top-k sobre arrays de scores
+"""
+
+import heapq
+
+import numpy as np
+
+
+def top_k_indices(scores, k):
+    """
+    Seleciona as posições dos k maiores scores sem ordenar o array inteiro
+
+    Usa seleção parcial (np.argpartition) e ordena apenas os k escolhidos.
+    Empates são resolvidos como em DataFrame.nlargest(keep='first'):
+    vence a posição menor. Valores NaN nunca são selecionados.
+
+    Args:
+        scores: Array 1-D de scores
+        k: Quantidade de posições desejadas
+
+    Returns:
+        np.ndarray de posições, do maior para o menor score
+    """
+    scores = np.asarray(scores)
+
+    if np.issubdtype(scores.dtype, np.floating) and np.isnan(scores).any():
+        validos = np.flatnonzero(~np.isnan(scores))
+        return validos[top_k_indices(scores[validos], k)]
+
+    n = len(scores)
+    k = min(int(k), n)
+
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    if k < n:
+        escolhidos = np.argpartition(scores, n - k)[n - k:]
+        limiar = scores[escolhidos].min()
+
+        # Todos acima do limiar entram; entre os empatados no limiar, os primeiros
+        acima = np.flatnonzero(scores > limiar)
+        empatados = np.flatnonzero(scores == limiar)[:k - len(acima)]
+        indices = np.concatenate([acima, empatados])
+    else:
+        indices = np.arange(n)
+
+    ordem = np.lexsort((indices, -scores[indices]))
+    return indices[ordem]
+
+
+def top_k_streaming(blocos, k):
+    """
+    Top-k sobre uma sequência de blocos de candidatos, com memória limitada
+
+    Cada bloco é reduzido ao seu próprio top-k e mesclado em um heap de
+    tamanho k, então o total de candidatos pode exceder a memória.
+
+    Args:
+        blocos: Iterável de arrays 1-D de scores, na ordem dos candidatos
+        k: Quantidade de posições desejadas
+
+    Returns:
+        Tupla (posições globais, scores), do maior para o menor score
+    """
+    heap = []
+    deslocamento = 0
+
+    for bloco in blocos:
+        bloco = np.asarray(bloco)
+
+        for i in top_k_indices(bloco, k):
+            # (score, -posição): no empate a posição maior sai primeiro
+            item = (float(bloco[i]), -(deslocamento + int(i)))
+            if len(heap) < k:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+            else:
+                # Os próximos do bloco têm score menor ou igual: não entram
+                break
+
+        deslocamento += len(bloco)
+
+    melhores = sorted(heap, reverse=True)
+    posicoes = np.array([-p for _, p in melhores], dtype=np.intp)
+    valores = np.array([s for s, _ in melhores], dtype=np.float64)
+
+    return posicoes, valores
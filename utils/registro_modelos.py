@@ -0,0 +1,295 @@
+"""
+Módulo de registro persistente dos modelos treinados
+"""
+
+import hashlib
+import json
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: só a trava entre threads do mesmo processo
+    fcntl = None
+
+import joblib
+import pandas as pd
+
+from utils.preditor_compilado import compilar_modelos
+
+
+DIRETORIO_REGISTRO = 'modelos_registro'
+ARQUIVO_INDICE = 'indice.json'
+MAX_VERSOES = 10
+
+# Artefatos já carregados neste processo (evita reler o disco a cada clique)
+_cache_memoria = {}
+
+# Leitura-modificação-gravação do índice: o app e o servidor.py compartilham o registro
+_trava_indice = threading.Lock()
+
+
+def calcular_fingerprint(candidatos, vagas, matches):
+    """
+    Calcula a impressão digital das três abas da planilha
+
+    Args:
+        candidatos, vagas, matches: DataFrames brutos carregados do Google Sheets
+
+    Returns:
+        String hexadecimal (sha256) que muda sempre que qualquer aba muda
+    """
+    return calcular_fingerprint_abas({'candidatos': candidatos, 'vagas': vagas, 'matches': matches})
+
+
+def calcular_fingerprint_abas(abas):
+    """
+    Impressão digital de um conjunto qualquer de abas
+
+    Args:
+        abas: dict nome -> DataFrame (a ordem das chaves entra no hash)
+
+    Returns:
+        String hexadecimal (sha256)
+    """
+    hasher = hashlib.sha256()
+
+    for nome, df in abas.items():
+        hasher.update(nome.encode('utf-8'))
+        hasher.update(json.dumps(list(map(str, df.columns))).encode('utf-8'))
+        hasher.update(str(len(df)).encode('utf-8'))
+        hasher.update(
+            pd.util.hash_pandas_object(df.astype(str), index=False).to_numpy().tobytes()
+        )
+
+    return hasher.hexdigest()
+
+
+def _caminho_indice(diretorio):
+    return os.path.join(diretorio, ARQUIVO_INDICE)
+
+
+def _ler_indice(diretorio):
+    caminho = _caminho_indice(diretorio)
+
+    if not os.path.exists(caminho):
+        return {'versoes': [], 'ativa': None, 'fixada': False}
+
+    with open(caminho, 'r', encoding='utf-8') as f:
+        indice = json.load(f)
+    indice.setdefault('fixada', False)
+    return indice
+
+
+@contextmanager
+def _travar_indice(diretorio):
+    """Exclusão mútua entre threads e processos para alterar o índice"""
+    os.makedirs(diretorio, exist_ok=True)
+
+    with _trava_indice, open(_caminho_indice(diretorio) + '.lock', 'a') as arquivo:
+        if fcntl is not None:
+            fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(arquivo.fileno(), fcntl.LOCK_UN)
+
+
+def _gravar_indice(indice, diretorio):
+    # Gravação atômica: escreve em arquivo temporário e troca
+    caminho = _caminho_indice(diretorio)
+    temporario = f'{caminho}.{uuid.uuid4().hex}.tmp'
+
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(indice, f, ensure_ascii=False, indent=2)
+
+    os.replace(temporario, caminho)
+
+
+def salvar_versao(fingerprint, resultado_treino, y_test, diretorio=DIRETORIO_REGISTRO,
+                  metadados=None):
+    """
+    Salva uma nova versão dos modelos treinados e a torna ativa (se a
+    ativa foi fixada com ativar_versao, ela continua a ativa)
+
+    Args:
+        fingerprint: Impressão digital dos dados usados no treino
+        resultado_treino: Dict retornado por treinar_modelos (com
+                          'compilados' e 'graficos' opcionais)
+        y_test: Labels do conjunto de teste (usados nos gráficos)
+        diretorio: Pasta do registro
+        metadados: dict opcional (JSON) gravado no índice e nos artefatos
+                   (ex.: origem do treino e linhas de matches usadas)
+
+    Returns:
+        Identificador da versão salva
+    """
+    os.makedirs(diretorio, exist_ok=True)
+
+    # Sufixo aleatório: dois treinos dos mesmos dados no mesmo segundo não colidem
+    versao_id = datetime.now().strftime('%Y%m%d_%H%M%S') + f'_{fingerprint[:12]}_{uuid.uuid4().hex[:6]}'
+    arquivo = f'{versao_id}.joblib'
+
+    artefatos = {
+        'versao': versao_id,
+        'fingerprint': fingerprint,
+        'modelos': resultado_treino['modelos'],
+        'resultados': resultado_treino['resultados'],
+        'probabilidades': resultado_treino['probabilidades'],
+        'compilados': resultado_treino.get('compilados'),
+        'graficos': resultado_treino.get('graficos'),
+        'y_test': y_test,
+        'metadados': metadados or {}
+    }
+
+    caminho = os.path.join(diretorio, arquivo)
+    temporario = f'{caminho}.tmp'
+    joblib.dump(artefatos, temporario)
+    os.replace(temporario, caminho)
+
+    with _travar_indice(diretorio):
+        indice = _ler_indice(diretorio)
+        indice['versoes'].append({
+            'id': versao_id,
+            'fingerprint': fingerprint,
+            'arquivo': arquivo,
+            'criado_em': datetime.now().isoformat(timespec='seconds'),
+            **(metadados or {})
+        })
+        if not indice['fixada'] or indice['ativa'] is None:
+            indice['ativa'] = versao_id
+
+        # Manter apenas as versões mais recentes (a ativa nunca é removida)
+        while len(indice['versoes']) > MAX_VERSOES:
+            antiga = next(v for v in indice['versoes'] if v['id'] != indice['ativa'])
+            indice['versoes'].remove(antiga)
+            try:
+                os.remove(os.path.join(diretorio, antiga['arquivo']))
+            except OSError:
+                pass
+            _cache_memoria.pop(antiga['id'], None)
+
+        _gravar_indice(indice, diretorio)
+    _cache_memoria[versao_id] = artefatos
+
+    return versao_id
+
+
+def _carregar_arquivo(entrada, diretorio):
+    if entrada['id'] in _cache_memoria:
+        return _cache_memoria[entrada['id']]
+
+    caminho = os.path.join(diretorio, entrada['arquivo'])
+    if not os.path.exists(caminho):
+        return None
+
+    artefatos = joblib.load(caminho)
+    if artefatos.get('compilados') is None:
+        # Versões salvas antes da compilação dos modelos
+        artefatos['compilados'] = compilar_modelos(artefatos['modelos'])
+    _cache_memoria[entrada['id']] = artefatos
+    return artefatos
+
+
+def carregar_versao(fingerprint=None, versao_id=None, diretorio=DIRETORIO_REGISTRO):
+    """
+    Carrega os artefatos salvos de uma versão
+
+    Com uma versão fixada por ativar_versao (rollback), a busca por
+    fingerprint devolve sempre a ativa, mesmo com outra versão treinada
+    com esses dados (e sem versão para os dados não há novo treino).
+
+    Args:
+        fingerprint: Se informado, busca a versão treinada com esses dados
+                     (prefere a ativa, senão a mais recente)
+        versao_id: Se informado, carrega exatamente essa versão
+        diretorio: Pasta do registro
+
+    Returns:
+        Dict com modelos, resultados, probabilidades, compilados e y_test, ou None
+    """
+    try:
+        indice = _ler_indice(diretorio)
+    except (OSError, ValueError):
+        return None
+
+    versoes = indice['versoes']
+
+    if versao_id is not None:
+        candidatas = [v for v in versoes if v['id'] == versao_id]
+    elif fingerprint is not None and not indice['fixada']:
+        candidatas = [v for v in versoes if v['fingerprint'] == fingerprint]
+        candidatas.sort(key=lambda v: v['id'] == indice['ativa'])
+    else:
+        candidatas = [v for v in versoes if v['id'] == indice['ativa']]
+
+    for entrada in reversed(candidatas):
+        try:
+            artefatos = _carregar_arquivo(entrada, diretorio)
+        except Exception:
+            artefatos = None
+
+        if artefatos is not None:
+            return artefatos
+
+    return None
+
+
+def listar_versoes(diretorio=DIRETORIO_REGISTRO):
+    """
+    Lista as versões salvas no registro
+
+    Returns:
+        Lista de dicts (id, fingerprint, arquivo, criado_em, ativa, fixada)
+    """
+    indice = _ler_indice(diretorio)
+
+    return [
+        {**v, 'ativa': v['id'] == indice['ativa'], 'fixada': v['id'] == indice['ativa'] and indice['fixada']}
+        for v in indice['versoes']
+    ]
+
+
+def ativar_versao(versao_id, diretorio=DIRETORIO_REGISTRO):
+    """
+    Marca uma versão anterior como ativa e a fixa (rollback)
+
+    Fixada, ela é usada para quaisquer dados e novos treinos não a
+    substituem, até liberar_versao.
+
+    Returns:
+        True se a versão existe e foi ativada, False caso contrário
+    """
+    with _travar_indice(diretorio):
+        indice = _ler_indice(diretorio)
+
+        if not any(v['id'] == versao_id for v in indice['versoes']):
+            return False
+
+        indice['ativa'] = versao_id
+        indice['fixada'] = True
+        _gravar_indice(indice, diretorio)
+    return True
+
+
+def liberar_versao(diretorio=DIRETORIO_REGISTRO):
+    """
+    Desfaz a fixação de ativar_versao: a busca por fingerprint volta a
+    escolher a versão dos dados e o próximo treino vira a ativa
+
+    Returns:
+        True se havia uma versão fixada
+    """
+    with _travar_indice(diretorio):
+        indice = _ler_indice(diretorio)
+        if not indice['fixada']:
+            return False
+
+        indice['fixada'] = False
+        _gravar_indice(indice, diretorio)
+    return True
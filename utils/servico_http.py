@@ -0,0 +1,470 @@
+"""
+Módulo do serviço HTTP de recomendações (sem Streamlit)
+
+Mantém candidatos, pool pré-normalizado e modelos em memória e responde JSON:
+
+    GET  /saude           status e versão dos modelos
+    GET  /modelo          metadados e métricas da versão carregada
+    GET  /metricas        histograma de latência por rota
+    POST /recomendacoes   top k de uma vaga
+    POST /pontuar         scores e probabilidades de várias vagas
+    POST /recarregar      troca para a versão mais recente do registro
+"""
+
+import bisect
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from utils.armazem_atributos import DIRETORIO_ARMAZEM
+from utils.comparacao import gerar_recomendacoes
+from utils.dicionarios import PESOS_PADRAO, FATORES_PENALIZACAO_PADRAO
+from utils.features import CHAVES_VAGA
+from utils.pontuacao import pontuar_vagas
+from utils.pool_candidatos import preparar_pool
+from utils.registro_modelos import DIRETORIO_REGISTRO, carregar_versao
+
+
+# Limites (ms) das faixas do histograma de latência; a última faixa é aberta
+LIMITES_HISTOGRAMA_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+# Latências mais recentes guardadas por rota para calcular os percentis
+AMOSTRAS_PERCENTIS = 10_000
+
+# Proteções contra requisições grandes demais
+K_MAXIMO = 1000
+MAX_PARES_PONTUACAO = 5_000_000
+TAMANHO_MAXIMO_CORPO = 10 * 1024 * 1024
+
+_latencias = {}
+_trava_latencias = threading.Lock()
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# HISTOGRAMA DE LATÊNCIA
+# ═══════════════════════════════════════════════════════════════════════════
+
+def registrar_latencia(rota, segundos):
+    """Conta uma requisição atendida na faixa do histograma da rota"""
+    ms = segundos * 1000
+
+    with _trava_latencias:
+        estatisticas = _latencias.get(rota)
+        if estatisticas is None:
+            estatisticas = _latencias[rota] = {
+                'faixas': [0] * (len(LIMITES_HISTOGRAMA_MS) + 1),
+                'contagem': 0,
+                'soma_ms': 0.0,
+                'max_ms': 0.0,
+                'recentes': deque(maxlen=AMOSTRAS_PERCENTIS)
+            }
+        estatisticas['faixas'][bisect.bisect_left(LIMITES_HISTOGRAMA_MS, ms)] += 1
+        estatisticas['contagem'] += 1
+        estatisticas['soma_ms'] += ms
+        estatisticas['max_ms'] = max(estatisticas['max_ms'], ms)
+        estatisticas['recentes'].append(ms)
+
+
+def histograma_latencias():
+    """
+    Latência das requisições por rota
+
+    Returns:
+        Dict rota -> contagem, media_ms, max_ms, p50/p90/p99 (das últimas
+        AMOSTRAS_PERCENTIS requisições) e 'faixas' [{'ate_ms', 'contagem'}]
+        (ate_ms None = acima do último limite)
+    """
+    with _trava_latencias:
+        copia = {
+            rota: {**e, 'faixas': list(e['faixas']), 'recentes': np.array(e['recentes'])}
+            for rota, e in _latencias.items()
+        }
+
+    histograma = {}
+    for rota, e in copia.items():
+        p50, p90, p99 = np.percentile(e['recentes'], [50, 90, 99])
+        histograma[rota] = {
+            'contagem': e['contagem'],
+            'media_ms': e['soma_ms'] / e['contagem'],
+            'max_ms': e['max_ms'],
+            'p50_ms': float(p50),
+            'p90_ms': float(p90),
+            'p99_ms': float(p99),
+            'faixas': [
+                {'ate_ms': limite, 'contagem': contagem}
+                for limite, contagem in zip(LIMITES_HISTOGRAMA_MS + [None], e['faixas'])
+            ]
+        }
+
+    return histograma
+
+
+def zerar_latencias():
+    """Descarta o histograma de todas as rotas"""
+    with _trava_latencias:
+        _latencias.clear()
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# ESTADO EM MEMÓRIA
+# ═══════════════════════════════════════════════════════════════════════════
+
+def criar_estado(candidatos, artefatos, fingerprint=None, diretorio=DIRETORIO_REGISTRO):
+    """
+    Monta o estado compartilhado pelas requisições
+
+    Args:
+        candidatos: DataFrame com candidatos (já tipado)
+        artefatos: Versão de modelos (carregar_versao)
+        fingerprint: Impressão digital dos dados (usada em /recarregar)
+        diretorio: Pasta do registro de modelos
+
+    Returns:
+        Dict com candidatos, pool, artefatos e posição de cada id de candidato
+    """
+    pool = preparar_pool(candidatos, fingerprint, DIRETORIO_ARMAZEM)
+    ids = pool['ids'] if pool['ids'] is not None else np.arange(len(candidatos))
+
+    return {
+        'candidatos': candidatos,
+        'pool': pool,
+        'artefatos': artefatos,
+        'fingerprint': fingerprint,
+        'diretorio': diretorio,
+        'posicoes_ids': {str(id_): posicao for posicao, id_ in enumerate(ids)},
+        'iniciado_em': time.time()
+    }
+
+
+def recarregar_modelos(estado, corpo=None):
+    """
+    Troca os modelos pela versão mais recente para os dados (ou pela ativa)
+
+    A troca é uma única atribuição: requisições em andamento terminam com
+    a versão que já tinham em mãos.
+    """
+    artefatos = (
+        carregar_versao(estado['fingerprint'], diretorio=estado['diretorio'])
+        or carregar_versao(diretorio=estado['diretorio'])
+    )
+    if artefatos is None:
+        raise ValueError('Nenhuma versão de modelos no registro')
+
+    anterior = estado['artefatos'].get('versao')
+    estado['artefatos'] = artefatos
+    return {'versao': artefatos.get('versao'), 'anterior': anterior, 'trocou': artefatos.get('versao') != anterior}
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# VALIDAÇÃO DAS REQUISIÇÕES (ValueError vira HTTP 400)
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _ler_vaga(vaga):
+    if not isinstance(vaga, dict):
+        raise ValueError('A vaga deve ser um objeto JSON')
+
+    faltando = [chave for chave in CHAVES_VAGA if vaga.get(chave) is None]
+    if faltando:
+        raise ValueError(f"Campos ausentes na vaga: {', '.join(faltando)}")
+
+    try:
+        lida = {chave: float(vaga[chave]) for chave in CHAVES_VAGA}
+    except (TypeError, ValueError):
+        raise ValueError('Os campos da vaga devem ser numéricos')
+
+    # Mesma validação do app
+    soma_perfil = lida['autoridade'] + lida['prestigio'] + lida['preservacao'] + lida['formalidade']
+    if abs(soma_perfil - 100) > 1:
+        raise ValueError('A soma do perfil comportamental deve ser próxima de 100')
+
+    if 'id' in vaga:
+        lida['id'] = vaga['id']
+    return lida
+
+
+def _ler_pesos(pesos):
+    """Pesos em fração (soma 1) ou em porcentagem (soma 100, como no app)"""
+    if pesos is None:
+        return PESOS_PADRAO
+
+    faltando = [aspecto for aspecto in PESOS_PADRAO if aspecto not in pesos]
+    if faltando:
+        raise ValueError(f"Pesos ausentes: {', '.join(faltando)}")
+
+    try:
+        lidos = {aspecto: float(pesos[aspecto]) for aspecto in PESOS_PADRAO}
+    except (TypeError, ValueError):
+        raise ValueError('Os pesos devem ser numéricos')
+
+    soma = sum(lidos.values())
+    if abs(soma - 100) <= 1:
+        return {aspecto: valor / 100 for aspecto, valor in lidos.items()}
+    if abs(soma - 1) <= 0.01:
+        return lidos
+
+    raise ValueError('A soma dos pesos deve ser 100% (ou 1.0)')
+
+
+def _ler_inteiro(corpo, campo, padrao, minimo, maximo):
+    try:
+        valor = int(corpo.get(campo, padrao))
+    except (TypeError, ValueError):
+        raise ValueError(f'{campo} deve ser inteiro')
+    if not minimo <= valor <= maximo:
+        raise ValueError(f'{campo} deve estar entre {minimo} e {maximo}')
+    return valor
+
+
+def _ler_booleano(corpo, campo, padrao):
+    valor = corpo.get(campo, padrao)
+    # Só true/false do JSON: bool("false") seria True
+    if not isinstance(valor, bool):
+        raise ValueError(f'{campo} deve ser true ou false')
+    return valor
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# ROTAS
+# ═══════════════════════════════════════════════════════════════════════════
+
+def rota_saude(estado, corpo=None):
+    return {
+        'status': 'ok',
+        'versao': estado['artefatos'].get('versao'),
+        'candidatos': len(estado['candidatos']),
+        'no_ar_segundos': round(time.time() - estado['iniciado_em'], 1)
+    }
+
+
+def rota_modelo(estado, corpo=None):
+    artefatos = estado['artefatos']
+    return {
+        'versao': artefatos.get('versao'),
+        'fingerprint': artefatos.get('fingerprint'),
+        'fingerprint_dados': estado['fingerprint'],
+        'metadados': artefatos.get('metadados') or {},
+        'resultados': artefatos['resultados'].to_dict(orient='records'),
+        'compilados': sorted(artefatos.get('compilados') or {}),
+        'candidatos': len(estado['candidatos'])
+    }
+
+
+def rota_metricas(estado, corpo=None):
+    return histograma_latencias()
+
+
+def rota_recomendacoes(estado, corpo):
+    """
+    Corpo: {"vaga": {...}, "pesos": {...}, "k": 10, "score_perfil_minimo": null}
+
+    Returns:
+        {'versao', 'candidatos': [{id, nome, score_ponderado, score_<aspecto>,
+        prob_lr, prob_rf, prob_xgb}, ...]} do melhor para o pior
+    """
+    vaga = _ler_vaga(corpo.get('vaga'))
+    pesos = _ler_pesos(corpo.get('pesos'))
+    k = _ler_inteiro(corpo, 'k', 10, 1, K_MAXIMO)
+
+    score_perfil_minimo = corpo.get('score_perfil_minimo')
+    if score_perfil_minimo is not None:
+        score_perfil_minimo = float(score_perfil_minimo)
+
+    # Referência local: um /recarregar no meio não mistura versões
+    artefatos = estado['artefatos']
+    pool = estado['pool']
+
+    top = gerar_recomendacoes(
+        estado['candidatos'], vaga, artefatos['modelos'], pesos, FATORES_PENALIZACAO_PADRAO,
+        k=k, pool=pool, score_perfil_minimo=score_perfil_minimo,
+        compilados=artefatos.get('compilados')
+    )
+
+    colunas = ['score_ponderado'] + [c for c in top.columns if c.startswith('score_') and c != 'score_ponderado']
+    colunas += ['prob_lr', 'prob_rf', 'prob_xgb']
+    valores = {coluna: top[coluna].to_numpy(dtype=np.float64).tolist() for coluna in colunas}
+    ids = top['id'].tolist() if 'id' in top.columns else top.index.tolist()
+    nomes = top['Nome Completo'].tolist() if 'Nome Completo' in top.columns else [None] * len(top)
+
+    return {
+        'versao': artefatos.get('versao'),
+        'candidatos': [
+            {'id': ids[i], 'nome': nomes[i], **{coluna: valores[coluna][i] for coluna in colunas}}
+            for i in range(len(top))
+        ]
+    }
+
+
+def rota_pontuar(estado, corpo):
+    """
+    Corpo: {"vagas": [{...}, ...], "ids_candidatos": [...] (opcional),
+            "pesos": {...}, "modelos": true}
+
+    Returns:
+        {'ids_vagas', 'ids_candidatos', 'score_ponderado' e, com modelos,
+        'prob_lr'/'prob_rf'/'prob_xgb'} como listas [vaga][candidato]
+    """
+    vagas = corpo.get('vagas')
+    if vagas is None and 'vaga' in corpo:
+        vagas = [corpo['vaga']]
+    if not isinstance(vagas, list) or not vagas:
+        raise ValueError('Informe "vagas" (lista de vagas)')
+    vagas = [_ler_vaga(vaga) for vaga in vagas]
+    pesos = _ler_pesos(corpo.get('pesos'))
+
+    pool = estado['pool']
+    ids = corpo.get('ids_candidatos')
+    if ids is None:
+        atributos = pool['atributos']
+        ids = pool['ids'].tolist() if pool['ids'] is not None else list(range(len(atributos)))
+    else:
+        if not isinstance(ids, list) or not ids or any(isinstance(id_, (list, dict)) for id_ in ids):
+            raise ValueError('"ids_candidatos" deve ser uma lista não vazia de ids')
+        posicoes_ids = estado['posicoes_ids']
+        desconhecidos = [id_ for id_ in ids if str(id_) not in posicoes_ids]
+        if desconhecidos:
+            raise ValueError(f'Candidatos desconhecidos: {desconhecidos[:10]}')
+        atributos = pool['atributos'][[posicoes_ids[str(id_)] for id_ in ids]]
+
+    if len(atributos) * len(vagas) > MAX_PARES_PONTUACAO:
+        raise ValueError(f'Máximo de {MAX_PARES_PONTUACAO:,} pares candidato × vaga por requisição')
+
+    artefatos = estado['artefatos']
+    usar_modelos = _ler_booleano(corpo, 'modelos', True)
+
+    saidas = pontuar_vagas(
+        atributos, vagas,
+        modelos=artefatos['modelos'] if usar_modelos else None,
+        pesos=pesos, fatores_penalizacao=FATORES_PENALIZACAO_PADRAO,
+        compilados=artefatos.get('compilados')
+    )
+
+    resposta = {'versao': artefatos.get('versao'), 'ids_vagas': saidas.pop('ids_vagas'), 'ids_candidatos': ids}
+    for nome, matriz in saidas.items():
+        # (n_candidatos, n_vagas) -> uma lista por vaga
+        resposta[nome] = matriz.T.astype(np.float64).tolist()
+    return resposta
+
+
+ROTAS_GET = {
+    '/saude': rota_saude,
+    '/modelo': rota_modelo,
+    '/metricas': rota_metricas
+}
+
+ROTAS_POST = {
+    '/recomendacoes': rota_recomendacoes,
+    '/pontuar': rota_pontuar,
+    '/recarregar': recarregar_modelos
+}
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SERVIDOR
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _para_json(valor):
+    if isinstance(valor, np.generic):
+        return valor.item()
+    if isinstance(valor, np.ndarray):
+        return valor.tolist()
+    raise TypeError(f'Tipo não serializável: {type(valor).__name__}')
+
+
+def _sem_nao_finitos(valor):
+    """Troca NaN e ±inf por None (JSON não tem esses valores)"""
+    if isinstance(valor, (float, np.floating)):
+        return float(valor) if np.isfinite(valor) else None
+    if isinstance(valor, dict):
+        return {chave: _sem_nao_finitos(item) for chave, item in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_sem_nao_finitos(item) for item in valor]
+    if isinstance(valor, np.ndarray):
+        return _sem_nao_finitos(valor.tolist())
+    return valor
+
+
+def _serializar(resposta):
+    try:
+        conteudo = json.dumps(resposta, ensure_ascii=False, allow_nan=False, default=_para_json)
+    except ValueError:
+        # Caminho raro: só percorre a resposta quando há NaN/inf (viram null)
+        conteudo = json.dumps(_sem_nao_finitos(resposta), ensure_ascii=False, allow_nan=False,
+                              default=_para_json)
+    return conteudo.encode('utf-8')
+
+
+class _Manipulador(BaseHTTPRequestHandler):
+    """Despacha as rotas; o estado é atribuído por criar_servidor"""
+
+    estado = None
+    # Conexões persistentes: o cliente não paga um handshake por requisição
+    protocol_version = 'HTTP/1.1'
+    # Cabeçalho e corpo saem em escritas separadas: sem TCP_NODELAY o Nagle
+    # segura o corpo até o ACK atrasado do cliente (~40 ms)
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._atender(ROTAS_GET, com_corpo=False)
+
+    def do_POST(self):
+        self._atender(ROTAS_POST, com_corpo=True)
+
+    def log_message(self, formato, *args):
+        # Sem log por requisição: a latência fica no histograma de /metricas
+        pass
+
+    def _ler_corpo(self):
+        tamanho = int(self.headers.get('Content-Length') or 0)
+        if tamanho > TAMANHO_MAXIMO_CORPO:
+            raise ValueError('Corpo da requisição grande demais')
+        corpo = json.loads(self.rfile.read(tamanho) or b'{}')
+        if not isinstance(corpo, dict):
+            raise ValueError('O corpo deve ser um objeto JSON')
+        return corpo
+
+    def _atender(self, rotas, com_corpo):
+        inicio = time.perf_counter()
+        rota = self.path.split('?', 1)[0].rstrip('/') or '/'
+        funcao = rotas.get(rota)
+
+        try:
+            if funcao is None:
+                status, resposta = 404, {'erro': f'Rota não encontrada: {self.command} {rota}'}
+            else:
+                corpo = self._ler_corpo() if com_corpo else None
+                status, resposta = 200, funcao(self.estado, corpo)
+        except ValueError as e:
+            status, resposta = 400, {'erro': str(e)}
+        except Exception as e:
+            status, resposta = 500, {'erro': str(e)}
+
+        conteudo = _serializar(resposta)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(conteudo)))
+        self.end_headers()
+        self.wfile.write(conteudo)
+
+        registrar_latencia(f'{self.command} {rota}' if funcao is not None else 'desconhecida',
+                           time.perf_counter() - inicio)
+
+
+def criar_servidor(estado, host='127.0.0.1', porta=8000):
+    """
+    Cria o servidor HTTP (uma thread por conexão) sobre um estado
+
+    Args:
+        estado: Dict de criar_estado
+        host, porta: Endereço de escuta (porta 0 = porta livre qualquer)
+
+    Returns:
+        ThreadingHTTPServer; chame serve_forever() para atender
+    """
+    manipulador = type('Manipulador', (_Manipulador,), {'estado': estado})
+    servidor = ThreadingHTTPServer((host, porta), manipulador)
+    servidor.daemon_threads = True
+    return servidor
@@ -0,0 +1,147 @@
+"""
+Módulo de snapshots locais das abas do Google Sheets
+"""
+
+import hashlib
+import json
+import os
+import uuid
+from datetime import datetime
+
+import pandas as pd
+
+
+DIRETORIO_SNAPSHOTS = 'snapshots'
+
+# Com MATCH_OFFLINE=1 o app usa apenas os snapshots locais
+MODO_OFFLINE = os.environ.get('MATCH_OFFLINE', '').strip().lower() in ('1', 'true', 'sim')
+
+
+def _pasta_planilha(planilha, diretorio):
+    # Um subdiretório por planilha (nome, URL ou ID), com nome seguro
+    chave = hashlib.sha1(str(planilha).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(diretorio, chave)
+
+
+def _caminhos(planilha, aba, diretorio):
+    pasta = _pasta_planilha(planilha, diretorio)
+    return (
+        os.path.join(pasta, f'{aba}.parquet'),
+        os.path.join(pasta, f'{aba}.json')
+    )
+
+
+def salvar_snapshot(planilha, aba, df, revisao=None, extras=None, diretorio=DIRETORIO_SNAPSHOTS):
+    """
+    Grava uma aba em Parquet comprimido junto com a revisão da planilha
+
+    Args:
+        planilha: Nome, URL ou ID da planilha de origem
+        aba: Nome da aba
+        df: DataFrame carregado da aba
+        revisao: Data da última alteração da planilha (get_lastUpdateTime)
+        extras: Metadados adicionais (ex.: estado da sincronização incremental)
+        diretorio: Pasta dos snapshots
+
+    Returns:
+        Dict com os metadados gravados
+    """
+    caminho_dados, caminho_meta = _caminhos(planilha, aba, diretorio)
+    os.makedirs(os.path.dirname(caminho_dados), exist_ok=True)
+
+    # Troca atômica: leitores nunca veem um arquivo pela metade
+    temporario = f'{caminho_dados}.{uuid.uuid4().hex}.tmp'
+    # O índice guarda a posição da linha na aba (usado na sincronização incremental)
+    df.to_parquet(temporario, compression='zstd', index=True)
+    os.replace(temporario, caminho_dados)
+
+    metadados = {
+        'planilha': str(planilha),
+        'aba': aba,
+        'revisao': revisao,
+        'linhas': int(len(df)),
+        'colunas': list(map(str, df.columns)),
+        'salvo_em': datetime.now().isoformat(timespec='milliseconds'),
+        **(extras or {})
+    }
+
+    temporario = f'{caminho_meta}.{uuid.uuid4().hex}.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(metadados, f, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho_meta)
+
+    return metadados
+
+
+def atualizar_metadados(planilha, aba, campos, diretorio=DIRETORIO_SNAPSHOTS):
+    """
+    Atualiza campos dos metadados sem regravar os dados nem mudar salvo_em
+    (ex.: revisão nova de uma aba cujo conteúdo não mudou)
+
+    Returns:
+        Dict com os metadados gravados ou None se não houver snapshot
+    """
+    metadados = ler_metadados(planilha, aba, diretorio)
+    if metadados is None:
+        return None
+
+    metadados.update(campos)
+    _, caminho_meta = _caminhos(planilha, aba, diretorio)
+
+    temporario = f'{caminho_meta}.{uuid.uuid4().hex}.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(metadados, f, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho_meta)
+
+    return metadados
+
+
+def ler_metadados(planilha, aba, diretorio=DIRETORIO_SNAPSHOTS):
+    """
+    Lê os metadados do snapshot de uma aba
+
+    Returns:
+        Dict de metadados ou None se não houver snapshot
+    """
+    _, caminho_meta = _caminhos(planilha, aba, diretorio)
+
+    try:
+        with open(caminho_meta, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def carregar_snapshot(planilha, aba, diretorio=DIRETORIO_SNAPSHOTS):
+    """
+    Carrega o snapshot local de uma aba
+
+    Returns:
+        Tupla (DataFrame, metadados) ou (None, None) se não houver snapshot
+    """
+    caminho_dados, _ = _caminhos(planilha, aba, diretorio)
+    metadados = ler_metadados(planilha, aba, diretorio)
+
+    if metadados is None or not os.path.exists(caminho_dados):
+        return None, None
+
+    try:
+        return pd.read_parquet(caminho_dados), metadados
+    except Exception:
+        return None, None
+
+
+def versao_snapshots(planilha, abas, diretorio=DIRETORIO_SNAPSHOTS):
+    """
+    Identifica o estado atual dos snapshots (muda a cada gravação dos
+    dados; atualizar_metadados não muda a versão)
+
+    Returns:
+        Tupla com (aba, salvo_em) de cada aba, usada como chave de cache
+    """
+    versao = []
+    for aba in abas:
+        metadados = ler_metadados(planilha, aba, diretorio) or {}
+        versao.append((aba, metadados.get('salvo_em')))
+
+    return tuple(versao)
@@ -0,0 +1,273 @@
+"""
+Módulo de treino em segundo plano: o treino vira uma tarefa com id,
+executada por um worker, com o progresso de cada etapa
+
+A nova versão só entra no registro (e vira a ativa) quando a tarefa
+termina; até lá o app continua usando a última versão boa.
+"""
+
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.ajuste_hiperparametros import (
+    ORCAMENTO_AJUSTE_AMBIENTE, ajustar_hiperparametros,
+    carregar_hiperparametros, salvar_hiperparametros
+)
+from utils.atualizacao_incremental import planejar_atualizacao, atualizar_modelos, comparar_resultados
+from utils.cache_preparacao import obter_preparados, dividir_preparados, estatisticas_cache
+from utils.comparacao import (
+    NOMES_MODELOS, treinar_modelos, avaliar_modelos, gerar_graficos_comparacao
+)
+from utils.perfil_execucao import nova_execucao, medir_etapa, adicionar_etapa, registrar_execucao
+from utils.preditor_compilado import compilar_modelos
+from utils.preparacao import estatisticas_dataset
+from utils.registro_modelos import DIRETORIO_REGISTRO, carregar_versao, salvar_versao
+
+
+# Etapas de uma tarefa, na ordem de execução
+ETAPAS = ['preparar', 'dividir', 'LR', 'RF', 'XGB', 'graficos']
+
+# Tarefas finalizadas mantidas em memória para consulta
+MAX_TAREFAS_GUARDADAS = 20
+
+# Um treino por vez: os modelos já usam todos os núcleos (orcamento_threads)
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='treino')
+_tarefas = {}
+_trava = threading.Lock()
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# ESTADO DAS TAREFAS
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _nova_tarefa(fingerprint):
+    return {
+        'id': uuid.uuid4().hex[:12],
+        'fingerprint': fingerprint,
+        'status': 'fila',
+        'etapas': {etapa: {'status': 'pendente', 'inicio': None, 'fim': None} for etapa in ETAPAS},
+        'progresso': 0.0,
+        'modo': None,
+        'versao_id': None,
+        'erro': None,
+        'criada_em': time.time(),
+        'fim': None
+    }
+
+
+def _marcar_etapa(tarefa_id, etapa, status):
+    """Atualiza uma etapa ('executando' ou 'concluida') e o progresso total"""
+    with _trava:
+        tarefa = _tarefas[tarefa_id]
+        estado = tarefa['etapas'][etapa]
+        estado['status'] = status
+        if status == 'executando':
+            estado['inicio'] = time.time()
+        else:
+            estado['fim'] = time.time()
+
+        concluidas = sum(e['status'] == 'concluida' for e in tarefa['etapas'].values())
+        tarefa['progresso'] = concluidas / len(ETAPAS)
+
+
+def _finalizar(tarefa_id, status, **campos):
+    with _trava:
+        tarefa = _tarefas[tarefa_id]
+        tarefa.update(status=status, fim=time.time(), **campos)
+        if status == 'concluida':
+            tarefa['progresso'] = 1.0
+
+        # Descartar as tarefas finalizadas mais antigas
+        finalizadas = sorted(
+            (t for t in _tarefas.values() if t['status'] in ('concluida', 'erro')),
+            key=lambda t: t['fim']
+        )
+        for antiga in finalizadas[:max(0, len(finalizadas) - MAX_TAREFAS_GUARDADAS)]:
+            del _tarefas[antiga['id']]
+
+
+def _copiar(tarefa):
+    return {**tarefa, 'etapas': {etapa: dict(estado) for etapa, estado in tarefa['etapas'].items()}}
+
+
+def status_tarefa(tarefa_id):
+    """
+    Estado atual de uma tarefa
+
+    Returns:
+        Cópia do dict da tarefa (status, etapas, progresso, versao_id, erro)
+        ou None se o id não existe
+    """
+    with _trava:
+        tarefa = _tarefas.get(tarefa_id)
+        return _copiar(tarefa) if tarefa is not None else None
+
+
+def tarefa_ativa(fingerprint):
+    """Id da tarefa na fila ou em execução para esses dados, ou None"""
+    with _trava:
+        for tarefa in _tarefas.values():
+            if tarefa['fingerprint'] == fingerprint and tarefa['status'] in ('fila', 'executando'):
+                return tarefa['id']
+    return None
+
+
+def ultima_tarefa(fingerprint):
+    """Cópia da tarefa mais recente para esses dados (qualquer status), ou None"""
+    with _trava:
+        tarefas = [t for t in _tarefas.values() if t['fingerprint'] == fingerprint]
+        if not tarefas:
+            return None
+        return _copiar(max(tarefas, key=lambda t: t['criada_em']))
+
+
+def listar_tarefas():
+    """Cópias de todas as tarefas guardadas, da mais recente para a mais antiga"""
+    with _trava:
+        tarefas = [_copiar(t) for t in _tarefas.values()]
+    return sorted(tarefas, key=lambda t: t['criada_em'], reverse=True)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# EXECUÇÃO
+# ═══════════════════════════════════════════════════════════════════════════
+
+def submeter_treino(fingerprint, candidatos, vagas, matches, diretorio=DIRETORIO_REGISTRO):
+    """
+    Envia o treino para o worker e retorna imediatamente
+
+    Se já existe uma tarefa na fila ou em execução para o mesmo
+    fingerprint, retorna o id dela em vez de criar outra.
+
+    Args:
+        fingerprint: Impressão digital dos dados (versão a ser criada)
+        candidatos, vagas, matches: DataFrames usados no treino
+        diretorio: Pasta do registro de modelos
+
+    Returns:
+        Id da tarefa
+    """
+    with _trava:
+        for tarefa in _tarefas.values():
+            if tarefa['fingerprint'] == fingerprint and tarefa['status'] in ('fila', 'executando'):
+                return tarefa['id']
+
+        tarefa = _nova_tarefa(fingerprint)
+        _tarefas[tarefa['id']] = tarefa
+
+    _executor.submit(_executar, tarefa['id'], fingerprint, candidatos, vagas, matches, diretorio)
+    return tarefa['id']
+
+
+def _executar(tarefa_id, fingerprint, candidatos, vagas, matches, diretorio):
+    """Corpo da tarefa: prepara, divide, treina, gera gráficos e publica a versão"""
+    with _trava:
+        _tarefas[tarefa_id]['status'] = 'executando'
+
+    execucao = nova_execucao('treino', {
+        'tarefa': tarefa_id, 'fingerprint': fingerprint,
+        'candidatos': len(candidatos), 'vagas': len(vagas), 'matches': len(matches)
+    })
+
+    try:
+        _marcar_etapa(tarefa_id, 'preparar', 'executando')
+        # Mesmas abas de um treino anterior: X e y vêm do cache, sem preparar de novo
+        with medir_etapa(execucao, 'preparar'):
+            # Colunas faltando e outros erros da preparação levantam exceção: vão para o 'erro' da tarefa
+            preparados = obter_preparados(candidatos, vagas, matches)
+        execucao['contexto']['preparacao'] = preparados['origem']
+        execucao['contexto']['cache_preparacao'] = estatisticas_cache()
+        _marcar_etapa(tarefa_id, 'preparar', 'concluida')
+
+        _marcar_etapa(tarefa_id, 'dividir', 'executando')
+        with medir_etapa(execucao, 'dividir'):
+            conjuntos = dividir_preparados(preparados)
+        X_train, y_train = conjuntos['X_train'], conjuntos['y_train']
+        X_test, y_test = conjuntos['X_test'], conjuntos['y_test']
+        _marcar_etapa(tarefa_id, 'dividir', 'concluida')
+
+        def progresso(chave, evento):
+            _marcar_etapa(tarefa_id, chave, 'executando' if evento == 'iniciado' else 'concluida')
+
+        # Só matches novos no final da aba: atualiza a versão ativa em vez de retreinar
+        ativa = carregar_versao(diretorio=diretorio)
+        plano = planejar_atualizacao(ativa, candidatos, vagas, matches)
+        with _trava:
+            _tarefas[tarefa_id]['modo'] = plano['modo']
+        execucao['contexto']['modo'] = plano['modo']
+        # Gravadas com a versão: o app mostra o expander de estatísticas sem preparar de novo
+        plano['metadados']['estatisticas_dataset'] = estatisticas_dataset(preparados['y'])
+
+        with medir_etapa(execucao, 'treino'):
+            if plano['modo'] == 'incremental':
+                resultado_treino = atualizar_modelos(
+                    ativa['modelos'], conjuntos, plano['n_matches_anterior'],
+                    semente=plano['metadados']['atualizacoes'], progresso=progresso
+                )
+            else:
+                # Hiperparâmetros: os vencedores salvos, ou uma nova busca no modo de ajuste
+                hiperparametros = carregar_hiperparametros(diretorio)
+                if ORCAMENTO_AJUSTE_AMBIENTE > 0:
+                    hiperparametros = ajustar_hiperparametros(
+                        X_train, y_train, orcamento_segundos=ORCAMENTO_AJUSTE_AMBIENTE
+                    )
+                    try:
+                        salvar_hiperparametros(hiperparametros, fingerprint, diretorio)
+                    except OSError:
+                        pass
+
+                resultado_treino = treinar_modelos(
+                    X_train, y_train, X_test, y_test,
+                    hiperparametros=hiperparametros, progresso=progresso
+                )
+
+                if plano['comparar']:
+                    # Salvaguarda: modelos incrementais × treino completo no mesmo teste
+                    plano['metadados']['comparacao_incremental'] = comparar_resultados(
+                        avaliar_modelos(ativa['modelos'], X_test, y_test)['resultados'],
+                        resultado_treino['resultados']
+                    )
+
+        # Cada modelo: no treino em paralelo a CPU é só a da thread que chamou
+        # o fit (cpu_medida='thread'), sem as threads internas do RF e do XGB
+        for chave in NOMES_MODELOS:
+            tempos = resultado_treino['tempos'][chave]
+            adicionar_etapa(
+                execucao, chave, tempos['parede'], tempos['cpu'],
+                subetapa=True, cpu_medida=tempos.get('cpu_medida')
+            )
+
+        with medir_etapa(execucao, 'compilar'):
+            resultado_treino['compilados'] = compilar_modelos(resultado_treino['modelos'])
+
+        _marcar_etapa(tarefa_id, 'graficos', 'executando')
+        with medir_etapa(execucao, 'graficos'):
+            resultado_treino['graficos'] = gerar_graficos_comparacao(
+                resultado_treino['resultados'], y_test, resultado_treino['probabilidades']
+            )
+        _marcar_etapa(tarefa_id, 'graficos', 'concluida')
+
+        # Troca atômica: o índice só aponta para a versão nova depois de gravada
+        with medir_etapa(execucao, 'salvar'):
+            versao_id = salvar_versao(
+                fingerprint, resultado_treino, y_test, diretorio=diretorio, metadados=plano['metadados']
+            )
+        execucao['contexto'].update(status='concluida', versao_modelos=versao_id)
+        _registrar(execucao)
+        _finalizar(tarefa_id, 'concluida', versao_id=versao_id)
+
+    except Exception as e:
+        execucao['contexto']['status'] = 'erro'
+        _registrar(execucao)
+        _finalizar(tarefa_id, 'erro', erro=f'{e}\n{traceback.format_exc()}')
+
+
+def _registrar(execucao):
+    """Grava os tempos da tarefa no log de execuções (falha de disco não derruba o treino)"""
+    try:
+        registrar_execucao(execucao)
+    except OSError:
+        pass